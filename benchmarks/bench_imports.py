@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the agent entry points.
+
+Each module is imported in a fresh interpreter with ``-X importtime`` so the
+numbers reflect a cold cron invocation (``--run-now``, a health check) rather
+than a warm process. Reports the median cumulative import time per module and
+the slowest dependencies it pulls in, and optionally the time to build the
+Sheets service from the bundled discovery document.
+
+Usage:
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports --repeat 10 --top 5
+    python -m benchmarks.bench_imports --budget-ms 150 --sheets-build
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    'job_scraper_agent',
+    'updated_job_scraper_agent',
+    'google_sheets',
+    'legitimate_job_scraper',
+    'linkedin_scraper',
+    'run_history',
+    'metrics',
+]
+
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+SHEETS_BUILD_SNIPPET = '''
+import time
+start = time.perf_counter()
+from config import Config
+Config.GOOGLE_CREDENTIALS_FILE = '/nonexistent'
+Config.SHEETS_API_ENDPOINT = 'http://127.0.0.1:9'
+from google_sheets import GoogleSheetsManager
+GoogleSheetsManager()
+print((time.perf_counter() - start) * 1000)
+'''
+
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        Cumulative import time of the module in ms, and (package, ms) pairs for
+        every top-level package it pulled in
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True, env={**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'})
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1]}")
+    total = 0.0
+    dependencies = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(2)) / 1000
+        depth = (len(match.group(3)) - 1) // 2
+        name = match.group(4)
+        if name == module and depth == 0:
+            total = cumulative_ms
+        elif depth > 0 and '.' not in name:
+            dependencies.append((name, cumulative_ms))
+    return total, dependencies
+
+
+def measure(modules: List[str], repeat: int) -> Dict[str, Dict]:
+    results = {}
+    for module in modules:
+        times = []
+        slowest: Dict[str, float] = {}
+        for _ in range(repeat):
+            total, dependencies = import_profile(module)
+            times.append(total)
+            for name, ms in dependencies:
+                slowest[name] = max(slowest.get(name, 0.0), ms)
+        results[module] = {
+            'median_ms': round(statistics.median(times), 1),
+            'min_ms': round(min(times), 1),
+            'dependencies': sorted(slowest.items(), key=lambda item: item[1], reverse=True),
+        }
+    return results
+
+
+def measure_sheets_build(repeat: int) -> float:
+    """Median ms to import google_sheets and build the Sheets service (no network calls)."""
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', SHEETS_BUILD_SNIPPET], cwd=REPO_ROOT,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Sheets build failed: {result.stderr.strip().splitlines()[-1]}")
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return round(statistics.median(times), 1)
+
+
+def print_table(results: Dict[str, Dict], top: int):
+    print(f"{'module':<28} {'median ms':>10} {'min ms':>8}  slowest dependencies")
+    for module, result in results.items():
+        slowest = ', '.join(f"{name} {ms:.0f}" for name, ms in result['dependencies'][:top])
+        print(f"{module:<28} {result['median_ms']:>10.1f} {result['min_ms']:>8.1f}  {slowest}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold import-time benchmark for the agents')
+    parser.add_argument('--module', action='append', help='Module to measure (repeatable; default: entry points)')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per module')
+    parser.add_argument('--top', type=int, default=3, help='Slowest dependencies to list per module')
+    parser.add_argument('--budget-ms', type=float, help='Fail if any module median exceeds this')
+    parser.add_argument('--sheets-build', action='store_true',
+                        help='Also time building the Sheets service from the bundled discovery document')
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args()
+
+    results = measure(args.module or DEFAULT_MODULES, args.repeat)
+    print_table(results, args.top)
+
+    if args.sheets_build:
+        build_ms = measure_sheets_build(args.repeat)
+        results['sheets_build'] = {'median_ms': build_ms}
+        print(f"\nGoogleSheetsManager() incl. imports: {build_ms:.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None:
+        over = [name for name, result in results.items()
+                if name != 'sheets_build' and result['median_ms'] > args.budget_ms]
+        if over:
+            print(f"\nOver the {args.budget_ms:.0f} ms import budget: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Headless page-weight benchmark for the static site.
+
+Replays what a browser downloads to render each page's first screen, without
+a browser: the HTML, render-blocking and preloaded stylesheets, scripts, the
+favicon and every image the page fetches eagerly. Requests come from the model
+in site_build.audit, which picks the <picture> source and srcset candidate a
+browser would at the given viewport width and device pixel ratio. Images with
+loading="lazy" below the fold and carousel slides kept in data-src/data-srcset
+are reported separately as deferred. Only files on disk are counted (CSS background images and fetch()
+calls are not), so numbers compare builds rather than predict a waterfall.
+
+The repository root (pages as written) is measured against the built site.
+
+Usage:
+    python -m benchmarks.bench_page_weight
+    python -m benchmarks.bench_page_weight --viewport 390 --dpr 3
+    python -m benchmarks.bench_page_weight --build --budget-kb 500 --json page_weight.json
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from site_build import audit
+from site_build.build import DEFAULT_OUT_DIR, SITE_DIR, build_site, site_pages
+from site_build.markup import local_path
+
+CATEGORIES = ('html', 'css', 'js', 'images', 'deferred_images')
+
+
+def page_requests(html: str, viewport: int, dpr: float) -> List[Tuple[str, str]]:
+    """(category, URL) of every request a page makes while loading, deferred images included."""
+    return [('deferred_images' if request.deferred else request.category, request.url)
+            for request in audit.page_requests(html, viewport, dpr)]
+
+
+def measure_page(site_dir: str, page: str, viewport: int, dpr: float) -> Dict[str, int]:
+    """Bytes per category a page transfers on load; every URL counts once (the browser cache dedupes)."""
+    path = os.path.join(site_dir, page)
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    weights = dict.fromkeys(CATEGORIES, 0)
+    weights['html'] = os.path.getsize(path)
+    weights['requests'] = 1
+    seen = set()
+    for category, url in page_requests(html, viewport, dpr):
+        relative = local_path(url)
+        if not relative or relative in seen:
+            continue
+        seen.add(relative)
+        file_path = os.path.join(site_dir, os.path.dirname(page), relative)
+        if not os.path.isfile(file_path):
+            print(f"warning: {page} references missing file {relative}", file=sys.stderr)
+            continue
+        weights[category] += os.path.getsize(file_path)
+        if category != 'deferred_images':
+            weights['requests'] += 1
+    weights['initial'] = sum(weights[category] for category in CATEGORIES if category != 'deferred_images')
+    return weights
+
+
+def measure(site_dir: str, viewport: int, dpr: float) -> Dict[str, Dict[str, int]]:
+    return {page: measure_page(site_dir, page, viewport, dpr) for page in site_pages(site_dir)}
+
+
+def _kb(size: int) -> str:
+    return f'{size / 1024:.1f}'
+
+
+def print_table(source: Dict[str, Dict[str, int]], built: Dict[str, Dict[str, int]]):
+    print(f"{'page':<24} {'source KB':>10} {'built KB':>9} {'saved':>7} {'html':>7} {'css':>7} {'js':>6} "
+          f"{'images':>8} {'reqs':>5} {'deferred':>9}")
+    for page, weights in built.items():
+        before = source.get(page, {}).get('initial', 0)
+        saved = f"{100 * (1 - weights['initial'] / before):.1f}%" if before else '-'
+        print(f"{page:<24} {_kb(before):>10} {_kb(weights['initial']):>9} {saved:>7} {_kb(weights['html']):>7} "
+              f"{_kb(weights['css']):>7} {_kb(weights['js']):>6} {_kb(weights['images']):>8} "
+              f"{weights['requests']:>5} {_kb(weights['deferred_images']):>9}")
+    before = sum(weights['initial'] for weights in source.values())
+    after = sum(weights['initial'] for weights in built.values())
+    print(f"\n{'total':<24} {_kb(before):>10} {_kb(after):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Initial transfer size of each page, as written and as built')
+    parser.add_argument('--source', default=SITE_DIR, help='Site root (default: repository root)')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='Built site directory')
+    parser.add_argument('--build', action='store_true', help='Run the site build first')
+    parser.add_argument('--viewport', type=int, default=1280, help='Viewport width in CSS pixels')
+    parser.add_argument('--dpr', type=float, default=1.0, help='Device pixel ratio')
+    parser.add_argument('--budget-kb', type=float, help='Fail if any built page transfers more than this on load')
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args()
+
+    out_dir = os.path.join(args.source, args.out)
+    if args.build or not os.path.isdir(out_dir):
+        build_site(args.source, out_dir=args.out)
+    source = measure(args.source, args.viewport, args.dpr)
+    built = measure(out_dir, args.viewport, args.dpr)
+    print_table(source, built)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'viewport': args.viewport, 'dpr': args.dpr, 'source': source, 'built': built}, f, indent=2)
+
+    if args.budget_kb is not None:
+        over = [page for page, weights in built.items() if weights['initial'] > args.budget_kb * 1024]
+        if over:
+            print(f"\nOver the {args.budget_kb:.0f} KB initial-load budget: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
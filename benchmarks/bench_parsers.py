@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for every source parser, job filter and relevance scorer.
+
+Runs the production parsing code over synthetic (or recorded) API responses of
+up to 1M postings, reports throughput and peak memory, and compares the results
+against a stored baseline to catch regressions. No network access is needed.
+
+Usage:
+    python -m benchmarks.bench_parsers --postings 100000
+    python -m benchmarks.bench_parsers --postings 1000000 --batch-size 50000
+    python -m benchmarks.bench_parsers --save-baseline
+    python -m benchmarks.bench_parsers --fixtures-dir benchmarks/fixtures --record 2000
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import GENERATORS, iter_batches, record_fixtures, response_size
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+MAX_POSTINGS = 1_000_000
+
+
+def build_targets() -> Dict[str, Dict]:
+    """Map benchmark names to the callable under test and the fixture source it consumes."""
+    from legitimate_job_scraper import LegitimateJobScraper
+    from real_job_sources import RealJobSources
+    from linkedin_api_approach import LinkedInOfficialAPI
+    from linkedin_scraper import LinkedInJobScraper
+    from job_scraper_agent import JobScraperAgent
+    from updated_job_scraper_agent import UpdatedJobScraperAgent
+    from near_dup import DuplicateDetector
+
+    legitimate = LegitimateJobScraper()
+    real = RealJobSources()
+    linkedin_api = LinkedInOfficialAPI('offline-benchmark')
+    # Skip __init__ so no browser is started; _is_valid_job only needs Config
+    linkedin = LinkedInJobScraper.__new__(LinkedInJobScraper)
+    linkedin.driver = None
+
+    def each(predicate: Callable) -> Callable:
+        return lambda jobs: [job for job in jobs if predicate(job)]
+
+    def near_duplicates(jobs):
+        detector = DuplicateDetector()
+        return [job for job in jobs if detector.add_if_new(job)]
+
+    return {
+        'parse.adzuna': {'source': 'adzuna', 'run': legitimate._parse_adzuna_results},
+        'parse.serpapi': {'source': 'serpapi', 'run': legitimate._parse_serpapi_results},
+        'parse.remoteok': {'source': 'remoteok',
+                           'run': lambda data: real._parse_remoteok_results(data, 'hardware manager', len(data))},
+        'parse.wttj': {'source': 'wttj', 'run': legitimate._parse_wttj_results},
+        'parse.indeed': {'source': 'indeed', 'run': legitimate._parse_indeed_results},
+        'parse.linkedin_api': {'source': 'linkedin_api', 'run': linkedin_api._parse_job_results},
+        'filter.hardware_manager': {'source': 'jobs', 'run': each(legitimate._is_hardware_manager_job)},
+        'filter.ny_location': {'source': 'jobs', 'run': each(real._is_ny_location)},
+        'filter.linkedin_valid': {'source': 'jobs', 'run': each(linkedin._is_valid_job)},
+        'dedup.near_duplicate': {'source': 'jobs', 'run': near_duplicates},
+        'score.updated_agent': {'source': 'jobs', 'run': UpdatedJobScraperAgent().sort_jobs_by_relevance},
+        'score.linkedin_agent': {'source': 'jobs', 'run': JobScraperAgent().sort_jobs_by_relevance},
+    }
+
+
+def _batches(target: Dict, args, parse_jobs: Callable):
+    """Yield (input, postings) pairs for a target; job-level targets get parsed LinkedIn API jobs."""
+    source = target['source']
+    fixture_source = 'linkedin_api' if source == 'jobs' else source
+    for response in iter_batches(fixture_source, args.postings, args.batch_size,
+                                 description_length=args.description_length,
+                                 seed=args.seed, fixtures_dir=args.fixtures_dir):
+        if source == 'jobs':
+            jobs = parse_jobs(response)
+            yield jobs, len(jobs)
+        else:
+            yield response, response_size(response)
+
+
+def run_target(name: str, target: Dict, args, parse_jobs: Callable) -> Dict:
+    """Time a target over all batches, then measure peak memory on one batch."""
+    elapsed = 0.0
+    postings = 0
+    output = 0
+    first_batch = None
+    for data, size in _batches(target, args, parse_jobs):
+        if first_batch is None:
+            first_batch = data
+        gc.collect()
+        start = time.perf_counter()
+        result = target['run'](data)
+        elapsed += time.perf_counter() - start
+        postings += size
+        output += len(result)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    target['run'](first_batch)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'postings': postings,
+        'output': output,
+        'seconds': round(elapsed, 4),
+        'throughput': round(postings / elapsed, 1) if elapsed else 0.0,
+        'peak_mb': round(peak / (1024 * 1024), 3),
+        'batch_size': min(args.batch_size, args.postings),
+    }
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Return regression messages for results worse than baseline by more than tolerance."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if result['throughput'] < reference['throughput'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput']:,.0f}/s vs baseline {reference['throughput']:,.0f}/s")
+        if reference.get('peak_mb') and result['batch_size'] == reference.get('batch_size') \
+                and result['peak_mb'] > reference['peak_mb'] * (1 + tolerance):
+            regressions.append(
+                f"{name}: peak memory {result['peak_mb']:.2f} MB vs baseline {reference['peak_mb']:.2f} MB")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict], baseline: Dict[str, Dict]):
+    header = f"{'benchmark':<26} {'postings':>10} {'kept':>9} {'seconds':>9} {'postings/s':>12} {'peak MB':>9} {'vs base':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        reference = baseline.get(name)
+        delta = f"{result['throughput'] / reference['throughput']:.2f}x" if reference and reference.get('throughput') else '-'
+        print(f"{name:<26} {result['postings']:>10,} {result['output']:>9,} {result['seconds']:>9.3f} "
+              f"{result['throughput']:>12,.0f} {result['peak_mb']:>9.2f} {delta:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline parser/filter/scorer benchmark')
+    parser.add_argument('--postings', type=int, default=100_000, help='Postings per benchmark (max 1,000,000)')
+    parser.add_argument('--batch-size', type=int, default=50_000, help='Postings per generated response')
+    parser.add_argument('--description-length', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', action='append', help='Run only benchmarks starting with this prefix')
+    parser.add_argument('--fixtures-dir', help='Directory of recorded <source>.json responses to replay')
+    parser.add_argument('--record', type=int, metavar='N',
+                        help='Write N-posting synthetic fixtures to --fixtures-dir and exit')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed fractional regression')
+    parser.add_argument('--json', help='Also write results to this file')
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.fixtures_dir:
+            parser.error('--record requires --fixtures-dir')
+        record_fixtures(args.fixtures_dir, args.record, args.description_length, args.seed)
+        print(f"Wrote fixtures for {', '.join(GENERATORS)} to {args.fixtures_dir}")
+        return 0
+
+    if not 0 < args.postings <= MAX_POSTINGS:
+        parser.error(f'--postings must be between 1 and {MAX_POSTINGS:,}')
+
+    # Parsers log per-record warnings on malformed data; keep benchmark output clean
+    logging.disable(logging.WARNING)
+
+    targets = build_targets()
+    parse_jobs = targets['parse.linkedin_api']['run']
+    if args.only:
+        targets = {name: target for name, target in targets.items()
+                   if any(name.startswith(prefix) for prefix in args.only)}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+
+    results = {name: run_target(name, target, args, parse_jobs) for name, target in targets.items()}
+    print_table(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent=2)
+
+    if args.save_baseline:
+        stored = {'postings': args.postings, 'batch_size': args.batch_size,
+                  'description_length': args.description_length,
+                  'python': platform.python_version(), 'machine': platform.machine(),
+                  'results': {**baseline, **results}}
+        with open(args.baseline, 'w') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print('\nRegressions against baseline:')
+        for message in regressions:
+            print(f'  - {message}')
+        return 1
+    if baseline:
+        print(f"\nNo regressions beyond {args.tolerance:.0%} of baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Synthetic and recorded API fixtures for the offline parser benchmarks.
+
+Each generator returns a raw API response shaped like the live source, so the
+production _parse_* functions can run over it unchanged.
+"""
+import json
+import os
+import random
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List
+
+TITLES = [
+    'Senior Hardware Engineering Manager', 'Hardware Manager', 'Director of Hardware Engineering',
+    'Hardware Product Manager', 'Technical Manager, Hardware Systems', 'Engineering Manager - Devices',
+    'Software Engineer', 'Data Analyst', 'Account Executive', 'Head of Hardware', 'Marketing Lead',
+    'Staff Electrical Engineer', 'Product Manager, Consumer Hardware', 'Customer Success Manager',
+]
+COMPANIES = [
+    'TechCorp Inc.', 'InnovateTech Solutions', 'StartupX', 'GlobalTech Corp', 'AI Innovations Ltd.',
+    'Acme Robotics', 'Brooklyn Devices', 'Hudson Silicon', 'Empire Wearables', 'Gotham Labs',
+]
+LOCATIONS = [
+    'New York, NY', 'Brooklyn, NY', 'Manhattan, NY', 'Queens, NY', 'Jersey City, NJ',
+    'San Francisco, CA', 'Austin, TX', 'Remote', 'Boston, MA', 'Seattle, WA',
+]
+WORDS = (
+    'lead hardware teams embedded systems manufacturing supply chain firmware validation '
+    'roadmap cross-functional stakeholders prototypes reliability compliance budget hiring '
+    'mentor strategy consumer electronics sensors product launch quality design review'
+).split()
+
+
+DESCRIPTION_POOL_SIZE = 512
+
+
+@lru_cache(maxsize=8)
+def _description_pool(length: int) -> tuple:
+    """Pre-built descriptions of the requested length, so generation stays cheap at 1M postings."""
+    rng = random.Random(length)
+    pool = []
+    for _ in range(DESCRIPTION_POOL_SIZE):
+        words = []
+        size = 0
+        while size < length:
+            word = rng.choice(WORDS)
+            words.append(word)
+            size += len(word) + 1
+        pool.append(' '.join(words)[:length])
+    return tuple(pool)
+
+
+def _description(rng: random.Random, length: int) -> str:
+    return _description_pool(length)[rng.randrange(DESCRIPTION_POOL_SIZE)]
+
+
+def _salary_range(rng: random.Random):
+    low = rng.randrange(90, 260) * 1000
+    return low, low + rng.randrange(10, 80) * 1000
+
+
+def adzuna_response(rng: random.Random, count: int, description_length: int) -> Dict:
+    results = []
+    for i in range(count):
+        low, high = _salary_range(rng)
+        results.append({
+            'id': str(4000000000 + i),
+            'title': rng.choice(TITLES),
+            'company': {'display_name': rng.choice(COMPANIES)},
+            'location': {'display_name': rng.choice(LOCATIONS)},
+            'salary_min': low if rng.random() < 0.7 else None,
+            'salary_max': high,
+            'description': _description(rng, description_length),
+            'redirect_url': f'https://www.adzuna.com/land/ad/{4000000000 + i}?se=abc&utm_medium=api&v=1',
+        })
+    return {'results': results, 'count': count}
+
+
+def serpapi_response(rng: random.Random, count: int, description_length: int) -> Dict:
+    results = []
+    for i in range(count):
+        low, high = _salary_range(rng)
+        job = {
+            'title': rng.choice(TITLES),
+            'company_name': rng.choice(COMPANIES),
+            'location': rng.choice(LOCATIONS),
+            'description': _description(rng, description_length),
+            'job_id': f'eyJqb2JfdGl0bGUiOi{i:012d}',
+            'apply_options': [{'title': 'LinkedIn', 'link': f'https://www.linkedin.com/jobs/view/{3700000000 + i}?utm_campaign=google_jobs_apply'}],
+        }
+        if rng.random() < 0.5:
+            job['salary'] = {'salary_text': f'${low // 1000}K–${high // 1000}K a year'}
+        results.append(job)
+    return {'jobs_results': results}
+
+
+def remoteok_response(rng: random.Random, count: int, description_length: int) -> List:
+    results = [{'legal': 'API Terms of Service'}]
+    for i in range(count):
+        low, high = _salary_range(rng)
+        results.append({
+            'id': str(100000 + i),
+            'position': rng.choice(TITLES),
+            'company': rng.choice(COMPANIES),
+            'salary': f'${low:,} - ${high:,}' if rng.random() < 0.5 else 'Not specified',
+            'description': _description(rng, description_length),
+            'url': f'https://remoteok.com/remote-jobs/{100000 + i}',
+        })
+    return results
+
+
+def wttj_response(rng: random.Random, count: int, description_length: int) -> Dict:
+    jobs = []
+    for i in range(count):
+        low, high = _salary_range(rng)
+        city, _, region = rng.choice(LOCATIONS).partition(', ')
+        jobs.append({
+            'name': rng.choice(TITLES),
+            'organization': {'name': rng.choice(COMPANIES)},
+            'place': {'city': city, 'country': region or 'US'},
+            'salary': {'min': low, 'max': high, 'currency': '$'} if rng.random() < 0.6 else {},
+            'description': _description(rng, description_length),
+            'websites_urls': {'job_details': f'https://www.welcometothejungle.com/en/companies/acme/jobs/job-{i}'},
+        })
+    return {'jobs': jobs}
+
+
+def indeed_response(rng: random.Random, count: int, description_length: int) -> Dict:
+    results = []
+    for i in range(count):
+        low, high = _salary_range(rng)
+        results.append({
+            'jobtitle': rng.choice(TITLES),
+            'company': rng.choice(COMPANIES),
+            'formattedLocation': rng.choice(LOCATIONS),
+            'salary': f'${low:,} - ${high:,} a year' if rng.random() < 0.5 else 'Not specified',
+            'snippet': _description(rng, description_length),
+            'url': f'https://www.indeed.com/viewjob?jk={i:016x}&from=serp&tk=1abc',
+        })
+    return {'results': results}
+
+
+def linkedin_api_response(rng: random.Random, count: int, description_length: int) -> Dict:
+    elements = []
+    for i in range(count):
+        low, high = _salary_range(rng)
+        element = {
+            'title': rng.choice(TITLES),
+            'companyDetails': {'company': {'name': rng.choice(COMPANIES)}},
+            'location': {'name': rng.choice(LOCATIONS)},
+            'description': {'text': _description(rng, description_length)},
+            'jobPostingUrl': f'https://www.linkedin.com/jobs/view/{3800000000 + i}/?trackingId=abc%3D%3D&refId=xyz',
+        }
+        if rng.random() < 0.4:
+            element['salaryInfo'] = {'currency': 'USD', 'min': low, 'max': high}
+        elements.append(element)
+    return {'elements': elements}
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int, int], object]] = {
+    'adzuna': adzuna_response,
+    'serpapi': serpapi_response,
+    'remoteok': remoteok_response,
+    'wttj': wttj_response,
+    'indeed': indeed_response,
+    'linkedin_api': linkedin_api_response,
+}
+
+
+def response_size(response) -> int:
+    """Number of postings in a raw response."""
+    if isinstance(response, list):
+        return sum(1 for item in response if isinstance(item, dict) and item.get('position'))
+    for key in ('results', 'jobs_results', 'jobs', 'elements'):
+        if key in response:
+            return len(response[key])
+    return 0
+
+
+def _replicate(response, count: int):
+    """Repeat a recorded response's postings until it holds count postings."""
+    if isinstance(response, list):
+        header = [item for item in response if not (isinstance(item, dict) and item.get('position'))]
+        items = [item for item in response if isinstance(item, dict) and item.get('position')]
+        return header + [items[i % len(items)] for i in range(count)] if items else response
+    for key in ('results', 'jobs_results', 'jobs', 'elements'):
+        if key in response and response[key]:
+            items = response[key]
+            return {**response, key: [items[i % len(items)] for i in range(count)]}
+    return response
+
+
+def iter_batches(source: str, total: int, batch_size: int, description_length: int = 500,
+                 seed: int = 0, fixtures_dir: str = None) -> Iterator:
+    """
+    Yield raw responses for a source until total postings have been produced.
+
+    Recorded fixtures (<fixtures_dir>/<source>.json) are replicated when present,
+    otherwise postings are generated from a seeded RNG so runs are repeatable.
+    """
+    recorded = None
+    if fixtures_dir:
+        path = os.path.join(fixtures_dir, f'{source}.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                recorded = json.load(f)
+
+    rng = random.Random(f'{seed}:{source}')
+    produced = 0
+    while produced < total:
+        count = min(batch_size, total - produced)
+        if recorded is not None:
+            yield _replicate(recorded, count)
+        else:
+            yield GENERATORS[source](rng, count, description_length)
+        produced += count
+
+
+def record_fixtures(fixtures_dir: str, count: int, description_length: int = 500, seed: int = 0):
+    """Write one synthetic response per source to fixtures_dir."""
+    os.makedirs(fixtures_dir, exist_ok=True)
+    for source, generator in GENERATORS.items():
+        response = generator(random.Random(f'{seed}:{source}'), count, description_length)
+        with open(os.path.join(fixtures_dir, f'{source}.json'), 'w') as f:
+            json.dump(response, f)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of the legitimate-sources pipeline against the local mock.
+
+Starts benchmarks/mock_job_board.py in-process, points Config at it, and runs the
+full scrape -> score -> Google Sheets write path repeatedly (optionally from
+several worker threads) to measure throughput, latency percentiles and how the
+retry layer copes with injected latency, 5xx errors and 429 rate limits.
+
+Usage:
+    python benchmarks/load_test.py --runs 20 --concurrency 4
+    python benchmarks/load_test.py --runs 10 --latency-ms 100 --error-rate 0.1 --rate-limit-rate 0.05
+    python benchmarks/load_test.py --target http://127.0.0.1:8765   # use an already running mock
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_job_board import MockSettings, start_mock_server
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def configure(env: Dict[str, str], args):
+    """Point Config and the API-key environment variables at the mock."""
+    from config import Config
+
+    for key, value in env.items():
+        os.environ[key] = value
+        setattr(Config, key, value)
+    os.environ.setdefault('ADZUNA_APP_ID', 'load-test')
+    os.environ.setdefault('ADZUNA_APP_KEY', 'load-test')
+    os.environ.setdefault('SERPAPI_KEY', 'load-test')
+    Config.GOOGLE_SHEET_ID = args.spreadsheet_id
+    # A missing credentials file makes the Sheets client use anonymous credentials for the mock
+    Config.GOOGLE_CREDENTIALS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'no-credentials.json')
+    Config.SOURCE_DELAY = 0
+    Config.RETRY_DELAY = args.retry_delay
+    Config.RETRY_MAX_DELAY = max(args.retry_delay, args.retry_after)
+    Config.MAX_RESULTS = args.limit
+    # The mock simulates 429s itself; the client-side quota budget would only cap throughput
+    Config.SHEETS_REQUESTS_PER_MINUTE = args.sheets_rpm
+
+
+def run_pipeline(worker: threading.local, args) -> Dict:
+    """One scrape -> score -> sheet write cycle, timed per phase."""
+    from config import Config
+    from google_sheets import GoogleSheetsManager
+    from legitimate_job_scraper import LegitimateJobScraper
+    from updated_job_scraper_agent import UpdatedJobScraperAgent
+
+    # httplib2 connections are not thread-safe, so each worker keeps its own clients
+    if not hasattr(worker, 'sheets'):
+        worker.scraper = LegitimateJobScraper()
+        worker.agent = UpdatedJobScraperAgent()
+        worker.sheets = GoogleSheetsManager()
+
+    result = {'error': None, 'found': 0, 'added': 0}
+    start = time.perf_counter()
+    try:
+        jobs = worker.scraper.scrape_all_sources(limit=Config.MAX_RESULTS)
+        result['scrape'] = time.perf_counter() - start
+        result['found'] = len(jobs)
+        top_jobs = worker.agent.sort_jobs_by_relevance(jobs)[:Config.MAX_RESULTS]
+        sheets_start = time.perf_counter()
+        with worker.sheets.batch():
+            worker.sheets.create_sheet_if_not_exists()
+            result['added'] = worker.sheets.add_jobs_to_sheet(top_jobs)
+        result['sheets'] = time.perf_counter() - sheets_start
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['total'] = time.perf_counter() - start
+    return result
+
+
+def fetch_stats(base_url: str) -> Dict:
+    import requests
+    try:
+        return requests.get(f"{base_url}/__stats", timeout=5).json().get('routes', {})
+    except Exception as e:
+        logger.warning(f"Could not read mock stats: {e}")
+        return {}
+
+
+def print_report(results: List[Dict], elapsed: float, stats: Dict, args):
+    totals = [r['total'] for r in results if not r['error']]
+    print(f"\nRuns: {len(results)}  concurrency: {args.concurrency}  wall time: {elapsed:.2f}s  "
+          f"throughput: {len(results) / elapsed:.2f} runs/s")
+    print(f"Jobs found: {sum(r['found'] for r in results):,}  added to sheet: {sum(r['added'] for r in results):,}  "
+          f"failed runs: {sum(1 for r in results if r['error'])}")
+
+    header = f"{'phase':<10} {'p50 s':>8} {'p95 s':>8} {'max s':>8}"
+    print(f"\n{header}\n{'-' * len(header)}")
+    for phase in ('scrape', 'sheets', 'total'):
+        values = [r[phase] for r in results if phase in r]
+        if values:
+            print(f"{phase:<10} {percentile(values, 0.5):>8.3f} {percentile(values, 0.95):>8.3f} {max(values):>8.3f}")
+
+    if stats:
+        header = f"{'mock route':<14} {'requests':>9} {'errors':>7}"
+        print(f"\n{header}\n{'-' * len(header)}")
+        for route, counts in sorted(stats.items()):
+            print(f"{route:<14} {counts['requests']:>9} {counts['errors']:>7}")
+
+    from retry import get_retry_metrics
+    retries = {name: s for name, s in get_retry_metrics().items() if s['retries'] or s['failures']}
+    if retries:
+        header = f"{'retried call':<24} {'retries':>8} {'failures':>9} {'backoff s':>10}"
+        print(f"\n{header}\n{'-' * len(header)}")
+        for name, s in sorted(retries.items()):
+            print(f"{name:<24} {s['retries']:>8} {s['failures']:>9} {s['sleep_seconds']:>10.2f}")
+
+    errors = [r['error'] for r in results if r['error']]
+    if errors:
+        print('\nErrors:')
+        for message in errors[:10]:
+            print(f"  - {message}")
+    if not totals:
+        print('\nNo run completed successfully')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end load test against the mock job board')
+    parser.add_argument('--runs', type=int, default=10, help='Pipeline runs to execute')
+    parser.add_argument('--concurrency', type=int, default=1, help='Worker threads')
+    parser.add_argument('--limit', type=int, default=30, help='MAX_RESULTS per run')
+    parser.add_argument('--target', help='Base URL of an already running mock; default starts one in-process')
+    parser.add_argument('--spreadsheet-id', default='load-test-sheet')
+    parser.add_argument('--retry-delay', type=float, default=0.05, help='Base retry delay in seconds')
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=float, default=0.1)
+    parser.add_argument('--sheets-rpm', type=int, default=0,
+                        help='Client-side Sheets requests per minute (0 disables the budget)')
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--description-length', type=int, default=500)
+    parser.add_argument('--json', help='Also write per-run results to this file')
+    parser.add_argument('--verbose', action='store_true', help='Show agent logging')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    server = None
+    if args.target:
+        base_url = args.target.rstrip('/')
+        env = {
+            'ADZUNA_API_URL': f"{base_url}/v1/api/jobs/us/search",
+            'SERPAPI_URL': f"{base_url}/search",
+            'REMOTEOK_API_URL': f"{base_url}/api",
+            'INDEED_API_URL': f"{base_url}/ads/apisearch",
+            'JOBAPI_URL': f"{base_url}/api/1.0/search",
+            'WTTJ_API_URL': f"{base_url}/api/v2/jobs",
+            'SHEETS_API_ENDPOINT': f"{base_url}/",
+        }
+    else:
+        server = start_mock_server(MockSettings(
+            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, page_size=args.page_size,
+            pages=args.pages, description_length=args.description_length,
+        ))
+        base_url = server.base_url
+        env = server.env()
+    configure(env, args)
+
+    worker = threading.local()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: run_pipeline(worker, args), range(args.runs)))
+    elapsed = time.perf_counter() - start
+
+    print_report(results, elapsed, fetch_stats(base_url), args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'elapsed': elapsed, 'runs': results}, f, indent=2)
+    if server:
+        server.shutdown()
+        server.server_close()
+    return 1 if all(r['error'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
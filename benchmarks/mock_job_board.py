@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Adzuna, SerpAPI, RemoteOK, Indeed, Reed and Welcome to
+the Jungle job APIs plus the Google Sheets values endpoints, for end-to-end load testing.
+
+Latency, error rates, pagination and payload sizes are configurable, so the
+agent's throughput and failure handling can be exercised on one machine.
+
+Usage:
+    python benchmarks/mock_job_board.py --port 8765 --latency-ms 80 --error-rate 0.05
+
+Then point the agent at it through .env:
+    ADZUNA_API_URL=http://127.0.0.1:8765/v1/api/jobs/us/search
+    SERPAPI_URL=http://127.0.0.1:8765/search
+    REMOTEOK_API_URL=http://127.0.0.1:8765/api
+    INDEED_API_URL=http://127.0.0.1:8765/ads/apisearch
+    JOBAPI_URL=http://127.0.0.1:8765/api/1.0/search
+    WTTJ_API_URL=http://127.0.0.1:8765/api/v2/jobs
+    SHEETS_API_ENDPOINT=http://127.0.0.1:8765/
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import GENERATORS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MockSettings:
+    """Behaviour knobs for the mock server."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0  # Fraction of requests answered with a 5xx
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with 429 + Retry-After
+    retry_after: float = 1.0
+    page_size: int = 20
+    pages: int = 5
+    description_length: int = 500
+    seed: int = 0
+
+
+def column_index(letters: str) -> int:
+    """Convert A1 column letters to a 0-based index."""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + (ord(char) - ord('A') + 1)
+    return index - 1
+
+
+_CELL = re.compile(r'^([A-Za-z]*)(\d*)$')
+
+
+def parse_a1(range_name: str) -> Tuple[str, int, Optional[int], int, Optional[int]]:
+    """
+    Parse 'Sheet!A1:H10' style ranges.
+
+    Returns:
+        (sheet, first_row, last_row, first_col, last_col) with 0-based indexes;
+        open-ended rows/columns are None.
+    """
+    sheet, _, cells = range_name.rpartition('!')
+    if not sheet:
+        sheet, cells = cells, ''
+    sheet = sheet.strip("'")
+    if not cells:
+        return sheet, 0, None, 0, None
+    start, _, end = cells.partition(':')
+    start_col, start_row = _CELL.match(start).groups()
+    end_col, end_row = _CELL.match(end or start).groups()
+    return (
+        sheet,
+        int(start_row) - 1 if start_row else 0,
+        int(end_row) - 1 if end_row else None,
+        column_index(start_col) if start_col else 0,
+        column_index(end_col) if end_col else None,
+    )
+
+
+class MockSpreadsheetStore:
+    """In-memory spreadsheets keyed by id, then sheet title, as lists of rows."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sheets: Dict[str, Dict[str, List[List]]] = {}
+
+    def _sheet(self, spreadsheet_id: str, title: str) -> List[List]:
+        return self._sheets.setdefault(spreadsheet_id, {}).setdefault(title, [])
+
+    def metadata(self, spreadsheet_id: str) -> Dict:
+        with self._lock:
+            sheets = self._sheets.setdefault(spreadsheet_id, {'Sheet1': []})
+            return {
+                'spreadsheetId': spreadsheet_id,
+                'sheets': [{'properties': {'sheetId': i, 'title': title,
+                                           'gridProperties': {'rowCount': max(1000, len(rows))}}}
+                           for i, (title, rows) in enumerate(sheets.items())],
+            }
+
+    def add_sheet(self, spreadsheet_id: str, title: str):
+        with self._lock:
+            self._sheet(spreadsheet_id, title)
+
+    def get(self, spreadsheet_id: str, range_name: str) -> Dict:
+        title, first_row, last_row, first_col, last_col = parse_a1(range_name)
+        with self._lock:
+            rows = self._sheet(spreadsheet_id, title)
+            selected = rows[first_row:None if last_row is None else last_row + 1]
+            values = [list(row[first_col:None if last_col is None else last_col + 1]) for row in selected]
+        # Google trims trailing empty cells and rows
+        for row in values:
+            while row and row[-1] in ('', None):
+                row.pop()
+        while values and not values[-1]:
+            values.pop()
+        result = {'range': range_name, 'majorDimension': 'ROWS'}
+        if values:
+            result['values'] = values
+        return result
+
+    def update(self, spreadsheet_id: str, range_name: str, values: List[List]) -> Dict:
+        title, first_row, _, first_col, _ = parse_a1(range_name)
+        with self._lock:
+            rows = self._sheet(spreadsheet_id, title)
+            self._write(rows, first_row, first_col, values)
+        return {'spreadsheetId': spreadsheet_id, 'updatedRange': range_name,
+                'updatedRows': len(values), 'updatedCells': sum(len(row) for row in values)}
+
+    def append(self, spreadsheet_id: str, range_name: str, values: List[List]) -> Dict:
+        title, _, _, first_col, _ = parse_a1(range_name)
+        with self._lock:
+            rows = self._sheet(spreadsheet_id, title)
+            start = len(rows)
+            self._write(rows, start, first_col, values)
+        return {'spreadsheetId': spreadsheet_id, 'tableRange': range_name,
+                'updates': {'updatedRange': f"{title}!A{start + 1}", 'updatedRows': len(values),
+                            'updatedCells': sum(len(row) for row in values)}}
+
+    @staticmethod
+    def _write(rows: List[List], first_row: int, first_col: int, values: List[List]):
+        while len(rows) < first_row + len(values):
+            rows.append([])
+        for offset, new_row in enumerate(values):
+            row = rows[first_row + offset]
+            while len(row) < first_col + len(new_row):
+                row.append('')
+            row[first_col:first_col + len(new_row)] = new_row
+
+
+class MockJobBoardServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock's settings, data and request stats."""
+
+    daemon_threads = True
+
+    def __init__(self, address, settings: MockSettings):
+        super().__init__(address, MockJobBoardHandler)
+        self.settings = settings
+        self.store = MockSpreadsheetStore()
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(settings.seed)
+        self._rng_lock = threading.Lock()
+
+    def random(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def count(self, route: str, status: int):
+        with self._stats_lock:
+            route_stats = self.stats.setdefault(route, {'requests': 0, 'errors': 0})
+            route_stats['requests'] += 1
+            if status >= 400:
+                route_stats['errors'] += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides that point the agent at this server."""
+        return {
+            'ADZUNA_API_URL': f"{self.base_url}/v1/api/jobs/us/search",
+            'SERPAPI_URL': f"{self.base_url}/search",
+            'REMOTEOK_API_URL': f"{self.base_url}/api",
+            'INDEED_API_URL': f"{self.base_url}/ads/apisearch",
+            'JOBAPI_URL': f"{self.base_url}/api/1.0/search",
+            'WTTJ_API_URL': f"{self.base_url}/api/v2/jobs",
+            'SHEETS_API_ENDPOINT': f"{self.base_url}/",
+        }
+
+
+class MockJobBoardHandler(BaseHTTPRequestHandler):
+    """Routes requests to the imitated job board and Sheets endpoints."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    # -- helpers ---------------------------------------------------------
+
+    def _send_json(self, route: str, status: int, payload, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(route, status)
+
+    def _simulate(self, route: str) -> bool:
+        """Apply latency and injected failures; returns False if a failure was sent."""
+        settings = self.server.settings
+        delay = settings.latency_ms + (self.server.random() * 2 - 1) * settings.jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        roll = self.server.random()
+        if roll < settings.rate_limit_rate:
+            self._send_json(route, 429, {'error': {'code': 429, 'message': 'Rate limit exceeded'}},
+                            {'Retry-After': f"{settings.retry_after:g}"})
+            return False
+        if roll < settings.rate_limit_rate + settings.error_rate:
+            status = 503 if self.server.random() < 0.5 else 500
+            self._send_json(route, status, {'error': {'code': status, 'message': 'Injected failure'}})
+            return False
+        return True
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def _postings(self, source: str, page: int):
+        """Generate one page of postings; pages past the configured count are empty."""
+        settings = self.server.settings
+        count = settings.page_size if 1 <= page <= settings.pages else 0
+        rng = random.Random(f"{settings.seed}:{source}:{page}")
+        return GENERATORS[source](rng, count, settings.description_length)
+
+    def _reed_postings(self, page: int) -> Dict:
+        """Reed-shaped results for the JobAPI source, derived from the Adzuna generator."""
+        results = []
+        for job in self._postings('adzuna', page)['results']:
+            results.append({
+                'jobTitle': job['title'],
+                'employerName': job['company']['display_name'],
+                'locationName': job['location']['display_name'],
+                'minimumSalary': job['salary_min'],
+                'maximumSalary': job['salary_max'],
+                'jobDescription': job['description'],
+                'jobUrl': f"https://www.reed.co.uk/jobs/{job['id']}",
+            })
+        return {'results': results, 'totalResults': len(results)}
+
+    # -- routing ---------------------------------------------------------
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def _dispatch(self, method: str):
+        parsed = urlparse(self.path)
+        path = unquote(parsed.path)
+        query = parse_qs(parsed.query)
+
+        if path == '/__stats':
+            self._send_json('stats', 200, {'routes': self.server.stats})
+            return
+
+        sheets = re.match(r'^/v4/spreadsheets/([^/:]+)(.*)$', path)
+        if sheets:
+            route = f"sheets.{method.lower()}"
+            if self._simulate(route):
+                self._sheets(route, method, sheets.group(1), sheets.group(2), query)
+            return
+
+        adzuna = re.match(r'^/v1/api/jobs/\w+/search/(\d+)$', path)
+        if adzuna and method == 'GET':
+            if self._simulate('adzuna'):
+                data = self._postings('adzuna', int(adzuna.group(1)))
+                data['count'] = self.server.settings.page_size * self.server.settings.pages
+                self._send_json('adzuna', 200, data)
+            return
+
+        if path == '/search' and method == 'GET':
+            if self._simulate('serpapi'):
+                start = int(query.get('start', ['0'])[0])
+                page = start // self.server.settings.page_size + 1
+                data = self._postings('serpapi', page)
+                if page < self.server.settings.pages:
+                    data['serpapi_pagination'] = {'next': f"{self.server.base_url}/search?start={start + self.server.settings.page_size}"}
+                self._send_json('serpapi', 200, data)
+            return
+
+        if path == '/api' and method == 'GET':
+            if self._simulate('remoteok'):
+                data = self._postings('remoteok', 1)
+                for page in range(2, self.server.settings.pages + 1):
+                    data.extend(self._postings('remoteok', page)[1:])
+                self._send_json('remoteok', 200, data)
+            return
+
+        if path == '/ads/apisearch' and method == 'GET':
+            if self._simulate('indeed'):
+                start = int(query.get('start', ['0'])[0])
+                self._send_json('indeed', 200, self._postings('indeed', start // self.server.settings.page_size + 1))
+            return
+
+        if path == '/api/1.0/search' and method == 'GET':
+            if self._simulate('jobapi'):
+                skip = int(query.get('resultsToSkip', ['0'])[0])
+                self._send_json('jobapi', 200, self._reed_postings(skip // self.server.settings.page_size + 1))
+            return
+
+        if path == '/api/v2/jobs' and method == 'GET':
+            if self._simulate('wttj'):
+                page = int(query.get('page', ['1'])[0])
+                data = self._postings('wttj', page)
+                data['meta'] = {'page': page, 'total_pages': self.server.settings.pages}
+                self._send_json('wttj', 200, data)
+            return
+
+        self._send_json('unknown', 404, {'error': f'No mock route for {method} {path}'})
+
+    def _sheets(self, route: str, method: str, spreadsheet_id: str, rest: str, query: Dict):
+        store = self.server.store
+        if rest == '' and method == 'GET':
+            self._send_json(route, 200, store.metadata(spreadsheet_id))
+        elif rest == ':batchUpdate' and method == 'POST':
+            replies = []
+            for request in self._read_json().get('requests', []):
+                if 'addSheet' in request:
+                    store.add_sheet(spreadsheet_id, request['addSheet']['properties']['title'])
+                replies.append({})
+            self._send_json(route, 200, {'spreadsheetId': spreadsheet_id, 'replies': replies})
+        elif rest == '/values:batchGet' and method == 'GET':
+            ranges = query.get('ranges', [])
+            self._send_json(route, 200, {'spreadsheetId': spreadsheet_id,
+                                         'valueRanges': [store.get(spreadsheet_id, r) for r in ranges]})
+        elif rest == '/values:batchUpdate' and method == 'POST':
+            body = self._read_json()
+            responses = [store.update(spreadsheet_id, item['range'], item.get('values', []))
+                         for item in body.get('data', [])]
+            self._send_json(route, 200, {'spreadsheetId': spreadsheet_id, 'responses': responses,
+                                         'totalUpdatedRows': sum(r['updatedRows'] for r in responses)})
+        elif rest.startswith('/values/') and rest.endswith(':append') and method == 'POST':
+            range_name = rest[len('/values/'):-len(':append')]
+            self._send_json(route, 200, store.append(spreadsheet_id, range_name, self._read_json().get('values', [])))
+        elif rest.startswith('/values/') and method == 'GET':
+            self._send_json(route, 200, store.get(spreadsheet_id, rest[len('/values/'):]))
+        elif rest.startswith('/values/') and method == 'PUT':
+            range_name = rest[len('/values/'):]
+            self._send_json(route, 200, store.update(spreadsheet_id, range_name, self._read_json().get('values', [])))
+        else:
+            self._send_json(route, 404, {'error': f'No mock Sheets route for {method} {rest}'})
+
+
+def start_mock_server(settings: MockSettings = None, host: str = '127.0.0.1', port: int = 0) -> MockJobBoardServer:
+    """Start the mock server in a daemon thread and return it."""
+    server = MockJobBoardServer((host, port), settings or MockSettings())
+    thread = threading.Thread(target=server.serve_forever, name='mock-job-board', daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock job board and Sheets server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 5xx')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests failing with 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--page-size', type=int, default=20, help='Postings per page')
+    parser.add_argument('--pages', type=int, default=5, help='Pages available per source')
+    parser.add_argument('--description-length', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    settings = MockSettings(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, page_size=args.page_size,
+        pages=args.pages, description_length=args.description_length, seed=args.seed,
+    )
+    server = MockJobBoardServer((args.host, args.port), settings)
+    logger.info(f"Mock job board listening on {server.base_url}")
+    for key, value in server.env().items():
+        logger.info(f"  {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down mock job board")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an SMTP server, for testing inquiry notifications.
+
+Speaks enough SMTP for smtplib (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP,
+QUIT; no STARTTLS or AUTH) and keeps every message it accepts, so tests can
+check what inquiry_notifications sent without a mail account. Latency and a
+rejection rate are configurable to exercise retries. Built on socketserver
+because smtpd is gone from recent Pythons.
+
+Usage:
+    python benchmarks/mock_smtp.py --port 8025 --print
+
+Then point the inquiry service at it through .env:
+    SMTP_HOST=127.0.0.1
+    SMTP_PORT=8025
+    SMTP_STARTTLS=false
+    SMTP_USER=
+"""
+import argparse
+import logging
+import random
+import socketserver
+import threading
+import time
+from dataclasses import dataclass
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MockSMTPSettings:
+    """Behaviour knobs for the mock SMTP server."""
+    latency_ms: float = 0.0  # Delay before answering each command
+    reject_rate: float = 0.0  # Fraction of messages answered with 451 after DATA
+    print_messages: bool = False
+    seed: int = 0
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    recipients: List[str]
+    message: EmailMessage
+
+
+class MockSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded SMTP server holding the mock's settings and the messages it accepted."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, settings: MockSMTPSettings):
+        super().__init__(address, MockSMTPHandler)
+        self.settings = settings
+        self.messages: List[ReceivedMessage] = []
+        self.stats = {'connections': 0, 'accepted': 0, 'rejected': 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(settings.seed)
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def should_reject(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.settings.reject_rate
+
+    def store(self, received: ReceivedMessage):
+        with self._lock:
+            self.messages.append(received)
+            self.stats['accepted'] += 1
+        if self.settings.print_messages:
+            print(f"--- from {received.mail_from} to {', '.join(received.recipients)}\n"
+                  f"{received.message.as_string()}", flush=True)
+
+    def clear(self):
+        with self._lock:
+            self.messages.clear()
+
+    def env(self) -> Dict[str, str]:
+        """Environment overrides that point the inquiry service at this server."""
+        host, port = self.server_address[:2]
+        return {'SMTP_HOST': host, 'SMTP_PORT': str(port), 'SMTP_STARTTLS': 'false', 'SMTP_USER': ''}
+
+
+class MockSMTPHandler(socketserver.StreamRequestHandler):
+    """One SMTP session."""
+
+    def _reply(self, line: str):
+        if self.server.settings.latency_ms:
+            time.sleep(self.server.settings.latency_ms / 1000)
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def _read_data(self) -> bytes:
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line.rstrip(b'\r\n') == b'.':
+                return b''.join(lines)
+            if line.startswith(b'..'):
+                line = line[1:]  # Dot-unstuffing
+            lines.append(line)
+
+    def handle(self):
+        server = self.server
+        server.count('connections')
+        self._reply('220 mock-smtp ESMTP ready')
+        mail_from, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.wfile.write(b'250-mock-smtp\r\n250-8BITMIME\r\n')
+                self._reply('250 SIZE 10485760')
+            elif command == 'HELO':
+                self._reply('250 mock-smtp')
+            elif command == 'MAIL':
+                mail_from, recipients = argument.partition(':')[2].split()[0].strip('<>'), []
+                self._reply('250 OK')
+            elif command == 'RCPT':
+                if mail_from is None:
+                    self._reply('503 Need MAIL first')
+                    continue
+                recipients.append(argument.partition(':')[2].strip().strip('<>'))
+                self._reply('250 OK')
+            elif command == 'DATA':
+                if not recipients:
+                    self._reply('503 Need RCPT first')
+                    continue
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self._read_data()
+                if server.should_reject():
+                    server.count('rejected')
+                    self._reply('451 Temporary failure, try again later')
+                else:
+                    server.store(ReceivedMessage(mail_from, recipients,
+                                                 message_from_bytes(data, policy=policy.default)))
+                    self._reply('250 OK queued')
+                mail_from, recipients = None, []
+            elif command == 'RSET':
+                mail_from, recipients = None, []
+                self._reply('250 OK')
+            elif command == 'NOOP':
+                self._reply('250 OK')
+            elif command == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply(f'502 {command or "Empty command"} not implemented')
+
+
+def start_mock_smtp(settings: MockSMTPSettings = None, host: str = '127.0.0.1', port: int = 0) -> MockSMTPServer:
+    """Start the mock SMTP server in a daemon thread and return it."""
+    server = MockSMTPServer((host, port), settings or MockSMTPSettings())
+    thread = threading.Thread(target=server.serve_forever, name='mock-smtp', daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock SMTP server that records the mail it accepts')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8025)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--reject-rate', type=float, default=0.0, help='Fraction of messages refused with 451')
+    parser.add_argument('--print', dest='print_messages', action='store_true', help='Print each accepted message')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    settings = MockSMTPSettings(latency_ms=args.latency_ms, reject_rate=args.reject_rate,
+                                print_messages=args.print_messages, seed=args.seed)
+    server = MockSMTPServer((args.host, args.port), settings)
+    logger.info(f"Mock SMTP server listening on {args.host}:{server.server_address[1]}")
+    for key, value in server.env().items():
+        logger.info(f"  {key}={value}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info(f"Shutting down mock SMTP server ({server.stats['accepted']} messages accepted)")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
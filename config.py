@@ -34,6 +34,85 @@ class Config:
     # Retry configuration
     MAX_RETRIES = 3
     RETRY_DELAY = 5
+    RETRY_MAX_DELAY = 60  # Cap on a single backoff sleep
+    RETRY_BUDGET = 120  # Total seconds a single call may spend retrying
+    
+    # Instrumentation configuration
+    INSTRUMENTATION_FILE = os.getenv('JOB_SCRAPER_METRICS_FILE', 'run_metrics.jsonl')
+    PROFILER = os.getenv('JOB_SCRAPER_PROFILER', '')  # 'cprofile' or 'pyinstrument'
+    PROFILE_DIR = os.getenv('JOB_SCRAPER_PROFILE_DIR', 'profiles')
+    
+    # Job source endpoints (override to point at a local mock, e.g. benchmarks/mock_job_board.py)
+    ADZUNA_API_URL = os.getenv('ADZUNA_API_URL', 'https://api.adzuna.com/v1/api/jobs/us/search')
+    SERPAPI_URL = os.getenv('SERPAPI_URL', 'https://serpapi.com/search')
+    REMOTEOK_API_URL = os.getenv('REMOTEOK_API_URL', 'https://remoteok.io/api')
+    INDEED_API_URL = os.getenv('INDEED_API_URL', 'https://api.indeed.com/ads/apisearch')
+    JOBAPI_URL = os.getenv('JOBAPI_URL', 'https://www.reed.co.uk/api/1.0/search')
+    WTTJ_API_URL = os.getenv('WTTJ_API_URL', '')  # When set, used instead of probing the public endpoints
+    SHEETS_API_ENDPOINT = os.getenv('SHEETS_API_ENDPOINT', '')  # Empty uses the Google default
+    SHEETS_HTTP_TIMEOUT = float(os.getenv('SHEETS_HTTP_TIMEOUT', '60'))
+    SHEETS_TOKEN_REFRESH_MARGIN = int(os.getenv('SHEETS_TOKEN_REFRESH_MARGIN', '300'))  # Seconds before token expiry
+    SHEETS_REQUESTS_PER_MINUTE = int(os.getenv('SHEETS_REQUESTS_PER_MINUTE', '60'))  # Client-side quota budget (0 disables)
+    SHEET_READ_WINDOW = int(os.getenv('SHEET_READ_WINDOW', '5000'))  # Rows per windowed read of the job sheet
+    SOURCE_DELAY = float(os.getenv('SOURCE_DELAY', '1'))  # Pause between job sources, in seconds
+    
+    # Seen job keys across runs, 8 bytes per job (empty disables)
+    SEEN_INDEX_FILE = os.getenv('JOB_SCRAPER_SEEN_INDEX', 'seen_jobs.idx')
+    # Optional Bloom filter checked before the seen index (e.g. seen_jobs.bloom; off by default,
+    # since a run's few hundred binary searches of the mapped index already take microseconds)
+    SEEN_FILTER_FILE = os.getenv('JOB_SCRAPER_SEEN_FILTER', '')
+    SEEN_FILTER_CAPACITY = int(os.getenv('JOB_SCRAPER_SEEN_FILTER_CAPACITY', '100000'))
+    SEEN_FILTER_ERROR_RATE = float(os.getenv('JOB_SCRAPER_SEEN_FILTER_ERROR_RATE', '0.001'))
+    
+    # Near-duplicate detection (estimated description similarity needed to merge postings)
+    NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', '0.6'))
+    
+    # Run history (Parquet, requires pyarrow; empty disables)
+    HISTORY_DIR = os.getenv('JOB_SCRAPER_HISTORY_DIR', 'history')
+    
+    # Full description archive (empty disables); the sheet keeps a short snippet
+    DESCRIPTION_STORE_DIR = os.getenv('JOB_SCRAPER_DESCRIPTION_DIR', 'descriptions')
+    SHEET_DESCRIPTION_LENGTH = 500
+    # Keyword filters and scorers read only this much of a description, as when parsers cut it to 500
+    DESCRIPTION_MATCH_LENGTH = 500
+    
+    # Website inquiry service (inquiry_service.py), replacing the Apps Script doPost
+    INQUIRY_SHEET_ID = os.getenv('INQUIRY_SHEET_ID', '1rlA9JrJyElCr9NEs31Qsa9QA-4GeSQVX5CQJhbDggoc')
+    INQUIRY_SHEET_NAME = os.getenv('INQUIRY_SHEET_NAME', 'website_inquiries')
+    INQUIRY_EMAIL_TO = os.getenv('INQUIRY_EMAIL_TO', 'ride@from0to2.com')
+    INQUIRY_TIMEZONE = os.getenv('INQUIRY_TIMEZONE', 'America/New_York')  # For the Date/Time columns
+    INQUIRY_HOST = os.getenv('INQUIRY_HOST', '127.0.0.1')
+    INQUIRY_PORT = int(os.getenv('INQUIRY_PORT', '8080'))
+    INQUIRY_ALLOWED_ORIGIN = os.getenv('INQUIRY_ALLOWED_ORIGIN', 'https://from0to2.com')
+    INQUIRY_QUEUE_SIZE = int(os.getenv('INQUIRY_QUEUE_SIZE', '10000'))  # Accepted but unwritten inquiries
+    INQUIRY_BATCH_SIZE = int(os.getenv('INQUIRY_BATCH_SIZE', '200'))  # Rows per sheet append
+    INQUIRY_FLUSH_INTERVAL = float(os.getenv('INQUIRY_FLUSH_INTERVAL', '2'))  # Seconds to collect a batch
+    # Reverse proxies (addresses or CIDR ranges, comma-separated) whose X-Forwarded-For is believed
+    INQUIRY_TRUSTED_PROXIES = [proxy.strip() for proxy in os.getenv('INQUIRY_TRUSTED_PROXIES', '').split(',')
+                               if proxy.strip()]
+    
+    # Outgoing mail for inquiry notifications (empty SMTP_HOST disables them)
+    SMTP_HOST = os.getenv('SMTP_HOST', '')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+    SMTP_USER = os.getenv('SMTP_USER', '')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+    SMTP_FROM = os.getenv('SMTP_FROM', '') or os.getenv('SMTP_USER', '')
+    SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', 'true').lower() in ('1', 'true', 'yes')
+    SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
+    # Inquiry emails: the first goes out at once, later ones in one digest per window (0 = one email each)
+    INQUIRY_DIGEST_MINUTES = float(os.getenv('INQUIRY_DIGEST_MINUTES', '15'))
+    INQUIRY_DIGEST_MAX = int(os.getenv('INQUIRY_DIGEST_MAX', '100'))  # Inquiries per digest email
+    INQUIRY_TEMPLATE_CACHE = int(os.getenv('INQUIRY_TEMPLATE_CACHE', '4096'))  # Rendered inquiry blocks kept
+    
+    # Write-ahead log for sheet-bound rows (job rows and inquiries), e.g. 'wal'; empty (default) disables
+    WAL_DIR = os.getenv('WAL_DIR', '')
+    WAL_SEGMENT_BYTES = int(os.getenv('WAL_SEGMENT_BYTES', str(16 * 1024 * 1024)))
+    WAL_BATCH_SIZE = int(os.getenv('WAL_BATCH_SIZE', '1000'))  # Rows per sheet write when draining
+    WAL_RETRY_MAX_DELAY = float(os.getenv('WAL_RETRY_MAX_DELAY', '300'))  # Cap on the backoff between drains
+    
+    # Metrics endpoint (disabled when METRICS_PORT is 0/unset)
+    METRICS_PORT = int(os.getenv('METRICS_PORT') or 0)
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
     
     @classmethod
     def get_search_params(cls):
@@ -0,0 +1,208 @@
+"""
+Compressed, memory-mapped archive of full job descriptions.
+
+Descriptions are stored once per job URL (keyed by a hash of the canonical URL)
+in an append-only data file, compressed with zstd when the zstandard package is
+installed and zlib otherwise. A compact fixed-width index maps each key to its
+offset; reads go through mmap, so looking up one description never loads the
+whole archive. The Google Sheet keeps a short snippet while the full text stays
+available here for scoring and re-ranking.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import Config
+from job_record import as_record
+from url_index import canonicalize_url
+from instrumentation import stage
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+DATA_FILE = 'descriptions.dat'
+INDEX_FILE = 'descriptions.idx'
+
+# key (16) | content digest (8) | offset (8) | length (4) | codec (1)
+INDEX_ENTRY = struct.Struct('<16s8sQIB')
+
+
+def url_key(url: str) -> bytes:
+    """16-byte key for a job URL; tracking parameters do not change the key."""
+    return hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=16).digest()
+
+
+def _content_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+class DescriptionStore:
+    """Append-only description archive with an in-memory key index and mmap reads."""
+
+    def __init__(self, directory: Optional[str] = None, level: int = 10):
+        self.directory = directory or Config.DESCRIPTION_STORE_DIR
+        self.level = level
+        self.codec = CODEC_ZSTD if zstandard is not None else CODEC_ZLIB
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, Tuple[bytes, int, int, int]] = {}
+        self._map = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._data_path = os.path.join(self.directory, DATA_FILE)
+        self._index_path = os.path.join(self.directory, INDEX_FILE)
+        self._data = open(self._data_path, 'ab+')
+        self._index_file = open(self._index_path, 'ab+')
+        self._load_index()
+
+    def _load_index(self):
+        """Read the index, ignoring a torn last entry or entries past the end of the data file."""
+        data_size = os.path.getsize(self._data_path)
+        with open(self._index_path, 'rb') as f:
+            raw = f.read()
+        usable = len(raw) - len(raw) % INDEX_ENTRY.size
+        for key, digest, offset, length, codec in INDEX_ENTRY.iter_unpack(raw[:usable]):
+            if offset + length <= data_size:
+                self._index[key] = (digest, offset, length, codec)
+        if usable != len(raw):
+            logger.warning(f"Ignoring truncated entry at the end of {self._index_path}")
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.codec == CODEC_ZSTD:
+            return zstandard.ZstdCompressor(level=self.level).compress(payload)
+        return zlib.compress(payload, min(self.level, 9))
+
+    @staticmethod
+    def _decompress(blob: bytes, codec: int) -> bytes:
+        if codec == CODEC_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Description was stored with zstd but zstandard is not installed")
+            return zstandard.ZstdDecompressor().decompress(blob)
+        return zlib.decompress(blob)
+
+    def put(self, url: str, text: str) -> Optional[bytes]:
+        """
+        Store the full description for a job URL.
+
+        Returns:
+            The URL key, or None when there is nothing to store. Unchanged text is not rewritten.
+        """
+        if not url or not text:
+            return None
+        key = url_key(url)
+        digest = _content_digest(text)
+        with self._lock:
+            existing = self._index.get(key)
+            if existing and existing[0] == digest:
+                return key
+            blob = self._compress(text.encode('utf-8'))
+            self._data.seek(0, os.SEEK_END)
+            offset = self._data.tell()
+            self._data.write(blob)
+            self._data.flush()
+            # Data is flushed before its index entry, so a crash never leaves a dangling entry
+            self._index_file.write(INDEX_ENTRY.pack(key, digest, offset, len(blob), self.codec))
+            self._index_file.flush()
+            self._index[key] = (digest, offset, len(blob), self.codec)
+        return key
+
+    def get(self, url: str) -> Optional[str]:
+        """Return the full description for a job URL, or None if it was never stored."""
+        if not url:
+            return None
+        entry = self._index.get(url_key(url))
+        if entry is None:
+            return None
+        _, offset, length, codec = entry
+        with self._lock:
+            if self._map is None or offset + length > len(self._map):
+                self._remap()
+            blob = self._map[offset:offset + length]
+        return self._decompress(blob, codec).decode('utf-8')
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        self._data.flush()
+        self._map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __contains__(self, url: str) -> bool:
+        return bool(url) and url_key(url) in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def size_bytes(self) -> int:
+        """On-disk size of the data file."""
+        return os.path.getsize(self._data_path)
+
+    def close(self):
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._data.close()
+            self._index_file.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_description_store() -> Optional[DescriptionStore]:
+    """Process-wide store for Config.DESCRIPTION_STORE_DIR, or None when disabled."""
+    global _store
+    if not Config.DESCRIPTION_STORE_DIR:
+        return None
+    with _store_lock:
+        if _store is None or _store.directory != Config.DESCRIPTION_STORE_DIR:
+            _store = DescriptionStore(Config.DESCRIPTION_STORE_DIR)
+        return _store
+
+
+def archive_descriptions(jobs: Iterable) -> int:
+    """
+    Save the full description of each job to the archive.
+
+    Returns:
+        Number of descriptions stored (or already present)
+    """
+    store = get_description_store()
+    if store is None:
+        return 0
+    stored = 0
+    with stage('description_archive') as archive:
+        try:
+            for job in jobs:
+                job = as_record(job)
+                if store.put(job.url, job.description):
+                    stored += 1
+                    archive['bytes'] += len(job.description)
+        except Exception as e:
+            logger.error(f"Error archiving job descriptions: {e}")
+        archive['count'] = stored
+    return stored
+
+
+def full_description(job) -> str:
+    """Full description of a job: the archived text when available, else the record's own."""
+    job = as_record(job)
+    store = get_description_store()
+    if store is not None:
+        try:
+            text = store.get(job.url)
+            if text and len(text) >= len(job.description):
+                return text
+        except Exception as e:
+            logger.warning(f"Error reading archived description: {e}")
+    return job.description
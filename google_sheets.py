@@ -2,78 +2,281 @@
 Google Sheets integration for storing scraped job data.
 """
 import logging
-from typing import List, Dict
-from google.oauth2.credentials import Credentials
-from google.oauth2 import service_account
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
-import pickle
-import os
+import re
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Set, Tuple
+import json
 
 from config import Config
+from retry import execute_with_retry
+from job_record import JobRecord, as_record, field_name
+from near_dup import DuplicateDetector
+from url_index import get_seen_index
+from instrumentation import stage
+from sheets_client import SCOPES, get_credentials, get_sheets_service
+from sheets_batcher import SheetsBatcher, get_request_budget
+from write_ahead_log import WalFlusher, WriteAheadLog, get_wal
 
 logger = logging.getLogger(__name__)
 
+# Sheet titles per spreadsheet, filled by create_sheet_if_not_exists
+_known_sheets: Dict[str, Set[str]] = {}
+
+# (headers, last used row) per spreadsheet, so later reads know the columns and how far to page
+_sheet_layouts: Dict[str, Tuple[List[str], int]] = {}
+
+KEY_FIELDS = ('title', 'company', 'url')
+# Duplicate checks also read the sheet's description snippet, which covers the prefix near_dup compares
+DEDUP_FIELDS = KEY_FIELDS + ('description',)
+
+# Write-ahead log every job row passes through on its way to the sheet (see write_ahead_log.py)
+JOB_WAL = 'jobs'
+_job_flusher = None
+
+
+def column_letter(index: int) -> str:
+    """0-based column index to its A1 letters ('A', ..., 'Z', 'AA', ...)."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+
+def column_groups(indexes: Iterable[int]) -> List[Tuple[int, int]]:
+    """Merge column indexes into (first, last) runs of adjacent columns."""
+    groups = []
+    for index in sorted(set(indexes)):
+        if groups and index == groups[-1][1] + 1:
+            groups[-1] = (groups[-1][0], index)
+        else:
+            groups.append((index, index))
+    return groups
+
+
+class SheetSnapshot:
+    """Projected view of the job sheet: its header, existing jobs and last used row."""
+    
+    __slots__ = ('headers', 'jobs', 'row_count')
+    
+    def __init__(self, headers: List[str], jobs: List[JobRecord], row_count: int):
+        self.headers = headers
+        self.jobs = jobs
+        self.row_count = row_count
+
+def _append_job_rows(records: List[dict]):
+    """
+    Write-ahead log sink: append job rows after the sheet's last row.
+
+    Rows are appended rather than written at a computed position because the
+    sheet may have grown while they waited in the log.
+    """
+    sheet_name = GoogleSheetsManager.SHEET_NAME
+    rows = [record['row'] for record in records]
+    values = get_sheets_service().spreadsheets().values()
+    headers, row_count = _sheet_layouts.get(Config.GOOGLE_SHEET_ID, (None, 0))
+    if not row_count and rows[0] != GoogleSheetsManager.HEADERS:
+        # Nothing read from the sheet yet (it was unreachable when the rows were queued)
+        get_request_budget().acquire()
+        result = execute_with_retry(values.get(spreadsheetId=Config.GOOGLE_SHEET_ID, range=f'{sheet_name}!1:1'),
+                                    name='sheets.values.get')
+        if not result.get('values'):
+            rows = [GoogleSheetsManager.HEADERS] + rows
+    get_request_budget().acquire()
+    with stage('sheet_write', count=len(rows), bytes=len(json.dumps(rows))):
+        result = execute_with_retry(values.append(
+            spreadsheetId=Config.GOOGLE_SHEET_ID,
+            range=f'{sheet_name}!A1',
+            valueInputOption='RAW',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ), name='sheets.values.append')
+    match = re.search(r'(\d+)$', result.get('updates', {}).get('updatedRange', ''))
+    if match:
+        _sheet_layouts[Config.GOOGLE_SHEET_ID] = (headers or GoogleSheetsManager.HEADERS, int(match.group(1)))
+    logger.debug(f"Appended {len(rows)} rows to {sheet_name}")
+
+
+def get_job_flusher(wal: WriteAheadLog) -> WalFlusher:
+    """Process-wide flusher draining the job row log into the sheet."""
+    global _job_flusher
+    if _job_flusher is None or _job_flusher.wal is not wal:
+        _job_flusher = WalFlusher(wal, _append_job_rows, name='job-rows')
+    return _job_flusher
+
+
 class GoogleSheetsManager:
     """Manager for Google Sheets operations."""
     
-    SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+    SCOPES = SCOPES
     SHEET_NAME = 'Hardware Manager Jobs'
+    HEADERS = ['Title', 'Company', 'Location', 'Salary', 'Description', 'URL', 'Scraped Date', 'Scraped Time']
+    KEY_FIELDS = KEY_FIELDS
+    DEDUP_FIELDS = DEDUP_FIELDS
     
     def __init__(self):
-        self.service = None
         self.credentials = None
+        self.batcher = SheetsBatcher()
+        self._batch_depth = 0
+        self._batch_snapshot = None
+        self._pending_keys = []
+        self._pending_jobs = 0
+        self._sheet_unchecked = False
+        # Jobs 'added', 'deduped' and 'failed' since take_counts() was last called
+        self.counts = Counter()
         self.setup_google_sheets()
     
     def setup_google_sheets(self):
         """Setup Google Sheets API connection."""
         try:
-            if not os.path.exists(Config.GOOGLE_CREDENTIALS_FILE):
-                raise FileNotFoundError(f"Credentials file not found: {Config.GOOGLE_CREDENTIALS_FILE}")
-            
-            # Use service account credentials
-            creds = service_account.Credentials.from_service_account_file(
-                Config.GOOGLE_CREDENTIALS_FILE, scopes=self.SCOPES)
-            
-            self.credentials = creds
-            self.service = build('sheets', 'v4', credentials=creds)
+            # Credentials and the HTTP transport are shared process-wide (sheets_client.py)
+            self.credentials = get_credentials()
+            get_sheets_service()
             logger.info("Google Sheets connection established")
             
+            wal = get_wal(JOB_WAL)
+            if wal is not None and wal.pending_count:
+                # Rows accepted by an earlier run that never reached the sheet
+                logger.info(f"Replaying {wal.pending_count} job rows from the write-ahead log")
+                get_job_flusher(wal).start()
+            
         except Exception as e:
             logger.error(f"Error setting up Google Sheets: {e}")
             raise
     
-    def get_existing_jobs(self) -> List[Dict]:
-        """Get existing job data from the sheet to check for duplicates."""
-        try:
-            if not Config.GOOGLE_SHEET_ID:
-                raise ValueError("Google Sheet ID not configured")
+    @property
+    def service(self):
+        """Sheets service for the calling thread, reusing its open connections."""
+        return get_sheets_service()
+    
+    def _field_columns(self, headers: List[str], fields) -> Dict[str, int]:
+        """Column index of each requested field, located by header name."""
+        columns = {}
+        for index, header in enumerate(headers):
+            name = field_name(header)
+            if name in fields and name not in columns:
+                columns[name] = index
+        return columns
+    
+    def _window_ranges(self, groups: List[Tuple[int, int]], first_row: int, last_row: int) -> List[str]:
+        return [f'{self.SHEET_NAME}!{column_letter(start)}{first_row}:{column_letter(end)}{last_row}'
+                for start, end in groups]
+    
+    def _read_sheet(self, fields=KEY_FIELDS) -> SheetSnapshot:
+        """
+        Read only the given columns of the job sheet, in windows of Config.SHEET_READ_WINDOW rows.
+        
+        With a cached row count every window goes out in one batchGet; otherwise windows
+        are read until one comes back short. Raises on API errors so callers never mistake
+        a failed read for an empty sheet.
+        """
+        if self._batch_snapshot is not None and fields == self.DEDUP_FIELDS:
+            return self._batch_snapshot
+        if not Config.GOOGLE_SHEET_ID:
+            raise ValueError("Google Sheet ID not configured")
+        
+        window = Config.SHEET_READ_WINDOW
+        headers, known_rows = _sheet_layouts.get(Config.GOOGLE_SHEET_ID, (self.HEADERS, 0))
+        
+        with stage('sheet_read') as sheet_read:
+            columns = self._field_columns(headers, fields)
+            groups = column_groups(columns.values())
             
-            range_name = f'{self.SHEET_NAME}!A:J'  # Assuming columns A through J
+            # Header row plus every window up to the cached row count and one window past it
+            last_row = max(known_rows, 1) + window
+            windows = [(first, min(first + window - 1, last_row)) for first in range(2, last_row + 1, window)]
+            ranges = [f'{self.SHEET_NAME}!1:1']
+            for first, last in windows:
+                ranges.extend(self._window_ranges(groups, first, last))
+            results = self._first_batch_get(ranges)
+            sheet_read['bytes'] = len(json.dumps(results))
             
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=Config.GOOGLE_SHEET_ID,
-                range=range_name
-            ).execute()
+            header_rows = results[0]
+            headers = header_rows[0] if header_rows else []
+            actual_columns = self._field_columns(headers, fields)
+            if headers and actual_columns != columns:
+                # The sheet's column order differs from the cached/default layout; read again
+                columns = actual_columns
+                groups = column_groups(columns.values())
+                ranges = []
+                for first, last in windows:
+                    ranges.extend(self._window_ranges(groups, first, last))
+                results = [header_rows] + self.batcher.batch_get(ranges)
+                sheet_read['bytes'] += len(json.dumps(results))
             
-            values = result.get('values', [])
+            rows: List[Dict[str, str]] = []
+            row_count = 1 if headers else 0
+            window_results = [results[1 + k * len(groups):1 + (k + 1) * len(groups)] for k in range(len(windows))]
+            while True:
+                full = False
+                for (first, last), group_values in zip(windows, window_results):
+                    count = max((len(values) for values in group_values), default=0)
+                    for offset in range(count):
+                        row = {}
+                        for (start, _), values in zip(groups, group_values):
+                            cells = values[offset] if offset < len(values) else []
+                            for name, index in columns.items():
+                                if 0 <= index - start < len(cells):
+                                    row[name] = cells[index - start]
+                        rows.append(row)
+                    if count:
+                        row_count = first + count - 1
+                    full = count == last - first + 1
+                if not full or not groups:
+                    break
+                # The last window was full: keep paging
+                first = windows[-1][1] + 1
+                windows = [(first, first + window - 1)]
+                window_results = [self.batcher.batch_get(self._window_ranges(groups, first, first + window - 1))]
+                sheet_read['bytes'] += len(json.dumps(window_results))
+            sheet_read['count'] = len(rows)
+        
+        _sheet_layouts[Config.GOOGLE_SHEET_ID] = (headers or self.HEADERS, row_count)
+        jobs = [JobRecord.from_mapping(row) for row in rows if any(row.values())]
+        snapshot = SheetSnapshot(headers, jobs, row_count)
+        if self._batch_depth and fields == self.DEDUP_FIELDS:
+            self._batch_snapshot = snapshot
+        return snapshot
+    
+    def _first_batch_get(self, ranges: List[str]) -> List[List[list]]:
+        """
+        batch_get that also settles a sheet check deferred by create_sheet_if_not_exists.
+        
+        Reading a missing sheet fails with HTTP 400, so a successful read proves the
+        sheet exists and saves the spreadsheet metadata request.
+        """
+        if not self._sheet_unchecked:
+            return self.batcher.batch_get(ranges)
+        try:
+            results = self.batcher.batch_get(ranges)
+        except Exception as e:
+            if getattr(getattr(e, 'resp', None), 'status', None) != 400:
+                raise
+            self._sheet_unchecked = False
+            self._ensure_sheet()
+            return self.batcher.batch_get(ranges)
+        self._sheet_unchecked = False
+        _known_sheets.setdefault(Config.GOOGLE_SHEET_ID, set()).add(self.SHEET_NAME)
+        return results
+    
+    def get_existing_jobs(self, fields=None) -> List[JobRecord]:
+        """
+        Get existing job data from the sheet to check for duplicates.
+        
+        Args:
+            fields: Record fields to read; defaults to the key columns (title, company, URL)
+        """
+        try:
+            snapshot = self._read_sheet(tuple(fields) if fields else self.KEY_FIELDS)
             
-            if not values:
+            if not snapshot.jobs:
                 logger.info("No existing data found in sheet")
                 return []
             
-            # Convert to list of dictionaries (skip header row)
-            headers = values[0] if values else []
-            existing_jobs = []
-            
-            for row in values[1:]:  # Skip header row
-                if len(row) >= len(headers):
-                    job_dict = dict(zip(headers, row[:len(headers)]))
-                    existing_jobs.append(job_dict)
-            
-            logger.info(f"Retrieved {len(existing_jobs)} existing job records")
-            return existing_jobs
+            logger.info(f"Retrieved {len(snapshot.jobs)} existing job records")
+            return snapshot.jobs
             
         except Exception as e:
             logger.error(f"Error retrieving existing jobs: {e}")
@@ -82,17 +285,19 @@ class GoogleSheetsManager:
     def is_duplicate(self, new_job: Dict, existing_jobs: List[Dict]) -> bool:
         """Check if a job is a duplicate based on title, company, and URL."""
         try:
-            new_title = new_job.get('title', '').strip().lower()
-            new_company = new_job.get('company', '').strip().lower()
-            new_url = new_job.get('url', '').strip()
+            new_job = as_record(new_job)
+            new_title = new_job.title_lower
+            new_company = new_job.company_lower
+            new_key = new_job.job_key
             
             for existing_job in existing_jobs:
-                existing_title = existing_job.get('title', '').strip().lower()
-                existing_company = existing_job.get('company', '').strip().lower()
-                existing_url = existing_job.get('url', '').strip()
+                existing_job = as_record(existing_job)
+                existing_title = existing_job.title_lower
+                existing_company = existing_job.company_lower
+                existing_key = existing_job.job_key
                 
-                # Check for exact URL match first
-                if new_url and existing_url and new_url == existing_url:
+                # Check for the same posting ID / canonical URL first
+                if new_key and existing_key and new_key == existing_key:
                     return True
                 
                 # Check for title and company match
@@ -107,29 +312,117 @@ class GoogleSheetsManager:
             logger.warning(f"Error checking for duplicates: {e}")
             return False
     
+    @contextmanager
+    def batch(self):
+        """
+        Defer sheet writes until the block exits.
+        
+        Several add_jobs_to_sheet calls (e.g. one per search profile) then share one
+        sheet read and one batchUpdate, and are deduplicated against each other. A
+        create_sheet_if_not_exists call inside the block is answered by that same read.
+        """
+        self._batch_depth += 1
+        try:
+            yield self.batcher
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._batch_snapshot = None
+                if self._sheet_unchecked:
+                    # Nothing was read in the block, so the check still needs its own request
+                    self._sheet_unchecked = False
+                    self._ensure_sheet()
+                self._flush_writes()
+    
+    def take_counts(self) -> Counter:
+        """
+        Jobs added, deduplicated and failed since the last call, then reset.
+        
+        Jobs queued inside batch() are counted as added or failed once the block exits.
+        """
+        counts, self.counts = self.counts, Counter()
+        return counts
+    
+    def _flush_writes(self) -> bool:
+        """
+        Flush queued rows, then record their job keys as seen.
+        
+        With the write-ahead log enabled the rows are already on disk, so a failed
+        write leaves them to the background flusher and still counts as success.
+        Without it, a failed write drops the queued rows (their positions may be
+        stale by the next run) and counts every pending job as failed.
+        """
+        keys, self._pending_keys = self._pending_keys, []
+        jobs, self._pending_jobs = self._pending_jobs, 0
+        wal = get_wal(JOB_WAL)
+        try:
+            if wal is not None:
+                get_job_flusher(wal).drain()
+            else:
+                self.batcher.flush()
+        except Exception as e:
+            if wal is None:
+                logger.error(f"Error writing jobs to sheet: {e}")
+                self.batcher.clear()
+                self.counts['failed'] += jobs
+                return False
+            logger.error(f"Error writing jobs to sheet, keeping {wal.pending_count} rows in the write-ahead log "
+                         f"to retry: {e}")
+            get_job_flusher(wal).start()
+        self.counts['added'] += jobs
+        seen = get_seen_index()
+        if seen is not None and keys:
+            seen.update(keys)
+            seen.save()
+        return True
+    
     def add_jobs_to_sheet(self, jobs: List[Dict]) -> int:
         """
         Add new jobs to the Google Sheet.
         
+        Inside batch() the rows are queued and written when the block exits.
+        
         Args:
             jobs: List of job dictionaries to add
             
         Returns:
-            Number of jobs successfully added
+            Number of jobs successfully added (or queued, inside batch()); 0 on error.
+            take_counts() tells duplicates and failed writes apart.
         """
+        unresolved = len(jobs)
         try:
             if not jobs:
                 logger.info("No jobs to add")
                 return 0
             
-            # Get existing jobs to check for duplicates
-            existing_jobs = self.get_existing_jobs()
+            # Skip postings already added by an earlier run (by stable job ID)
+            seen = get_seen_index()
+            if seen is not None:
+                jobs = [job for job in jobs if as_record(job).job_key_id not in seen]
+            
+            # One projected read gives the header, the existing jobs' keys and snippets and the next free row
+            wal = get_wal(JOB_WAL)
+            try:
+                snapshot = self._read_sheet(self.DEDUP_FIELDS)
+            except Exception as e:
+                if wal is None:
+                    raise
+                # Sheets is unreachable: keep the jobs in the log anyway. The seen index has
+                # already removed those added by earlier runs.
+                logger.warning(f"Could not read the job sheet ({e}); queueing jobs without checking it")
+                snapshot = SheetSnapshot(list(self.HEADERS), [], 0)
+                if self._batch_depth:
+                    self._batch_snapshot = snapshot
             
-            # Filter out duplicates
-            new_jobs = []
-            for job in jobs:
-                if not self.is_duplicate(job, existing_jobs):
-                    new_jobs.append(job)
+            # Filter out duplicates and near-duplicates of existing rows and of each other.
+            # Existing rows carry the sheet's description snippet, the same prefix near_dup
+            # compares; rows without one only match on job key or title/company.
+            detector = DuplicateDetector()
+            for existing_job in snapshot.jobs:
+                detector.add(existing_job, key_only=not existing_job.description)
+            new_jobs = [job for job in jobs if detector.add_if_new(job)]
+            self.counts['deduped'] += unresolved - len(new_jobs)
+            unresolved = len(new_jobs)
             
             if not new_jobs:
                 logger.info("All jobs are duplicates, nothing to add")
@@ -138,98 +431,102 @@ class GoogleSheetsManager:
             logger.info(f"Adding {len(new_jobs)} new jobs (filtered from {len(jobs)} total)")
             
             # Prepare the data for insertion
-            if not existing_jobs:
-                # First time - add headers
-                headers = ['Title', 'Company', 'Location', 'Salary', 'Description', 'URL', 'Scraped Date', 'Scraped Time']
-                values_to_add = [headers]
-            else:
-                # Check if headers exist
-                range_name = f'{self.SHEET_NAME}!A1:J1'
-                result = self.service.spreadsheets().values().get(
-                    spreadsheetId=Config.GOOGLE_SHEET_ID,
-                    range=range_name
-                ).execute()
-                
-                headers = result.get('values', [[]])[0]
-                if not headers:
-                    headers = ['Title', 'Company', 'Location', 'Salary', 'Description', 'URL', 'Scraped Date', 'Scraped Time']
-                    values_to_add = [headers]
-                else:
-                    values_to_add = []
-            
-            # Add new job data
+            new_job_rows = []
             for job in new_jobs:
                 row = [
                     job.get('title', ''),
                     job.get('company', ''),
                     job.get('location', ''),
                     job.get('salary', ''),
-                    job.get('description', '')[:500],  # Limit description length
+                    job.get('description', '')[:Config.SHEET_DESCRIPTION_LENGTH],  # Snippet; full text is archived
                     job.get('url', ''),
                     job.get('scraped_date', ''),
                     job.get('scraped_time', '')
                 ]
-                values_to_add.append(row)
+                new_job_rows.append(row)
             
-            # Determine where to insert (after existing data or at the beginning)
-            if existing_jobs:
-                # Find the next empty row
-                range_name = f'{self.SHEET_NAME}!A:J'
-                result = self.service.spreadsheets().values().get(
-                    spreadsheetId=Config.GOOGLE_SHEET_ID,
-                    range=range_name
-                ).execute()
-                
-                values = result.get('values', [])
-                next_row = len(values) + 1
-                
-                # Only add new job rows (skip headers)
-                new_job_rows = values_to_add[1:] if len(values_to_add) > 1 and values_to_add[0] == headers else values_to_add
-                
-                if new_job_rows:
-                    range_to_update = f'{self.SHEET_NAME}!A{next_row}:H{next_row + len(new_job_rows) - 1}'
-                    
-                    body = {
-                        'values': new_job_rows
-                    }
-                    
-                    result = self.service.spreadsheets().values().update(
-                        spreadsheetId=Config.GOOGLE_SHEET_ID,
-                        range=range_to_update,
-                        valueInputOption='RAW',
-                        body=body
-                    ).execute()
+            if wal is not None:
+                if not snapshot.headers:
+                    new_job_rows.insert(0, list(self.HEADERS))
+                    snapshot.headers = list(self.HEADERS)
+                wal.append([{'row': row} for row in new_job_rows])
+                self._pending_jobs += len(new_jobs)
+                unresolved = 0
+                self._pending_keys.extend(key for key in (as_record(job).job_key_id for job in new_jobs)
+                                          if key is not None)
+                if self._batch_depth:
+                    snapshot.jobs.extend(as_record(job) for job in new_jobs)
+                    logger.info(f"Queued {len(new_jobs)} jobs for the Google Sheet")
+                    return len(new_jobs)
+                self._flush_writes()
+                logger.info(f"Added {len(new_jobs)} jobs to the Google Sheet (via the write-ahead log)")
+                return len(new_jobs)
+            
+            if snapshot.headers:
+                # Append after the existing data
+                next_row = snapshot.row_count + 1
+                values_to_add = new_job_rows
             else:
-                # First time setup
-                range_to_update = f'{self.SHEET_NAME}!A1:H{len(values_to_add)}'
-                
-                body = {
-                    'values': values_to_add
-                }
-                
-                result = self.service.spreadsheets().values().update(
-                    spreadsheetId=Config.GOOGLE_SHEET_ID,
-                    range=range_to_update,
-                    valueInputOption='RAW',
-                    body=body
-                ).execute()
+                # First time - add headers
+                next_row = 1
+                values_to_add = [self.HEADERS] + new_job_rows
+            
+            range_to_update = f'{self.SHEET_NAME}!A{next_row}:H{next_row + len(values_to_add) - 1}'
+            self.batcher.queue_update(range_to_update, values_to_add)
+            self._pending_jobs += len(new_jobs)
+            unresolved = 0
+            self._pending_keys.extend(key for key in (as_record(job).job_key_id for job in new_jobs) if key is not None)
+            
+            # Later reads (and calls in the same batch) append after these rows
+            snapshot.row_count = next_row + len(values_to_add) - 1
+            if not snapshot.headers:
+                snapshot.headers = list(self.HEADERS)
+            _sheet_layouts[Config.GOOGLE_SHEET_ID] = (snapshot.headers, snapshot.row_count)
+            
+            if self._batch_depth:
+                snapshot.jobs.extend(as_record(job) for job in new_jobs)
+                logger.info(f"Queued {len(new_jobs)} jobs for the Google Sheet")
+                return len(new_jobs)
+            
+            if not self._flush_writes():
+                return 0
             
             logger.info(f"Successfully added {len(new_jobs)} jobs to Google Sheet")
             return len(new_jobs)
             
         except Exception as e:
             logger.error(f"Error adding jobs to sheet: {e}")
+            self.counts['failed'] += unresolved
             return 0
     
     def create_sheet_if_not_exists(self):
-        """Create the sheet if it doesn't exist."""
+        """
+        Create the sheet if it doesn't exist.
+        
+        Inside batch() the check waits for the block's first sheet read instead of
+        making a metadata request of its own.
+        """
+        # The sheet list is cached per spreadsheet, so later agent initializations skip the call
+        sheet_names = _known_sheets.get(Config.GOOGLE_SHEET_ID)
+        if sheet_names is not None and self.SHEET_NAME in sheet_names:
+            logger.info(f"Sheet {self.SHEET_NAME} already exists")
+            return
+        if self._batch_depth:
+            self._sheet_unchecked = True
+            return
+        self._ensure_sheet()
+    
+    def _ensure_sheet(self):
+        """Look the sheet up in the spreadsheet metadata and add it when missing."""
         try:
-            # Get spreadsheet metadata
-            spreadsheet = self.service.spreadsheets().get(
-                spreadsheetId=Config.GOOGLE_SHEET_ID
-            ).execute()
+            # Get spreadsheet metadata (sheet titles only)
+            get_request_budget().acquire()
+            spreadsheet = execute_with_retry(self.service.spreadsheets().get(
+                spreadsheetId=Config.GOOGLE_SHEET_ID,
+                fields='sheets.properties.title'
+            ), name='sheets.get')
             
-            sheet_names = [sheet['properties']['title'] for sheet in spreadsheet['sheets']]
+            sheet_names = {sheet['properties']['title'] for sheet in spreadsheet.get('sheets', [])}
             
             if self.SHEET_NAME not in sheet_names:
                 # Create new sheet
@@ -243,14 +540,17 @@ class GoogleSheetsManager:
                     }]
                 }
                 
-                self.service.spreadsheets().batchUpdate(
+                get_request_budget().acquire()
+                execute_with_retry(self.service.spreadsheets().batchUpdate(
                     spreadsheetId=Config.GOOGLE_SHEET_ID,
                     body=request_body
-                ).execute()
+                ), name='sheets.batchUpdate')
                 
+                sheet_names.add(self.SHEET_NAME)
                 logger.info(f"Created new sheet: {self.SHEET_NAME}")
             else:
                 logger.info(f"Sheet {self.SHEET_NAME} already exists")
+            _known_sheets[Config.GOOGLE_SHEET_ID] = sheet_names
                 
         except Exception as e:
             logger.error(f"Error creating sheet: {e}")
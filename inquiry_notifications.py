@@ -0,0 +1,322 @@
+"""
+Email notifications for website inquiries, coalesced into digests.
+
+The Apps Script calls MailApp.sendEmail once per inquiry while the visitor
+waits, so a promotion that brings in a few hundred inquiries costs a few
+hundred emails of the daily quota. DigestNotifier keeps the first email
+immediate, so a lone inquiry is seen at once. After each email it holds new
+inquiries for Config.INQUIRY_DIGEST_MINUTES and then sends them all as one
+digest. When a window ends with nothing held, the next inquiry is emailed
+immediately again.
+
+Held inquiries are kept in the 'notifications' write-ahead log (on disk when
+WAL_DIR is set, so a restart does not lose them), and they are removed only
+once their email is accepted.
+Subjects and bodies come from string.Template templates. Each inquiry's
+rendered block is cached (Config.INQUIRY_TEMPLATE_CACHE entries), so a digest
+retried after an SMTP failure, or an inquiry that appears in both a single
+email and a digest, is rendered once.
+
+For local testing, benchmarks/mock_smtp.py accepts and records mail.
+"""
+import logging
+import smtplib
+import threading
+import time
+from email.message import EmailMessage
+from functools import lru_cache
+from string import Template
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from metrics import REGISTRY
+from write_ahead_log import WriteAheadLog, get_wal
+
+logger = logging.getLogger(__name__)
+
+# The Apps Script's email, for a single inquiry
+INQUIRY_SUBJECT = Template('New $bike_model Inquiry - $status')
+INQUIRY_BODY = Template(
+    'New inquiry received from from0to2.com:\n\n'
+    'Bike Model: $bike_model_or_na\n'
+    'Status: $status_or_na\n'
+    'Email: $email\n'
+    'Name: $name\n'
+    'Message: $message\n\n'
+    'Additional Information:\n'
+    '- Referrer: $referrer\n'
+    '- User Agent: $user_agent\n'
+    '- IP Address: $ip_address\n'
+    '- Timestamp: $timestamp\n'
+    '- Date: $date\n'
+    '- Time: $time\n\n'
+    'This information has been automatically saved to the Google Sheet.'
+)
+# One entry of a digest
+DIGEST_ENTRY = Template(
+    '$bike_model_or_na - $status_or_na ($date $time)\n'
+    'Email: $email\n'
+    'Name: $name\n'
+    'Message: $message\n'
+    'Referrer: $referrer | IP Address: $ip_address'
+)
+DIGEST_SUBJECT = Template('$count New Inquiries - $summary')
+DIGEST_BODY = Template(
+    '$count inquiries received from from0to2.com between $first and $last:\n\n'
+    '$entries\n\n'
+    'All of them have been automatically saved to the Google Sheet.'
+)
+TEMPLATES = {'subject': INQUIRY_SUBJECT, 'body': INQUIRY_BODY, 'entry': DIGEST_ENTRY}
+
+REGISTRY.describe('inquiry_service_emails_total', 'counter', 'Notification emails by outcome')
+REGISTRY.describe('inquiry_service_digests_total', 'counter', 'Digest emails sent')
+
+
+def _template_values(inquiry: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """An inquiry's template fields, with the Apps Script's placeholders for empty values."""
+    def value(field: str, default: str = '') -> str:
+        return inquiry.get(field) or default
+
+    return (
+        ('bike_model', value('bike_model', 'E-bike')), ('status', value('status', 'Inquiry')),
+        ('bike_model_or_na', value('bike_model', 'N/A')), ('status_or_na', value('status', 'N/A')),
+        ('email', value('email', 'N/A')), ('name', value('name', 'Not provided')),
+        ('message', value('message', 'None')), ('referrer', value('referrer', 'Direct')),
+        ('user_agent', value('user_agent', 'N/A')), ('ip_address', value('ip_address')),
+        ('timestamp', value('timestamp')), ('date', value('date')), ('time', value('time')),
+    )
+
+
+@lru_cache(maxsize=Config.INQUIRY_TEMPLATE_CACHE)
+def _render(name: str, values: Tuple[Tuple[str, str], ...]) -> str:
+    return TEMPLATES[name].safe_substitute(dict(values))
+
+
+def render(name: str, inquiry: Dict[str, str]) -> str:
+    """Render template name ('subject', 'body' or 'entry') for an inquiry, from the cache when possible."""
+    return _render(name, _template_values(inquiry))
+
+
+def _model_summary(inquiries: List[Dict[str, str]]) -> str:
+    """'GSD x3, HSD' style summary of the bike models in a digest."""
+    counts: Dict[str, int] = {}
+    for inquiry in inquiries:
+        model = inquiry.get('bike_model') or 'E-bike'
+        counts[model] = counts.get(model, 0) + 1
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return ', '.join(f'{model} x{count}' if count > 1 else model for model, count in ordered)
+
+
+class InquiryNotifier:
+    """Emails Config.INQUIRY_EMAIL_TO about new inquiries, with the Apps Script's subject and body."""
+
+    def __init__(self, to: Optional[str] = None, host: Optional[str] = None, port: Optional[int] = None):
+        self.to = to or Config.INQUIRY_EMAIL_TO
+        self.host = Config.SMTP_HOST if host is None else host
+        self.port = port or Config.SMTP_PORT
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.host and self.to)
+
+    def _message(self, subject: str, body: str, reply_to: Optional[str] = None) -> EmailMessage:
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = Config.SMTP_FROM or self.to
+        message['To'] = self.to
+        if reply_to:
+            message['Reply-To'] = reply_to
+        message.set_content(body)
+        return message
+
+    def compose(self, inquiry: Dict[str, str]) -> EmailMessage:
+        return self._message(render('subject', inquiry), render('body', inquiry), inquiry.get('email'))
+
+    def compose_digest(self, inquiries: List[Dict[str, str]]) -> EmailMessage:
+        entries = '\n\n'.join(f'{number}. {render("entry", inquiry)}'
+                              for number, inquiry in enumerate(inquiries, 1))
+        first, last = inquiries[0], inquiries[-1]
+        subject = DIGEST_SUBJECT.substitute(count=len(inquiries), summary=_model_summary(inquiries))
+        body = DIGEST_BODY.substitute(count=len(inquiries), entries=entries,
+                                      first=f"{first.get('date', '')} {first.get('time', '')}".strip(),
+                                      last=f"{last.get('date', '')} {last.get('time', '')}".strip())
+        return self._message(subject, body)
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=Config.SMTP_TIMEOUT)
+        if Config.SMTP_STARTTLS:
+            smtp.starttls()
+        if Config.SMTP_USER:
+            smtp.login(Config.SMTP_USER, Config.SMTP_PASSWORD)
+        return smtp
+
+    def deliver(self, messages: List[EmailMessage]) -> int:
+        """
+        Send messages in order over a single SMTP connection, stopping at the first failure.
+
+        Failures are logged, not raised.
+
+        Returns:
+            Number of messages sent (a prefix of messages)
+        """
+        if not messages or not self.enabled:
+            return 0
+        sent = 0
+        try:
+            smtp = self._connect()
+        except (OSError, smtplib.SMTPException) as e:
+            logger.error(f"Could not connect to SMTP server {self.host}:{self.port}: {e}")
+            REGISTRY.inc('inquiry_service_emails_total', len(messages), outcome='error')
+            return 0
+        try:
+            for message in messages:
+                try:
+                    smtp.send_message(message)
+                except (OSError, smtplib.SMTPException) as e:
+                    logger.error(f"Email send error for '{message['Subject']}': {e}")
+                    break
+                sent += 1
+        finally:
+            try:
+                smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                pass
+        REGISTRY.inc('inquiry_service_emails_total', sent, outcome='sent')
+        if sent < len(messages):
+            REGISTRY.inc('inquiry_service_emails_total', len(messages) - sent, outcome='error')
+        return sent
+
+    def send(self, inquiries: List[Dict[str, str]]) -> int:
+        """
+        Send one email per inquiry over a single SMTP connection.
+
+        Returns:
+            Number of emails sent
+        """
+        return self.deliver([self.compose(inquiry) for inquiry in inquiries])
+
+
+class DigestNotifier:
+    """
+    Emails inquiries from a background thread: the first at once, later ones as a digest per window.
+
+    Args:
+        mailer: Composes and sends the emails, defaults to InquiryNotifier()
+        digest_minutes: Length of the window after each email, Config.INQUIRY_DIGEST_MINUTES by default;
+            0 sends every inquiry in its own email as soon as it arrives
+        digest_max: Most inquiries per digest email
+        wal: Where held inquiries wait, defaults to get_wal('notifications') (in memory when disabled)
+    """
+
+    def __init__(self, mailer: Optional[InquiryNotifier] = None, digest_minutes: Optional[float] = None,
+                 digest_max: Optional[int] = None, wal: Optional[WriteAheadLog] = None):
+        self.mailer = mailer or InquiryNotifier()
+        minutes = Config.INQUIRY_DIGEST_MINUTES if digest_minutes is None else digest_minutes
+        self.window = max(0.0, minutes * 60)
+        self.digest_max = digest_max or Config.INQUIRY_DIGEST_MAX
+        self.wal = wal or get_wal('notifications') or WriteAheadLog(None)
+        self._cond = threading.Condition()
+        self._window_end = 0.0  # Monotonic time until which new inquiries are held
+        self._failures = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        REGISTRY.add_collector(self._samples)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mailer.enabled
+
+    def _samples(self):
+        yield ('inquiry_notifications_held', 'gauge', 'Inquiries waiting for their notification email', {},
+               self.wal.pending_count)
+        info = _render.cache_info()
+        yield ('inquiry_template_cache_hits_total', 'counter', 'Inquiry template renders served from the cache', {},
+               info.hits)
+        yield ('inquiry_template_cache_misses_total', 'counter', 'Inquiry template renders', {}, info.misses)
+
+    def send(self, inquiries: List[Dict[str, str]]) -> int:
+        """
+        Hand inquiries over for notification; the background thread emails them.
+
+        Returns:
+            Number of inquiries accepted (0 when email is disabled)
+        """
+        if not inquiries or not self.enabled:
+            return 0
+        self.wal.append(list(inquiries))
+        with self._cond:
+            self._cond.notify_all()
+        return len(inquiries)
+
+    def start(self) -> 'DigestNotifier':
+        if self._thread is None and self.enabled:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='inquiry-notifier', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 30.0):
+        """Send whatever is held now, without waiting for the window, then stop the thread."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _due_in(self) -> Optional[float]:
+        """Seconds until held inquiries should go out (0 = now), or None when nothing is held."""
+        if not self.wal.pending_count:
+            return None
+        return max(0.0, self._window_end - time.monotonic())
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopping:
+                    due = self._due_in()
+                    if due == 0:
+                        break
+                    self._cond.wait(due)
+                stopping = self._stopping
+            self.flush()
+            if stopping:
+                return
+
+    def flush(self) -> int:
+        """
+        Email everything held, as single emails or digests, and start a new window.
+
+        Returns:
+            Number of inquiries whose email was sent
+        """
+        from retry import backoff_delay
+
+        notified = 0
+        while True:
+            batch = self.wal.pending(self.digest_max if self.window else 1)
+            if not batch:
+                break
+            inquiries = [inquiry for _, inquiry in batch]
+            if len(inquiries) == 1:
+                message = self.mailer.compose(inquiries[0])
+            else:
+                message = self.mailer.compose_digest(inquiries)
+            if not self.mailer.deliver([message]):
+                self._failures += 1
+                delay = backoff_delay(self._failures - 1, Config.RETRY_DELAY, Config.WAL_RETRY_MAX_DELAY)
+                with self._cond:
+                    self._window_end = time.monotonic() + max(self.window, delay)
+                logger.warning(f"{self.wal.pending_count} inquiry notifications kept for retry")
+                return notified
+            self._failures = 0
+            self.wal.commit(batch[-1][0])
+            notified += len(inquiries)
+            if len(inquiries) > 1:
+                REGISTRY.inc('inquiry_service_digests_total')
+                logger.info(f"Sent a digest of {len(inquiries)} inquiries")
+        if notified:
+            with self._cond:
+                self._window_end = time.monotonic() + self.window
+        return notified
@@ -0,0 +1,411 @@
+"""
+Website inquiry ingestion service.
+
+The site's inquiry forms post to an Apps Script web app
+(COMPLETE_GOOGLE_APPS_SCRIPT.gs). Its doPost opens the spreadsheet, reads the
+header row, appends the row and sends a notification email before it answers,
+so every submission waits on Sheets and MailApp, and a burst of submissions
+runs into their quotas. This service accepts the same payload, either JSON or
+form-encoded fields (see INQUIRY_FIELDS), and gives the same
+{"success": ...} answer as soon as the inquiry is validated and written to
+the 'inquiries' write-ahead log (see write_ahead_log.py). With WAL_DIR set
+the log is on disk, so an accepted inquiry survives a restart or a Sheets
+outage.
+
+A background flusher collects logged inquiries for up to
+Config.INQUIRY_FLUSH_INTERVAL seconds and appends them with one
+values().append call. The header row is read once. It then hands the batch
+to a DigestNotifier (inquiry_notifications.py), which emails the first
+inquiry at once and coalesces the rest into periodic digests. Submit latency
+no longer depends on Sheets or mail, and bursts become a few large writes and
+a few emails.
+
+Usage:
+    python inquiry_service.py
+    python inquiry_service.py --host 0.0.0.0 --port 8080
+"""
+import argparse
+import ipaddress
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from config import Config
+from inquiry_notifications import DigestNotifier
+from metrics import REGISTRY
+from write_ahead_log import WalFlusher, WriteAheadLog, get_wal
+
+logger = logging.getLogger(__name__)
+
+# Columns the Apps Script creates on an empty sheet
+INQUIRY_HEADERS = ['Timestamp', 'Email', 'Name', 'Message', 'Bike Model', 'Status', 'Referrer', 'User Agent',
+                   'IP Address', 'Date', 'Time']
+# Fields the forms post (plus ipAddress/ip_address, which clients may send)
+INQUIRY_FIELDS = ('timestamp', 'email', 'name', 'message', 'bike_model', 'status', 'referrer', 'user_agent')
+# Sheet header (lowercased) -> inquiry field, including the Apps Script's alternate spellings
+HEADER_FIELDS = {
+    'timestamp': 'timestamp', 'email': 'email', 'name': 'name', 'message': 'message',
+    'bike model': 'bike_model', 'bike_model': 'bike_model', 'status': 'status', 'referrer': 'referrer',
+    'user agent': 'user_agent', 'user_agent': 'user_agent', 'ip address': 'ip_address',
+    'ip_address': 'ip_address', 'date': 'date', 'time': 'time',
+}
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_FIELD_LENGTH = 10000
+_EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+REGISTRY.describe('inquiry_service_requests_total', 'counter', 'Inquiry submissions by outcome')
+REGISTRY.describe('inquiry_service_rows_written_total', 'counter', 'Inquiry rows appended to the sheet')
+REGISTRY.describe('inquiry_service_write_failures_total', 'counter', 'Sheet appends that failed after retries')
+
+
+class InvalidInquiry(ValueError):
+    """The submission is missing required fields or is malformed."""
+
+
+def parse_payload(body: bytes, content_type: str = '') -> Dict[str, str]:
+    """Decode a submission like doPost: JSON when it parses, form fields otherwise."""
+    text = body.decode('utf-8', errors='replace')
+    if 'json' in (content_type or '').lower() or text.lstrip().startswith('{'):
+        try:
+            data = json.loads(text)
+            if isinstance(data, dict):
+                return {str(key): '' if value is None else str(value) for key, value in data.items()}
+        except ValueError:
+            pass
+    return {key: values[-1] for key, values in parse_qs(text, keep_blank_values=True).items()}
+
+
+def _local_now() -> datetime:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+    try:
+        return datetime.now(ZoneInfo(Config.INQUIRY_TIMEZONE))
+    except (ZoneInfoNotFoundError, ValueError):
+        return datetime.now().astimezone()
+
+
+def normalize_inquiry(data: Dict[str, str], client_ip: Optional[str] = None,
+                      now: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    Validate a submission and fill in the values doPost derived on receipt.
+
+    Args:
+        data: Submitted fields
+        client_ip: Address the request came from, used when the payload has none
+        now: Receipt time (defaults to now, in Config.INQUIRY_TIMEZONE)
+
+    Returns:
+        The inquiry: every INQUIRY_FIELDS entry plus ip_address, date and time
+
+    Raises:
+        InvalidInquiry: when the email is missing or invalid, or a field is too long
+    """
+    email = (data.get('email') or '').strip()
+    if not email:
+        raise InvalidInquiry('Email is required')
+    if not _EMAIL.match(email):
+        raise InvalidInquiry('Email address is invalid')
+    for key, value in data.items():
+        if len(value) > MAX_FIELD_LENGTH:
+            raise InvalidInquiry(f'{key} is too long')
+    now = now or _local_now()
+    inquiry = {field: (data.get(field) or '').strip() for field in INQUIRY_FIELDS}
+    inquiry['email'] = email
+    inquiry['timestamp'] = inquiry['timestamp'] or now.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+    inquiry['ip_address'] = data.get('ipAddress') or data.get('ip_address') or client_ip or 'Unknown'
+    inquiry['date'] = now.strftime('%Y-%m-%d')
+    inquiry['time'] = now.strftime('%H:%M:%S')
+    return inquiry
+
+
+def inquiry_row(inquiry: Dict[str, str], headers: List[str]) -> List[str]:
+    """The sheet row for an inquiry, in the order of the sheet's own header row."""
+    return [inquiry.get(HEADER_FIELDS.get(header.lower().strip()), '') for header in headers]
+
+
+class InquirySheet:
+    """
+    Appends inquiry rows to the inquiries tab.
+
+    The header row is read on the first append, or written if the tab is
+    empty, and then reused.
+    """
+
+    def __init__(self, spreadsheet_id: Optional[str] = None, sheet_name: Optional[str] = None):
+        self.spreadsheet_id = spreadsheet_id or Config.INQUIRY_SHEET_ID
+        self.sheet_name = sheet_name or Config.INQUIRY_SHEET_NAME
+        self._headers: Optional[List[str]] = None
+
+    def _execute(self, request, name: str):
+        from retry import execute_with_retry
+        from sheets_batcher import get_request_budget
+
+        get_request_budget().acquire()
+        return execute_with_retry(request, name=name)
+
+    def headers(self) -> List[str]:
+        if self._headers is None:
+            from sheets_client import get_sheets_service
+
+            values = get_sheets_service().spreadsheets().values()
+            result = self._execute(values.get(spreadsheetId=self.spreadsheet_id,
+                                              range=f"'{self.sheet_name}'!1:1"), name='sheets.values.get')
+            headers = (result.get('values') or [[]])[0]
+            if not headers:
+                self._execute(values.update(spreadsheetId=self.spreadsheet_id, range=f"'{self.sheet_name}'!A1",
+                                            valueInputOption='RAW', body={'values': [INQUIRY_HEADERS]}),
+                              name='sheets.values.update')
+                headers = list(INQUIRY_HEADERS)
+            self._headers = headers
+        return self._headers
+
+    def append(self, inquiries: List[Dict[str, str]]) -> int:
+        """
+        Append inquiries as rows with one request.
+
+        Returns:
+            Number of rows written
+        """
+        if not inquiries:
+            return 0
+        from sheets_client import get_sheets_service
+
+        headers = self.headers()
+        rows = [inquiry_row(inquiry, headers) for inquiry in inquiries]
+        # RAW, so a message starting with "=" is stored as text rather than run as a formula
+        self._execute(get_sheets_service().spreadsheets().values().append(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"'{self.sheet_name}'!A1",
+            valueInputOption='RAW',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ), name='sheets.values.append')
+        return len(rows)
+
+
+class InquiryService:
+    """
+    Accepts inquiries into a write-ahead log and writes them from a background thread.
+
+    With Config.WAL_DIR empty the log is kept in memory, and inquiries not yet
+    written are lost if the process stops.
+
+    Args:
+        sheet: Where rows go, defaults to InquirySheet()
+        notifier: Who is told, defaults to DigestNotifier()
+        queue_size: Accepted inquiries that may wait to be written before submissions are refused
+        batch_size: Most inquiries per sheet append
+        flush_interval: Seconds to keep collecting a batch after its first inquiry
+        wal: Log inquiries are accepted into, defaults to get_wal('inquiries')
+    """
+
+    def __init__(self, sheet: Optional[InquirySheet] = None, notifier: Optional[DigestNotifier] = None,
+                 queue_size: Optional[int] = None, batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None, wal: Optional[WriteAheadLog] = None):
+        self.sheet = sheet or InquirySheet()
+        self.notifier = notifier or DigestNotifier()
+        self.queue_size = queue_size or Config.INQUIRY_QUEUE_SIZE
+        self.batch_size = batch_size or Config.INQUIRY_BATCH_SIZE
+        self.flush_interval = Config.INQUIRY_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.wal = wal or get_wal('inquiries') or WriteAheadLog(None)
+        self._flusher = WalFlusher(self.wal, self._write, batch_size=self.batch_size,
+                                   linger=self.flush_interval, name='inquiry-writer')
+        REGISTRY.add_collector(self._samples)
+
+    def _samples(self):
+        yield ('inquiry_service_queue_depth', 'gauge', 'Inquiries accepted but not yet written', {},
+               self.wal.pending_count)
+
+    def start(self):
+        if self.wal.pending_count:
+            logger.info(f"{self.wal.pending_count} inquiries from an earlier run are waiting to be written")
+        self.notifier.start()
+        self._flusher.start()
+        return self
+
+    def submit(self, inquiry: Dict[str, str]) -> bool:
+        """
+        Log a normalized inquiry for writing.
+
+        Returns:
+            False when too many inquiries are waiting or the log cannot be written
+            (the caller should ask the client to retry)
+        """
+        if self.wal.pending_count >= self.queue_size:
+            return False
+        try:
+            self.wal.append([inquiry])
+        except OSError as e:
+            logger.error(f"Could not log inquiry: {e}")
+            return False
+        return True
+
+    def stop(self, timeout: float = 30.0):
+        """Try once more to write everything logged and email everything held, then stop."""
+        self._flusher.stop(timeout)
+        self.notifier.stop(timeout)
+
+    def _write(self, batch: List[Dict[str, str]]):
+        """Flusher sink; raising leaves the batch in the log for a later retry."""
+        try:
+            written = self.sheet.append(batch)
+        except Exception:
+            REGISTRY.inc('inquiry_service_write_failures_total')
+            raise
+        REGISTRY.inc('inquiry_service_rows_written_total', written)
+        logger.info(f"Appended {written} inquiries to '{self.sheet.sheet_name}'")
+        try:
+            self.notifier.send(batch)
+        except Exception as e:
+            # The rows are in the sheet; raising would append them again on retry
+            logger.error(f"Could not queue notifications for {len(batch)} inquiries: {e}")
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    for proxy in Config.INQUIRY_TRUSTED_PROXIES:
+        try:
+            if ip in ipaddress.ip_network(proxy, strict=False):
+                return True
+        except ValueError:
+            logger.warning(f"Ignoring invalid INQUIRY_TRUSTED_PROXIES entry {proxy!r}")
+    return False
+
+
+def _client_ip(handler: BaseHTTPRequestHandler) -> str:
+    """
+    Address of the submitting client.
+
+    X-Forwarded-For is anyone's to forge, so it is only read when the connection
+    comes from one of Config.INQUIRY_TRUSTED_PROXIES. The client is then the
+    last address in it that is not itself a trusted proxy.
+    """
+    address = handler.client_address[0]
+    if not _is_trusted_proxy(address):
+        return address
+    forwarded = [hop.strip() for hop in handler.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+    for hop in reversed(forwarded):
+        address = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return address
+
+
+class _InquiryHandler(BaseHTTPRequestHandler):
+    """POST / (or /exec, like the Apps Script URL) takes an inquiry; GET /healthz and /metrics."""
+
+    server_version = 'InquiryService/1.0'
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', Config.INQUIRY_ALLOWED_ORIGIN)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: dict):
+        self._send(status, json.dumps(payload).encode('utf-8'))
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', Config.INQUIRY_ALLOWED_ORIGIN)
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', '86400')
+        self.end_headers()
+
+    def do_POST(self):
+        if self.path.split('?', 1)[0].rstrip('/') not in ('', '/exec', '/inquiries'):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            REGISTRY.inc('inquiry_service_requests_total', outcome='invalid')
+            self._send_json(413, {'success': False, 'error': 'Submission is too large'})
+            return
+        body = self.rfile.read(length)
+        if not body and '?' in self.path:
+            body = self.path.split('?', 1)[1].encode('utf-8')  # e.parameter fallback
+        try:
+            inquiry = normalize_inquiry(parse_payload(body, self.headers.get('Content-Type', '')),
+                                        client_ip=_client_ip(self))
+        except InvalidInquiry as e:
+            REGISTRY.inc('inquiry_service_requests_total', outcome='invalid')
+            self._send_json(400, {'success': False, 'error': str(e)})
+            return
+        if not self.server.service.submit(inquiry):
+            REGISTRY.inc('inquiry_service_requests_total', outcome='rejected')
+            logger.warning("Inquiry queue is full, refusing submission")
+            self._send_json(503, {'success': False, 'error': 'Too many submissions, please try again shortly'})
+            return
+        REGISTRY.inc('inquiry_service_requests_total', outcome='accepted')
+        self._send_json(200, {'success': True, 'message': 'Inquiry submitted successfully'})
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/healthz':
+            self._send(200, b'ok\n', 'text/plain; charset=utf-8')
+        elif path == '/metrics':
+            self._send(200, REGISTRY.render().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8')
+        else:
+            self.send_error(404)
+
+    def log_message(self, format, *args):
+        logger.debug(f"inquiries {self.address_string()} {format % args}")
+
+
+def start_inquiry_server(service: InquiryService, host: Optional[str] = None, port: Optional[int] = None):
+    """
+    Start the service's worker and its HTTP endpoint in daemon threads.
+
+    Returns:
+        The running server (server.service is the InquiryService)
+    """
+    host = Config.INQUIRY_HOST if host is None else host
+    port = Config.INQUIRY_PORT if port is None else port
+    service.start()
+    server = ThreadingHTTPServer((host, int(port)), _InquiryHandler)
+    server.daemon_threads = True
+    server.service = service
+    thread = threading.Thread(target=server.serve_forever, name='inquiry-server', daemon=True)
+    thread.start()
+    logger.info(f"Accepting inquiries on http://{host}:{server.server_port}/")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Accept website inquiries and write them to Google Sheets')
+    parser.add_argument('--host', default=Config.INQUIRY_HOST)
+    parser.add_argument('--port', type=int, default=Config.INQUIRY_PORT)
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    service = InquiryService()
+    if not service.notifier.enabled:
+        logger.warning("SMTP_HOST is not set; inquiries are written to the sheet without email notifications")
+    server = start_inquiry_server(service, args.host, args.port)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        service.stop()
+
+
+if __name__ == '__main__':
+    main()
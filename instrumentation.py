@@ -0,0 +1,226 @@
+"""
+Per-run stage timing and profiling instrumentation for the job scraper agents.
+
+A RunInstrumentation context records one entry per stage (driver start,
+navigation, each API source, sheet reads and writes, ...) with its duration,
+item count and bytes transferred. Stages can be opened from anywhere through
+the module-level stage() helper; outside of an active run they are no-ops.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ('cprofile', 'pyinstrument')
+
+_active_run = None
+_local = threading.local()
+_run_listeners = []
+
+
+class RunInstrumentation:
+    """Collects stage records for a single scraping run."""
+
+    def __init__(self, run_name: str, output_file: Optional[str] = None, profiler: Optional[str] = None):
+        self.run_name = run_name
+        self.run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.output_file = Config.INSTRUMENTATION_FILE if output_file is None else output_file
+        self.profiler_name = (profiler or '').lower() or None
+        self.records: List[Dict] = []
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._started = None
+        self.duration = 0.0
+        self.finished_at = None
+
+    def __enter__(self):
+        global _active_run
+        self._started = time.perf_counter()
+        self._start_profiler()
+        _active_run = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _active_run
+        _active_run = None
+        self.duration = time.perf_counter() - self._started
+        self.finished_at = time.time()
+        self._stop_profiler()
+        for listener in list(_run_listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                logger.warning(f"Run listener failed: {e}")
+        try:
+            if self.output_file:
+                self.write_jsonl(self.output_file)
+            logger.info(f"Run {self.run_id} stage summary:\n{self.summary_table()}")
+        except Exception as e:
+            logger.warning(f"Error exporting run instrumentation: {e}")
+        return False
+
+    @contextmanager
+    def stage(self, name: str, **fields):
+        """Time a stage; the yielded dict may be updated with count/bytes/extra fields."""
+        record = {'stage': name, 'count': 0, 'bytes': 0}
+        record.update(fields)
+        stack = _stage_stack()
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            stack.pop()
+            record['start'] = round(start - self._started, 6)
+            record['duration'] = round(time.perf_counter() - start, 6)
+            with self._lock:
+                self.records.append(record)
+
+    def summary(self) -> List[Dict]:
+        """Aggregate records by stage name, in order of first appearance."""
+        totals: Dict[str, Dict] = {}
+        with self._lock:
+            records = list(self.records)
+        for record in sorted(records, key=lambda r: r['start']):
+            entry = totals.setdefault(record['stage'], {
+                'stage': record['stage'], 'calls': 0, 'total': 0.0, 'max': 0.0,
+                'count': 0, 'bytes': 0, 'errors': 0
+            })
+            entry['calls'] += 1
+            entry['total'] += record['duration']
+            entry['max'] = max(entry['max'], record['duration'])
+            entry['count'] += record.get('count') or 0
+            entry['bytes'] += record.get('bytes') or 0
+            if record.get('error'):
+                entry['errors'] += 1
+        return list(totals.values())
+
+    def summary_table(self) -> str:
+        """Render the aggregated stages as a fixed-width text table."""
+        header = f"{'stage':<28} {'calls':>6} {'total s':>9} {'mean s':>8} {'max s':>8} {'%run':>6} {'count':>7} {'bytes':>11} {'err':>4}"
+        lines = [header, '-' * len(header)]
+        for entry in self.summary():
+            share = (entry['total'] / self.duration * 100) if self.duration else 0.0
+            lines.append(
+                f"{entry['stage'][:28]:<28} {entry['calls']:>6} {entry['total']:>9.3f} "
+                f"{entry['total'] / entry['calls']:>8.3f} {entry['max']:>8.3f} {share:>6.1f} "
+                f"{entry['count']:>7} {entry['bytes']:>11} {entry['errors']:>4}"
+            )
+        lines.append(f"{'run total':<28} {'':>6} {self.duration:>9.3f}")
+        return '\n'.join(lines)
+
+    def write_jsonl(self, path: str):
+        """Append one JSON line per stage record plus a run summary line."""
+        base = {'run_id': self.run_id, 'run': self.run_name}
+        with self._lock:
+            records = list(self.records)
+        with open(path, 'a') as f:
+            for record in sorted(records, key=lambda r: r['start']):
+                f.write(json.dumps({**base, 'type': 'stage', **record}) + '\n')
+            f.write(json.dumps({
+                **base, 'type': 'run', 'duration': round(self.duration, 6),
+                'finished_at': datetime.now(timezone.utc).isoformat(),
+                'stages': self.summary()
+            }) + '\n')
+
+    def _start_profiler(self):
+        if not self.profiler_name:
+            return
+        if self.profiler_name == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profiler_name == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                logger.warning("pyinstrument not installed; run will not be profiled")
+                return
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            logger.warning(f"Unknown profiler '{self.profiler_name}', expected one of {PROFILERS}")
+
+    def _stop_profiler(self):
+        if not self._profiler:
+            return
+        try:
+            if self.profiler_name == 'cprofile':
+                self._profiler.disable()
+                import io
+                import pstats
+                path = os.path.join(Config.PROFILE_DIR, f"profile-{self.run_id}.prof")
+                os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+                self._profiler.dump_stats(path)
+                out = io.StringIO()
+                pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(20)
+                logger.info(f"cProfile stats written to {path}\n{out.getvalue()}")
+            else:
+                self._profiler.stop()
+                path = os.path.join(Config.PROFILE_DIR, f"profile-{self.run_id}.html")
+                os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+                with open(path, 'w') as f:
+                    f.write(self._profiler.output_html())
+                logger.info(f"pyinstrument profile written to {path}")
+        except Exception as e:
+            logger.warning(f"Error writing profile: {e}")
+        finally:
+            self._profiler = None
+
+
+def _stage_stack() -> List[Dict]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def add_run_listener(listener):
+    """Register a callable invoked with each RunInstrumentation as it finishes."""
+    if listener not in _run_listeners:
+        _run_listeners.append(listener)
+
+
+def current_run() -> Optional[RunInstrumentation]:
+    """Return the active run, if any."""
+    return _active_run
+
+
+@contextmanager
+def stage(name: str, **fields):
+    """Time a stage of the active run; a no-op outside of a run."""
+    run = _active_run
+    if run is None:
+        yield {'stage': name, 'count': 0, 'bytes': 0, **fields}
+        return
+    with run.stage(name, **fields) as record:
+        yield record
+
+
+def add_bytes(nbytes: int):
+    """Attribute transferred bytes to the innermost open stage on this thread."""
+    stack = _stage_stack()
+    if stack and nbytes:
+        stack[-1]['bytes'] += nbytes
+
+
+def profiler_from_argv(argv: List[str]) -> Optional[str]:
+    """Read '--profile' or '--profile=<name>' from CLI args, falling back to Config.PROFILER."""
+    for arg in argv:
+        if arg == '--profile':
+            return Config.PROFILER or 'cprofile'
+        if arg.startswith('--profile='):
+            return arg.split('=', 1)[1]
+    return Config.PROFILER or None
@@ -0,0 +1,196 @@
+"""
+Compact job record shared by every job source, filter, scorer and the sheet writer.
+
+JobRecord uses __slots__ instead of a per-posting dict and computes the
+normalized fields (lowercased title/company/location, canonical URL and parsed
+minimum salary) once, so filters and scorers do not redo the work. The URL and
+salary are normalized on first access, since most postings are filtered out
+before anything reads them.
+It keeps a dict-like interface (get, [], keys, items) so existing callers that
+treat jobs as dictionaries continue to work.
+"""
+import re
+from datetime import datetime
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+from config import Config
+from url_index import canonicalize_url, job_key, key_to_int
+
+_UNSET = object()
+
+SALARY_PATTERN = re.compile(r'\$?(\d+(?:,\d{3})*)')
+
+# Sheet header names (and other spellings) mapped to record fields
+FIELD_ALIASES = {
+    'scraped date': 'scraped_date',
+    'scraped time': 'scraped_time',
+    'date': 'scraped_date',
+    'time': 'scraped_time',
+    'link': 'url',
+}
+
+
+def field_name(header) -> str:
+    """Record field for a sheet header such as 'Title' or 'Scraped Date'."""
+    name = str(header).strip().lower()
+    return FIELD_ALIASES.get(name, name.replace(' ', '_'))
+
+
+def batch_timestamp(now: Optional[datetime] = None) -> Tuple[str, str]:
+    """
+    Return the (scraped_date, scraped_time) strings for a batch of postings.
+
+    Parsers call this once per response rather than twice per job.
+    """
+    now = now or datetime.now()
+    return now.strftime('%Y-%m-%d'), now.strftime('%H:%M:%S')
+
+
+def parse_salary(salary: str) -> Optional[int]:
+    """
+    Extract the first salary figure from free text, e.g. '$150K - $200K' -> 150000.
+
+    Returns:
+        The amount in dollars, or None when no number is present.
+    """
+    if not salary:
+        return None
+    match = SALARY_PATTERN.search(salary)
+    if not match:
+        return None
+    try:
+        amount = int(match.group(1).replace(',', ''))
+    except ValueError:
+        return None
+    lowered = salary.lower()
+    if 'k' in lowered or 'thousand' in lowered:
+        amount *= 1000
+    return amount
+
+
+class JobRecord:
+    """A single job posting with precomputed normalized fields."""
+
+    FIELDS = ('title', 'company', 'location', 'salary', 'description', 'url',
+              'scraped_date', 'scraped_time', 'source')
+
+    __slots__ = FIELDS + ('source_id', 'title_lower', 'company_lower', 'location_lower',
+                          '_canonical_url', '_salary_min', '_job_key')
+
+    def __init__(self, title: str = '', company: str = '', location: str = '', salary: str = 'Not specified',
+                 description: str = '', url: str = '', scraped_date: str = '', scraped_time: str = '',
+                 source: str = '', source_id: str = ''):
+        self.title = title or ''
+        self.company = company or ''
+        self.location = location or ''
+        self.salary = salary or ''
+        self.description = description or ''
+        self.url = url or ''
+        self.scraped_date = scraped_date or ''
+        self.scraped_time = scraped_time or ''
+        self.source = source or ''
+        self.source_id = source_id or ''  # Namespaced ID from the source API, e.g. 'serpapi:<job_id>'
+        self._normalize()
+
+    def _normalize(self):
+        """(Re)compute the derived fields from the raw ones."""
+        self.title_lower = self.title.strip().lower()
+        self.company_lower = self.company.strip().lower()
+        self.location_lower = self.location.lower()
+        self._canonical_url = None
+        self._salary_min = _UNSET
+        self._job_key = _UNSET
+
+    @property
+    def canonical_url(self) -> str:
+        if self._canonical_url is None:
+            self._canonical_url = canonicalize_url(self.url)
+        return self._canonical_url
+
+    @property
+    def job_key(self) -> Optional[str]:
+        """Stable posting identity, e.g. 'linkedin:3712345678' (see url_index.job_key)."""
+        if self._job_key is _UNSET:
+            self._job_key = job_key(self.url, self.source_id)
+        return self._job_key
+
+    @property
+    def job_key_id(self) -> Optional[int]:
+        """64-bit integer form of job_key, for compact seen-sets."""
+        key = self.job_key
+        return key_to_int(key) if key else None
+
+    @property
+    def salary_min(self) -> Optional[int]:
+        if self._salary_min is _UNSET:
+            self._salary_min = parse_salary(self.salary)
+        return self._salary_min
+
+    @property
+    def description_lower(self) -> str:
+        """Lowercased opening of the description (Config.DESCRIPTION_MATCH_LENGTH chars) for keyword matching."""
+        # Deeper text (benefits, "reports to the Head of Hardware") would let almost any posting match
+        return self.description[:Config.DESCRIPTION_MATCH_LENGTH].lower()
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> 'JobRecord':
+        """
+        Build a record from a dict, accepting sheet-style headers such as 'Title' or 'Scraped Date'.
+        """
+        fields = {}
+        for key, value in data.items():
+            name = field_name(key)
+            if name in cls.FIELDS:
+                fields[name] = '' if value is None else str(value)
+        return cls(**fields)
+
+    # -- dict-compatible interface --------------------------------------
+
+    def get(self, key: str, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            if key == 'source' and not value:
+                return default
+            return value
+        return default
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value or '')
+        self._normalize()
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS and (key != 'source' or bool(self.source))
+
+    def keys(self) -> Iterator[str]:
+        return (field for field in self.FIELDS if field != 'source' or self.source)
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        return ((field, getattr(self, field)) for field in self.keys())
+
+    def to_dict(self) -> Dict[str, str]:
+        """Plain dict of the raw fields (source only when set)."""
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, JobRecord):
+            return all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"JobRecord(title={self.title!r}, company={self.company!r}, url={self.url!r})"
+
+
+def as_record(job) -> JobRecord:
+    """Return job as a JobRecord, converting plain dicts (e.g. sheet rows) when needed."""
+    if isinstance(job, JobRecord):
+        return job
+    return JobRecord.from_mapping(job)
@@ -3,14 +3,16 @@ Main agent script for LinkedIn job scraping and Google Sheets integration.
 Runs daily at 8 AM ET to scrape hardware manager jobs in NY.
 """
 import logging
-import schedule
 import time
 from datetime import datetime, timezone
 import sys
 
-from linkedin_scraper import LinkedInJobScraper
-from google_sheets import GoogleSheetsManager
 from config import Config
+from job_record import as_record
+from run_history import write_run_history
+from description_store import archive_descriptions
+from instrumentation import RunInstrumentation, stage, profiler_from_argv
+from metrics import record_jobs, start_metrics_server, metrics_port_from_argv
 
 # Configure logging
 logging.basicConfig(
@@ -27,9 +29,10 @@ logger = logging.getLogger(__name__)
 class JobScraperAgent:
     """Main agent class for job scraping operations."""
     
-    def __init__(self):
+    def __init__(self, profiler=None):
         self.linkedin_scraper = None
         self.sheets_manager = None
+        self.profiler = profiler
     
     def initialize(self):
         """Initialize the scraper and sheets manager."""
@@ -39,9 +42,11 @@ class JobScraperAgent:
             # Validate configuration
             Config.validate_config()
             
+            # Heavy client libraries are imported here rather than at startup
+            from google_sheets import GoogleSheetsManager
+            
             # Initialize components
             self.sheets_manager = GoogleSheetsManager()
-            self.sheets_manager.create_sheet_if_not_exists()
             
             logger.info("Agent initialized successfully")
             
@@ -54,40 +59,58 @@ class JobScraperAgent:
         start_time = datetime.now(timezone.utc)
         logger.info(f"Starting daily job scraping at {start_time}")
         
-        try:
-            # Initialize scraper for this run
-            self.linkedin_scraper = LinkedInJobScraper()
-            
-            # Scrape jobs
-            logger.info("Scraping LinkedIn for hardware manager jobs...")
-            jobs = self.linkedin_scraper.scrape_jobs()
-            
-            if not jobs:
-                logger.warning("No jobs found during scraping")
-                return
-            
-            logger.info(f"Found {len(jobs)} jobs during scraping")
-            
-            # Sort jobs by relevance (you can implement custom sorting logic here)
-            sorted_jobs = self.sort_jobs_by_relevance(jobs)
-            
-            # Take top 30 jobs
-            top_jobs = sorted_jobs[:Config.MAX_RESULTS]
-            logger.info(f"Selected top {len(top_jobs)} jobs for processing")
-            
-            # Add to Google Sheets
-            logger.info("Adding jobs to Google Sheet...")
-            added_count = self.sheets_manager.add_jobs_to_sheet(top_jobs)
-            
-            logger.info(f"Successfully added {added_count} new jobs to Google Sheet")
+        with RunInstrumentation('linkedin', profiler=self.profiler) as run:
+            try:
+                # Initialize scraper for this run (Selenium is only imported when a run starts)
+                from linkedin_scraper import LinkedInJobScraper
+                self.linkedin_scraper = LinkedInJobScraper()
+            
+                # Scrape jobs
+                logger.info("Scraping LinkedIn for hardware manager jobs...")
+                jobs = self.linkedin_scraper.scrape_jobs()
+            
+                if not jobs:
+                    logger.warning("No jobs found during scraping")
+                    return
+            
+                logger.info(f"Found {len(jobs)} jobs during scraping")
+                record_jobs('found', len(jobs))
+            
+                # Sort jobs by relevance (you can implement custom sorting logic here)
+                with stage('scoring', count=len(jobs)):
+                    sorted_jobs = self.sort_jobs_by_relevance(jobs)
+            
+                # Keep every scored job in the columnar run history and full descriptions in the archive
+                write_run_history(sorted_jobs, run_id=run.run_id, run_name=run.run_name)
+                archive_descriptions(sorted_jobs)
+            
+                # Take top 30 jobs
+                top_jobs = sorted_jobs[:Config.MAX_RESULTS]
+                logger.info(f"Selected top {len(top_jobs)} jobs for processing")
+                record_jobs('filtered', len(top_jobs))
+            
+                # Add to Google Sheets
+                logger.info("Adding jobs to Google Sheet...")
+                # One batch per run: the sheet check rides on the read, writes go out when it exits
+                with self.sheets_manager.batch():
+                    self.sheets_manager.create_sheet_if_not_exists()
+                    self.sheets_manager.add_jobs_to_sheet(top_jobs)
+                # Final once the batch has flushed: duplicates and failed writes are counted apart
+                counts = self.sheets_manager.take_counts()
+            
+                logger.info(f"Successfully added {counts['added']} new jobs to Google Sheet")
+                if counts['failed']:
+                    logger.error(f"{counts['failed']} jobs could not be written to Google Sheet")
+                for step in ('deduped', 'failed', 'added'):
+                    record_jobs(step, counts[step])
             
-        except Exception as e:
-            logger.error(f"Error during job scraping: {e}")
-        finally:
-            # Clean up
-            if self.linkedin_scraper:
-                self.linkedin_scraper.close()
-                self.linkedin_scraper = None
+            except Exception as e:
+                logger.error(f"Error during job scraping: {e}")
+            finally:
+                # Clean up
+                if self.linkedin_scraper:
+                    self.linkedin_scraper.close()
+                    self.linkedin_scraper = None
         
         end_time = datetime.now(timezone.utc)
         duration = end_time - start_time
@@ -104,10 +127,11 @@ class JobScraperAgent:
             Sorted list of jobs
         """
         def relevance_score(job):
+            job = as_record(job)
             score = 0
-            title = job.get('title', '').lower()
-            description = job.get('description', '').lower()
-            salary = job.get('salary', '')
+            title = job.title_lower
+            description = job.description_lower
+            salary_num = job.salary_min
             
             # Title relevance scoring
             if 'hardware' in title:
@@ -124,20 +148,11 @@ class JobScraperAgent:
                 score += 5
             
             # Salary scoring (try to extract numeric value)
-            if salary and salary != 'not specified':
-                import re
-                salary_match = re.search(r'\$?(\d+(?:,\d{3})*)', salary)
-                if salary_match:
-                    try:
-                        salary_num = int(salary_match.group(1).replace(',', ''))
-                        if 'k' in salary.lower() or 'thousand' in salary.lower():
-                            salary_num *= 1000
-                        if salary_num >= Config.MIN_SALARY:
-                            score += 3
-                        if salary_num >= Config.MIN_SALARY * 1.2:  # 20% above minimum
-                            score += 2
-                    except:
-                        pass
+            if salary_num is not None:
+                if salary_num >= Config.MIN_SALARY:
+                    score += 3
+                if salary_num >= Config.MIN_SALARY * 1.2:  # 20% above minimum
+                    score += 2
             
             return score
         
@@ -146,6 +161,8 @@ class JobScraperAgent:
     def schedule_jobs(self):
         """Schedule the daily job scraping task."""
         try:
+            import schedule
+            
             logger.info(f"Scheduling daily job scraping for {Config.SCHEDULE_TIME} ET")
             
             # Schedule the job for 8 AM ET daily
@@ -164,6 +181,8 @@ class JobScraperAgent:
     
     def start_scheduler(self):
         """Start the scheduler and keep the agent running."""
+        import schedule
+        
         logger.info("Starting job scraper agent scheduler...")
         
         while True:
@@ -179,14 +198,17 @@ class JobScraperAgent:
 
 def main():
     """Main function to run the agent."""
-    agent = JobScraperAgent()
+    agent = JobScraperAgent(profiler=profiler_from_argv(sys.argv[1:]))
     
     try:
+        # Start the optional metrics endpoint
+        start_metrics_server(metrics_port_from_argv(sys.argv[1:]))
+        
         # Initialize the agent
         agent.initialize()
         
         # Check if we should run immediately or start scheduler
-        if len(sys.argv) > 1 and sys.argv[1] == '--run-now':
+        if '--run-now' in sys.argv[1:]:
             logger.info("Running job scraping immediately...")
             agent.run_immediately()
         else:
@@ -7,9 +7,14 @@ import logging
 import os
 from typing import List, Dict, Optional
 import time
-from datetime import datetime
 from dotenv import load_dotenv
 
+from config import Config
+from retry import request_with_retry
+from job_record import JobRecord, as_record, batch_timestamp
+from near_dup import DuplicateDetector
+from instrumentation import stage
+
 # Load environment variables
 load_dotenv()
 
@@ -47,7 +52,7 @@ class LegitimateJobScraper:
                 logger.warning("Adzuna API credentials not configured. Please set ADZUNA_APP_KEY and ADZUNA_APP_ID in .env file")
                 return []
             
-            url = "https://api.adzuna.com/v1/api/jobs/us/search/1"
+            url = f"{Config.ADZUNA_API_URL}/1"
             
             params = {
                 'app_id': app_id,
@@ -59,7 +64,7 @@ class LegitimateJobScraper:
                 'content-type': 'application/json'
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = request_with_retry(requests, 'GET', url, name='adzuna', params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -83,7 +88,7 @@ class LegitimateJobScraper:
             # You'll need to get a free API key
             api_key = "YOUR_JOBAPI_KEY"  # Get from job aggregator services
             
-            url = "https://www.reed.co.uk/api/1.0/search"
+            url = Config.JOBAPI_URL
             
             headers = {
                 'Authorization': f'Basic {api_key}',
@@ -97,7 +102,7 @@ class LegitimateJobScraper:
                 'minimumSalary': '180000'
             }
             
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+            response = request_with_retry(requests, 'GET', url, name='jobapi', headers=headers, params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -119,7 +124,7 @@ class LegitimateJobScraper:
             logger.info("Welcome to the Jungle: Attempting to access real job data...")
             
             # Try different possible API endpoints
-            possible_endpoints = [
+            possible_endpoints = [Config.WTTJ_API_URL] if Config.WTTJ_API_URL else [
                 "https://api.welcometothejungle.com/api/v2/jobs",
                 "https://www.welcometothejungle.com/api/v2/jobs",
                 "https://welcometothejungle.com/api/v2/jobs"
@@ -134,7 +139,8 @@ class LegitimateJobScraper:
             
             for endpoint in possible_endpoints:
                 try:
-                    response = requests.get(endpoint, params=params, timeout=10)
+                    response = request_with_retry(requests, 'GET', endpoint, name='wttj', params=params, timeout=10,
+                                                  max_retries=1)
                     if response.status_code == 200:
                         data = response.json()
                         logger.info(f"Successfully accessed Welcome to the Jungle API at {endpoint}")
@@ -158,7 +164,7 @@ class LegitimateJobScraper:
             # You'll need to register for Indeed's Partner API
             publisher_id = "YOUR_INDEED_PUBLISHER_ID"
             
-            url = "https://api.indeed.com/ads/apisearch"
+            url = Config.INDEED_API_URL
             
             params = {
                 'publisher': publisher_id,
@@ -175,7 +181,7 @@ class LegitimateJobScraper:
                 'co': 'us'
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = request_with_retry(requests, 'GET', url, name='indeed', params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -202,7 +208,7 @@ class LegitimateJobScraper:
                 logger.warning("SerpAPI key not configured. Please set SERPAPI_KEY in .env file")
                 return []
             
-            url = "https://serpapi.com/search"
+            url = Config.SERPAPI_URL
             
             params = {
                 'api_key': api_key,
@@ -213,7 +219,7 @@ class LegitimateJobScraper:
                 'num': min(limit, 10)  # SerpAPI free tier limits
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = request_with_retry(requests, 'GET', url, name='serpapi', params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -229,18 +235,20 @@ class LegitimateJobScraper:
     def _parse_adzuna_results(self, data: dict) -> List[Dict]:
         """Parse Adzuna API results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('results', []):
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company', {}).get('display_name', ''),
-                'location': job_data.get('location', {}).get('display_name', ''),
-                'salary': f"${job_data.get('salary_min', '')} - ${job_data.get('salary_max', '')}" if job_data.get('salary_min') else "Not specified",
-                'description': job_data.get('description', '')[:500],  # Truncate
-                'url': job_data.get('redirect_url', ''),
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S')
-            }
+            job = JobRecord(
+                title=job_data.get('title', ''),
+                company=job_data.get('company', {}).get('display_name', ''),
+                location=job_data.get('location', {}).get('display_name', ''),
+                salary=f"${job_data.get('salary_min', '')} - ${job_data.get('salary_max', '')}" if job_data.get('salary_min') else "Not specified",
+                description=job_data.get('description', ''),
+                url=job_data.get('redirect_url', ''),
+                scraped_date=scraped_date,
+                scraped_time=scraped_time,
+                source_id=f"adzuna:{job_data['id']}" if job_data.get('id') else ''
+            )
             
             # Filter for hardware manager positions
             if self._is_hardware_manager_job(job):
@@ -251,18 +259,19 @@ class LegitimateJobScraper:
     def _parse_jobapi_results(self, data: dict) -> List[Dict]:
         """Parse JobAPI results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('results', []):
-            job = {
-                'title': job_data.get('jobTitle', ''),
-                'company': job_data.get('employerName', ''),
-                'location': job_data.get('locationName', ''),
-                'salary': f"{job_data.get('minimumSalary', '')} - {job_data.get('maximumSalary', '')}" if job_data.get('minimumSalary') else "Not specified",
-                'description': job_data.get('jobDescription', '')[:500],
-                'url': job_data.get('jobUrl', ''),
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S')
-            }
+            job = JobRecord(
+                title=job_data.get('jobTitle', ''),
+                company=job_data.get('employerName', ''),
+                location=job_data.get('locationName', ''),
+                salary=f"{job_data.get('minimumSalary', '')} - {job_data.get('maximumSalary', '')}" if job_data.get('minimumSalary') else "Not specified",
+                description=job_data.get('jobDescription', ''),
+                url=job_data.get('jobUrl', ''),
+                scraped_date=scraped_date,
+                scraped_time=scraped_time
+            )
             
             if self._is_hardware_manager_job(job):
                 jobs.append(job)
@@ -272,21 +281,22 @@ class LegitimateJobScraper:
     def _parse_wttj_results(self, data: dict) -> List[Dict]:
         """Parse Welcome to the Jungle API results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('jobs', []):
             company_info = job_data.get('organization', {})
             location_info = job_data.get('place', {})
             
-            job = {
-                'title': job_data.get('name', ''),
-                'company': company_info.get('name', ''),
-                'location': location_info.get('city', '') + ', ' + location_info.get('country', ''),
-                'salary': self._parse_wttj_salary(job_data.get('salary', {})),
-                'description': job_data.get('description', '')[:500],
-                'url': job_data.get('websites_urls', {}).get('job_details', ''),
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S')
-            }
+            job = JobRecord(
+                title=job_data.get('name', ''),
+                company=company_info.get('name', ''),
+                location=location_info.get('city', '') + ', ' + location_info.get('country', ''),
+                salary=self._parse_wttj_salary(job_data.get('salary', {})),
+                description=job_data.get('description', ''),
+                url=job_data.get('websites_urls', {}).get('job_details', ''),
+                scraped_date=scraped_date,
+                scraped_time=scraped_time
+            )
             
             if self._is_hardware_manager_job(job):
                 jobs.append(job)
@@ -296,18 +306,19 @@ class LegitimateJobScraper:
     def _parse_indeed_results(self, data: dict) -> List[Dict]:
         """Parse Indeed API results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('results', []):
-            job = {
-                'title': job_data.get('jobtitle', ''),
-                'company': job_data.get('company', ''),
-                'location': job_data.get('formattedLocation', ''),
-                'salary': job_data.get('salary', 'Not specified'),
-                'description': job_data.get('snippet', '')[:500],
-                'url': job_data.get('url', ''),
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S')
-            }
+            job = JobRecord(
+                title=job_data.get('jobtitle', ''),
+                company=job_data.get('company', ''),
+                location=job_data.get('formattedLocation', ''),
+                salary=job_data.get('salary', 'Not specified'),
+                description=job_data.get('snippet', ''),
+                url=job_data.get('url', ''),
+                scraped_date=scraped_date,
+                scraped_time=scraped_time
+            )
             
             if self._is_hardware_manager_job(job):
                 jobs.append(job)
@@ -333,18 +344,20 @@ class LegitimateJobScraper:
     def _parse_serpapi_results(self, data: dict) -> List[Dict]:
         """Parse SerpAPI Google Jobs results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('jobs_results', []):
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company_name', ''),
-                'location': job_data.get('location', ''),
-                'salary': job_data.get('salary', {}).get('salary_text', 'Not specified') if job_data.get('salary') else 'Not specified',
-                'description': job_data.get('description', '')[:500],
-                'url': job_data.get('apply_options', [{}])[0].get('link', '') if job_data.get('apply_options') else '',
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S')
-            }
+            job = JobRecord(
+                title=job_data.get('title', ''),
+                company=job_data.get('company_name', ''),
+                location=job_data.get('location', ''),
+                salary=job_data.get('salary', {}).get('salary_text', 'Not specified') if job_data.get('salary') else 'Not specified',
+                description=job_data.get('description', ''),
+                url=job_data.get('apply_options', [{}])[0].get('link', '') if job_data.get('apply_options') else '',
+                scraped_date=scraped_date,
+                scraped_time=scraped_time,
+                source_id=f"serpapi:{job_data['job_id']}" if job_data.get('job_id') else ''
+            )
             
             if self._is_hardware_manager_job(job):
                 jobs.append(job)
@@ -353,8 +366,9 @@ class LegitimateJobScraper:
     
     def _is_hardware_manager_job(self, job: Dict) -> bool:
         """Check if job is hardware manager related."""
-        title = job.get('title', '').lower()
-        description = job.get('description', '').lower()
+        job = as_record(job)
+        title = job.title_lower
+        description = job.description_lower
         
         hardware_keywords = ['hardware', 'engineering manager', 'product manager', 'technical manager']
         manager_keywords = ['manager', 'director', 'lead', 'head']
@@ -374,7 +388,9 @@ class LegitimateJobScraper:
             try:
                 # Try RemoteOK for real remote hardware jobs
                 logger.info("Trying RemoteOK for real job data...")
-                remoteok_jobs = self.real_sources.search_remoteok(keywords, limit // 2)
+                with stage('source.RemoteOK') as source_stage:
+                    remoteok_jobs = self.real_sources.search_remoteok(keywords, limit // 2)
+                    source_stage['count'] = len(remoteok_jobs)
                 if remoteok_jobs:
                     logger.info(f"Found {len(remoteok_jobs)} real jobs from RemoteOK")
                     all_jobs.extend(remoteok_jobs)
@@ -408,22 +424,26 @@ class LegitimateJobScraper:
         for source_name, search_func in sources:
             try:
                 logger.info(f"Trying {source_name}...")
-                jobs = search_func(keywords, location, limit // len(sources))
+                with stage(f'source.{source_name}') as source_stage:
+                    jobs = search_func(keywords, location, limit // len(sources))
+                    source_stage['count'] = len(jobs)
                 logger.info(f"Found {len(jobs)} jobs from {source_name}")
                 all_jobs.extend(jobs)
-                time.sleep(1)  # Be respectful with API calls
+                time.sleep(Config.SOURCE_DELAY)  # Be respectful with API calls
             except Exception as e:
                 logger.warning(f"Error with {source_name}: {e}")
                 continue
         
-        # Remove duplicates based on title and company
-        unique_jobs = []
-        seen = set()
-        
-        for job in all_jobs:
-            job_id = (job.get('title', ''), job.get('company', ''))
-            if job_id not in seen and len(unique_jobs) < limit:
-                seen.add(job_id)
-                unique_jobs.append(job)
+        # Remove duplicates, including the same posting syndicated through several sources
+        with stage('filtering') as filtering:
+            unique_jobs = []
+            detector = DuplicateDetector()
+            
+            for job in all_jobs:
+                if len(unique_jobs) >= limit:
+                    break
+                if detector.add_if_new(job):
+                    unique_jobs.append(job)
+            filtering['count'] = len(all_jobs)
         
         return unique_jobs[:limit]
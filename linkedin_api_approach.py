@@ -6,6 +6,9 @@ import requests
 import logging
 from typing import List, Dict, Optional
 
+from retry import request_with_retry
+from job_record import JobRecord
+
 logger = logging.getLogger(__name__)
 
 class LinkedInOfficialAPI:
@@ -43,7 +46,8 @@ class LinkedInOfficialAPI:
                 "start": 0
             }
             
-            response = requests.get(url, headers=self.headers, params=params)
+            response = request_with_retry(requests, 'GET', url, name='linkedin_api',
+                                          headers=self.headers, params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -61,16 +65,16 @@ class LinkedInOfficialAPI:
         jobs = []
         
         for job_data in data.get('elements', []):
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('companyDetails', {}).get('company', {}).get('name', ''),
-                'location': job_data.get('location', {}).get('name', ''),
-                'salary': self._extract_salary(job_data),
-                'description': job_data.get('description', {}).get('text', ''),
-                'url': job_data.get('jobPostingUrl', ''),
-                'scraped_date': '',  # Will be filled by caller
-                'scraped_time': ''
-            }
+            job = JobRecord(
+                title=job_data.get('title', ''),
+                company=job_data.get('companyDetails', {}).get('company', {}).get('name', ''),
+                location=job_data.get('location', {}).get('name', ''),
+                salary=self._extract_salary(job_data),
+                description=job_data.get('description', {}).get('text', ''),
+                url=job_data.get('jobPostingUrl', ''),
+                scraped_date='',  # Will be filled by caller
+                scraped_time=''
+            )
             jobs.append(job)
         
         return jobs
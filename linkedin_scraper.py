@@ -5,17 +5,21 @@ import time
 import re
 import os
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 
 from config import Config
+from retry import retry_call
+from job_record import JobRecord, as_record, batch_timestamp
+from instrumentation import stage
+from metrics import browser_session_opened, browser_session_closed
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +28,9 @@ class LinkedInJobScraper:
     
     def __init__(self):
         self.driver = None
-        self.setup_driver()
+        with stage('driver_start'):
+            self.setup_driver()
+        browser_session_opened()
     
     def setup_driver(self):
         """Setup Chrome driver with appropriate options."""
@@ -91,43 +97,46 @@ class LinkedInJobScraper:
             search_url = self._build_search_url()
             logger.info(f"Navigating to: {search_url}")
             
-            self.driver.get(search_url)
+            with stage('navigation'):
+                retry_call(self.driver.get, search_url, name='linkedin.navigate',
+                           retry_on=(WebDriverException,))
             
-            # Add random delay to avoid detection
-            time.sleep(3)
+                # Add random delay to avoid detection
+                time.sleep(3)
             
-            try:
-                # Wait for page to load with multiple possible selectors
-                selectors_to_try = [
-                    (By.CLASS_NAME, "jobs-search-results-list"),
-                    (By.CLASS_NAME, "scaffold-layout__main"),
-                    (By.CSS_SELECTOR, "[data-test-id='search-results']"),
-                    (By.TAG_NAME, "main")
-                ]
+                try:
+                    # Wait for page to load with multiple possible selectors
+                    selectors_to_try = [
+                        (By.CLASS_NAME, "jobs-search-results-list"),
+                        (By.CLASS_NAME, "scaffold-layout__main"),
+                        (By.CSS_SELECTOR, "[data-test-id='search-results']"),
+                        (By.TAG_NAME, "main")
+                    ]
                 
-                page_loaded = False
-                for selector_type, selector_value in selectors_to_try:
-                    try:
-                        WebDriverWait(self.driver, 10).until(
-                            EC.presence_of_element_located((selector_type, selector_value))
-                        )
-                        page_loaded = True
-                        logger.info(f"Page loaded, found element with {selector_type}: {selector_value}")
-                        break
-                    except:
-                        continue
+                    page_loaded = False
+                    for selector_type, selector_value in selectors_to_try:
+                        try:
+                            WebDriverWait(self.driver, 10).until(
+                                EC.presence_of_element_located((selector_type, selector_value))
+                            )
+                            page_loaded = True
+                            logger.info(f"Page loaded, found element with {selector_type}: {selector_value}")
+                            break
+                        except:
+                            continue
                 
-                if not page_loaded:
-                    logger.warning("Could not detect page load, proceeding anyway...")
+                    if not page_loaded:
+                        logger.warning("Could not detect page load, proceeding anyway...")
                 
-                time.sleep(2)  # Additional wait for dynamic content
+                    time.sleep(2)  # Additional wait for dynamic content
                 
-            except Exception as wait_error:
-                logger.warning(f"Error waiting for page load: {wait_error}")
-                time.sleep(5)  # Fallback wait
+                except Exception as wait_error:
+                    logger.warning(f"Error waiting for page load: {wait_error}")
+                    time.sleep(5)  # Fallback wait
             
             jobs = []
             processed_jobs = set()  # To avoid duplicates within the same run
+            scraped_at = batch_timestamp()
             
             # Try multiple selectors for job cards
             job_cards_selectors = [
@@ -137,41 +146,44 @@ class LinkedInJobScraper:
                 ".job-card-container"
             ]
             
-            job_cards = []
-            for selector in job_cards_selectors:
-                try:
-                    job_cards = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    if job_cards:
-                        logger.info(f"Found {len(job_cards)} job cards using selector: {selector}")
-                        break
-                except:
-                    continue
+            with stage('card_extraction') as extraction:
+                job_cards = []
+                for selector in job_cards_selectors:
+                    try:
+                        job_cards = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                        if job_cards:
+                            logger.info(f"Found {len(job_cards)} job cards using selector: {selector}")
+                            break
+                    except:
+                        continue
             
-            if not job_cards:
-                logger.warning("No job cards found, LinkedIn may have changed their structure or detected automation")
-                return []
+                if not job_cards:
+                    logger.warning("No job cards found, LinkedIn may have changed their structure or detected automation")
+                    return []
             
-            # Process job cards with better error handling
-            for i, job_card in enumerate(job_cards[:Config.MAX_RESULTS * 2]):  # Get more to filter
-                try:
-                    # Scroll to element to ensure it's visible
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", job_card)
-                    time.sleep(0.5)  # Small delay between cards
+                # Process job cards with better error handling
+                for i, job_card in enumerate(job_cards[:Config.MAX_RESULTS * 2]):  # Get more to filter
+                    try:
+                        # Scroll to element to ensure it's visible
+                        self.driver.execute_script("arguments[0].scrollIntoView(true);", job_card)
+                        time.sleep(0.5)  # Small delay between cards
                     
-                    job_data = self._extract_job_data(job_card)
-                    if job_data and self._is_valid_job(job_data):
-                        # Use job URL as unique identifier
-                        job_id = job_data.get('url', f"job_{i}")
-                        if job_id not in processed_jobs:
-                            processed_jobs.add(job_id)
-                            jobs.append(job_data)
+                        job_data = self._extract_job_data(job_card, scraped_at)
+                        if job_data and self._is_valid_job(job_data):
+                            # Use the posting's stable ID (tracking params stripped) as unique identifier
+                            job_id = job_data.job_key_id or f"job_{i}"
+                            if job_id not in processed_jobs:
+                                processed_jobs.add(job_id)
+                                jobs.append(job_data)
                             
-                            if len(jobs) >= Config.MAX_RESULTS:
-                                break
+                                if len(jobs) >= Config.MAX_RESULTS:
+                                    break
                                 
-                except Exception as e:
-                    logger.warning(f"Error processing job card {i}: {e}")
-                    continue
+                    except Exception as e:
+                        logger.warning(f"Error processing job card {i}: {e}")
+                        continue
+                
+                extraction['count'] = len(jobs)
             
             logger.info(f"Successfully scraped {len(jobs)} valid jobs")
             return jobs
@@ -187,8 +199,8 @@ class LinkedInJobScraper:
         base_url = f"{Config.SEARCH_URL}?keywords={params['keywords']}&location={params['location']}"
         return base_url.replace(' ', '%20')
     
-    def _extract_job_data(self, job_card) -> Optional[Dict]:
-        """Extract job data from a job card element."""
+    def _extract_job_data(self, job_card, scraped_at: Optional[Tuple[str, str]] = None) -> Optional[JobRecord]:
+        """Extract job data from a job card element, stamped with the batch's (date, time)."""
         try:
             # Extract job title
             title_element = job_card.find_element(By.CSS_SELECTOR, ".job-card-list__title a, .jobs-unified-top-card__job-title a")
@@ -216,16 +228,17 @@ class LinkedInJobScraper:
             # Get job description (requires clicking into the job)
             description = self._get_job_description(job_card)
             
-            return {
-                'title': job_title,
-                'company': company,
-                'location': location,
-                'salary': salary,
-                'description': description,
-                'url': job_url,
-                'scraped_date': time.strftime('%Y-%m-%d'),
-                'scraped_time': time.strftime('%H:%M:%S')
-            }
+            scraped_date, scraped_time = scraped_at or batch_timestamp()
+            return JobRecord(
+                title=job_title,
+                company=company,
+                location=location,
+                salary=salary,
+                description=description,
+                url=job_url,
+                scraped_date=scraped_date,
+                scraped_time=scraped_time
+            )
             
         except Exception as e:
             logger.warning(f"Error extracting job data: {e}")
@@ -260,33 +273,38 @@ class LinkedInJobScraper:
     
     def _get_job_description(self, job_card) -> str:
         """Get job description by clicking into the job."""
-        try:
-            # Click on the job card to get more details
-            clickable_element = job_card.find_element(By.CSS_SELECTOR, ".job-card-list__title a, .jobs-unified-top-card__job-title")
-            self.driver.execute_script("arguments[0].click();", clickable_element)
+        with stage('description_fetch') as fetch:
+            try:
+                # Click on the job card to get more details
+                clickable_element = job_card.find_element(By.CSS_SELECTOR, ".job-card-list__title a, .jobs-unified-top-card__job-title")
+                self.driver.execute_script("arguments[0].click();", clickable_element)
             
-            # Wait for job details to load
-            time.sleep(2)
+                # Wait for job details to load
+                time.sleep(2)
             
-            # Extract job description
-            try:
-                desc_element = WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".jobs-description-content__text, .jobs-box__html-content"))
-                )
-                description = desc_element.text[:500] if desc_element else ""  # Limit description length
-                return description
-            except:
+                # Extract job description
+                try:
+                    desc_element = WebDriverWait(self.driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, ".jobs-description-content__text, .jobs-box__html-content"))
+                    )
+                    description = desc_element.text if desc_element else ""  # Full text; the sheet keeps a snippet
+                    fetch['count'] = 1
+                    fetch['bytes'] = len(description.encode('utf-8'))
+                    return description
+                except:
+                    return ""
+            except Exception as e:
+                logger.warning(f"Could not extract job description: {e}")
                 return ""
-        except Exception as e:
-            logger.warning(f"Could not extract job description: {e}")
-            return ""
     
     def _is_valid_job(self, job_data: Dict) -> bool:
         """Check if job meets the criteria."""
         try:
+            job_data = as_record(job_data)
+            
             # Check if it's hardware manager related
-            title_lower = job_data.get('title', '').lower()
-            description_lower = job_data.get('description', '').lower()
+            title_lower = job_data.title_lower
+            description_lower = job_data.description_lower
             
             hardware_keywords = ['hardware', 'engineering manager', 'product manager', 'technical manager']
             manager_keywords = ['manager', 'director', 'lead', 'head']
@@ -294,25 +312,11 @@ class LinkedInJobScraper:
             has_hardware = any(keyword in title_lower or keyword in description_lower for keyword in hardware_keywords)
             has_manager = any(keyword in title_lower or keyword in description_lower for keyword in manager_keywords)
             
-            # Check salary if available
-            salary = job_data.get('salary', '').lower()
-            salary_valid = True
-            
-            if salary != "not specified" and salary:
-                # Extract numeric salary value
-                salary_match = re.search(r'\$?(\d+(?:,\d{3})*)', salary)
-                if salary_match:
-                    try:
-                        salary_num = int(salary_match.group(1).replace(',', ''))
-                        # Convert k to thousands if present
-                        if 'k' in salary or 'thousand' in salary:
-                            salary_num *= 1000
-                        salary_valid = salary_num >= Config.MIN_SALARY
-                    except:
-                        salary_valid = True  # If we can't parse, assume it's valid
+            # Check salary if available (unparseable salaries are assumed valid)
+            salary_valid = job_data.salary_min is None or job_data.salary_min >= Config.MIN_SALARY
             
             # Check location (should be NY-based)
-            location = job_data.get('location', '').lower()
+            location = job_data.location_lower
             ny_keywords = ['new york', 'ny', 'nyc', 'queens', 'brooklyn', 'manhattan', 'bronx', 'staten island']
             is_ny = any(keyword in location for keyword in ny_keywords)
             
@@ -326,3 +330,5 @@ class LinkedInJobScraper:
         """Close the browser driver."""
         if self.driver:
             self.driver.quit()
+            self.driver = None
+            browser_session_closed()
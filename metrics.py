@@ -0,0 +1,249 @@
+"""
+Prometheus-style metrics for the long-running job scraper agents.
+
+Counters, gauges and histograms are kept in a process-wide registry and served
+in the Prometheus text exposition format by an optional background HTTP server.
+"""
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+RUN_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters, gauges and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Dict]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Dict[str, str], float]]]] = []
+
+    def describe(self, name: str, metric_type: str, help_text: str, buckets: Tuple[float, ...] = None):
+        """Declare a metric's type and help text."""
+        with self._lock:
+            self._meta[name] = (metric_type, help_text)
+            if buckets:
+                self._buckets[name] = tuple(sorted(buckets))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a counter (or gauge)."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge."""
+        with self._lock:
+            self._values.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record an observation in a histogram."""
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self._buckets.setdefault(name, LATENCY_BUCKETS)
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist['counts'][i] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def add_collector(self, collector: Callable):
+        """
+        Register a callable evaluated at scrape time. It yields
+        (name, type, help, labels, value) tuples.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        with self._lock:
+            meta = dict(self._meta)
+            values = {name: dict(series) for name, series in self._values.items()}
+            histograms = {name: {key: dict(h, counts=list(h['counts'])) for key, h in series.items()}
+                          for name, series in self._histograms.items()}
+            buckets = dict(self._buckets)
+            collectors = list(self._collectors)
+
+        for collector in collectors:
+            try:
+                for name, metric_type, help_text, labels, value in collector():
+                    meta.setdefault(name, (metric_type, help_text))
+                    values.setdefault(name, {})[_label_key(labels)] = value
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+
+        for name in sorted(set(values) | set(histograms)):
+            metric_type, help_text = meta.get(name, ('untyped', ''))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for key, value in sorted(values.get(name, {}).items()):
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+            for key, hist in sorted(histograms.get(name, {}).items()):
+                for bound, count in zip(buckets[name], hist['counts']):
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {count}")
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist['sum'])}")
+                lines.append(f"{name}_count{_format_labels(key)} {hist['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe('job_scraper_run_duration_seconds', 'histogram', 'Duration of scraping runs', RUN_BUCKETS)
+REGISTRY.describe('job_scraper_runs_total', 'counter', 'Scraping runs by outcome')
+REGISTRY.describe('job_scraper_last_run_timestamp_seconds', 'gauge', 'Unix time the last run finished')
+REGISTRY.describe('job_scraper_stage_duration_seconds', 'histogram', 'Duration of run stages')
+REGISTRY.describe('job_scraper_source_requests_total', 'counter', 'Job source fetches by outcome (ok, empty, error)')
+REGISTRY.describe('job_scraper_source_duration_seconds', 'histogram', 'Job source fetch latency')
+REGISTRY.describe('job_scraper_jobs_total', 'counter', 'Jobs by pipeline step (found, filtered, deduped, added, failed)')
+REGISTRY.describe('job_scraper_sheets_api_calls_total', 'counter', 'Google Sheets API requests by method and status')
+REGISTRY.describe('job_scraper_browser_sessions', 'gauge', 'Browser sessions currently open')
+REGISTRY.describe('job_scraper_browser_sessions_started_total', 'counter', 'Browser sessions started')
+
+
+def _retry_samples():
+    from retry import get_retry_metrics
+    for call, stats in get_retry_metrics().items():
+        yield ('job_scraper_call_retries_total', 'counter', 'Retries per wrapped call', {'call': call}, stats['retries'])
+        yield ('job_scraper_call_failures_total', 'counter', 'Calls that exhausted their retries', {'call': call}, stats['failures'])
+        yield ('job_scraper_call_backoff_seconds_total', 'counter', 'Seconds spent backing off', {'call': call}, stats['sleep_seconds'])
+
+
+REGISTRY.add_collector(_retry_samples)
+
+
+def record_run(run):
+    """Feed a finished RunInstrumentation into the registry."""
+    outcome = 'error' if any(record.get('error') for record in run.records) else 'ok'
+    REGISTRY.observe('job_scraper_run_duration_seconds', run.duration, run=run.run_name)
+    REGISTRY.inc('job_scraper_runs_total', run=run.run_name, outcome=outcome)
+    REGISTRY.set('job_scraper_last_run_timestamp_seconds', run.finished_at, run=run.run_name)
+
+    for record in run.records:
+        name = record['stage']
+        REGISTRY.observe('job_scraper_stage_duration_seconds', record['duration'], stage=name)
+        if name.startswith('source.'):
+            source = name.split('.', 1)[1]
+            if record.get('error'):
+                source_outcome = 'error'
+            elif not record.get('count'):
+                source_outcome = 'empty'
+            else:
+                source_outcome = 'ok'
+            REGISTRY.inc('job_scraper_source_requests_total', source=source, outcome=source_outcome)
+            REGISTRY.observe('job_scraper_source_duration_seconds', record['duration'], source=source)
+
+
+def record_jobs(step: str, count: int):
+    """Count jobs passing through a pipeline step."""
+    REGISTRY.inc('job_scraper_jobs_total', count, step=step)
+
+
+def record_sheets_call(method: str, status: str):
+    """Count a single Google Sheets API request."""
+    REGISTRY.inc('job_scraper_sheets_api_calls_total', method=method, status=status)
+
+
+def browser_session_opened():
+    REGISTRY.inc('job_scraper_browser_sessions', 1)
+    REGISTRY.inc('job_scraper_browser_sessions_started_total', 1)
+
+
+def browser_session_closed():
+    REGISTRY.inc('job_scraper_browser_sessions', -1)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves /metrics and a trivial /healthz."""
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/metrics':
+            body = REGISTRY.render().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/healthz':
+            body = b'ok\n'
+            content_type = 'text/plain; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics {self.address_string()} {format % args}")
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None):
+    """
+    Start the metrics endpoint in a daemon thread.
+
+    Returns:
+        The running server, or None when metrics are disabled (port 0/unset).
+    """
+    port = Config.METRICS_PORT if port is None else port
+    host = Config.METRICS_HOST if host is None else host
+    if not port:
+        return None
+
+    from instrumentation import add_run_listener
+    add_run_listener(record_run)
+
+    server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True)
+    thread.start()
+    logger.info(f"Metrics endpoint listening on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def metrics_port_from_argv(argv: List[str]) -> Optional[int]:
+    """Read '--metrics-port=<port>' from CLI args, falling back to Config.METRICS_PORT."""
+    for arg in argv:
+        if arg.startswith('--metrics-port='):
+            return int(arg.split('=', 1)[1])
+    return Config.METRICS_PORT
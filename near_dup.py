@@ -0,0 +1,237 @@
+"""
+Near-duplicate job detection across sources.
+
+The same role syndicated through Adzuna, SerpAPI and Indeed arrives with
+slightly different titles, tracking URLs and description snippets. Each posting
+is reduced to a MinHash signature over its title tokens, normalized company and
+description word shingles; locality-sensitive hashing (LSH) buckets the
+signatures so a lookup only compares against a handful of candidates instead
+of every job seen before.
+
+Signatures use one-permutation MinHash with densification: each shingle is
+hashed once and binned, rather than hashed under every permutation, which keeps
+signing linear in the number of shingles.
+"""
+import hashlib
+import logging
+import re
+from typing import Dict, FrozenSet, List, Optional, Set
+from urllib.parse import urlsplit
+
+from config import Config
+from job_record import as_record
+
+logger = logging.getLogger(__name__)
+
+EMPTY_BIN = (1 << 64) - 1
+DESCRIPTION_CHARS = Config.SHEET_DESCRIPTION_LENGTH  # Compare the snippet the sheet keeps, so existing rows match
+SHINGLE_SIZE = 3
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+COMPANY_SUFFIXES = {'inc', 'llc', 'ltd', 'corp', 'corporation', 'co', 'company', 'plc', 'gmbh', 'the'}
+TITLE_ABBREVIATIONS = {'sr': 'senior', 'jr': 'junior', 'mgr': 'manager', 'eng': 'engineering', 'dir': 'director'}
+
+
+def _stable_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def normalize_company(company: str) -> str:
+    """'Acme Robotics, Inc.' -> 'acme robotics'."""
+    return ' '.join(token for token in _TOKEN.findall(company.lower()) if token not in COMPANY_SUFFIXES)
+
+
+def title_tokens(title: str) -> FrozenSet[str]:
+    """Lowercased title words with common abbreviations expanded."""
+    return frozenset(TITLE_ABBREVIATIONS.get(token, token) for token in _TOKEN.findall(title.lower()))
+
+
+def description_shingles(description: str) -> Set[str]:
+    """Overlapping word shingles of the description prefix."""
+    words = _TOKEN.findall(description[:DESCRIPTION_CHARS].lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def key_source(key: Optional[str]) -> Optional[str]:
+    """Where a job key's ID comes from: 'linkedin:123' -> 'linkedin', 'url:https://a.example/x' -> 'a.example'."""
+    if not key:
+        return None
+    namespace, _, value = key.partition(':')
+    if namespace == 'url':
+        return urlsplit(value).netloc or None
+    return namespace
+
+
+def distinct_keys(a, b) -> bool:
+    """True when two records carry different job keys from the same source, so cannot be one posting."""
+    return bool(a.job_key and b.job_key and a.job_key != b.job_key
+                and key_source(a.job_key) == key_source(b.job_key))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _Entry:
+    __slots__ = ('company', 'title', 'location', 'signature', 'has_description', 'job')
+
+    def __init__(self, company, title, location, signature, has_description, job):
+        self.company = company
+        self.title = title
+        self.location = location
+        self.signature = signature
+        self.has_description = has_description
+        self.job = job
+
+
+class DuplicateDetector:
+    """
+    MinHash/LSH index of job postings.
+
+    A posting is a duplicate of an indexed one when the job key (stable ID or
+    canonical URL) matches,
+    title and company match exactly, or when the normalized company matches,
+    the titles share at least title_threshold of their words and the estimated
+    description similarity reaches the threshold. When either posting has no
+    description there is nothing to compare, so the normalized title and the
+    location must match exactly instead. Two postings whose job keys come from
+    the same source but differ are never duplicates: one board does not list a
+    posting twice, and same-company postings share description boilerplate.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: int = 64, bands: int = 16,
+                 title_threshold: float = 0.8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = Config.NEAR_DUP_THRESHOLD if threshold is None else threshold
+        self.title_threshold = title_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._entries: List[_Entry] = []
+        self._keys: Dict[str, int] = {}
+        self._exact: Dict[tuple, int] = {}
+        self._buckets: List[Dict[tuple, List[int]]] = [{} for _ in range(bands)]
+        self._by_company: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, features: Set[str]) -> tuple:
+        """One-permutation MinHash signature of a feature set."""
+        k = self.num_perm
+        bins = [EMPTY_BIN] * k
+        for feature in features:
+            h = _stable_hash(feature)
+            b = h % k
+            value = h // k
+            if value < bins[b]:
+                bins[b] = value
+        if all(value == EMPTY_BIN for value in bins):
+            return tuple(bins)
+        # Densify: an empty bin borrows the next non-empty bin's value, tagged with the distance
+        signature = list(bins)
+        for i in range(k):
+            if bins[i] == EMPTY_BIN:
+                step = 1
+                while bins[(i + step) % k] == EMPTY_BIN:
+                    step += 1
+                signature[i] = bins[(i + step) % k] + step * EMPTY_BIN
+        return tuple(signature)
+
+    def _describe(self, job):
+        job = as_record(job)
+        company = normalize_company(job.company)
+        title = title_tokens(job.title)
+        shingles = description_shingles(job.description)
+        features = {f't:{token}' for token in title}
+        features.add(f'c:{company}')
+        features.update(f'd:{shingle}' for shingle in shingles)
+        return job, company, title, self.signature(features), bool(shingles)
+
+    def _similarity(self, a: tuple, b: tuple) -> float:
+        return sum(1 for x, y in zip(a, b) if x == y) / self.num_perm
+
+    def _band_keys(self, signature: tuple):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows] for i in range(self.bands)]
+
+    def _match(self, job, company, title, signature, has_description) -> Optional[int]:
+        if job.job_key and job.job_key in self._keys:
+            return self._keys[job.job_key]
+        if job.title_lower and job.company_lower:
+            exact = self._exact.get((job.title_lower, job.company_lower))
+            if exact is not None and not distinct_keys(self._entries[exact].job, job):
+                return exact
+
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        if not has_description and company:
+            # Without a description the signature is mostly title words; block on company instead
+            candidates.update(self._by_company.get(company, ()))
+
+        for index in sorted(candidates):
+            entry = self._entries[index]
+            if entry.company != company or jaccard(entry.title, title) < self.title_threshold:
+                continue
+            if distinct_keys(entry.job, job):
+                continue
+            if not (has_description and entry.has_description):
+                # Similar titles alone do not make the same job ('Senior Hardware Manager')
+                if entry.title == title and entry.location == job.location_lower.strip():
+                    return index
+                continue
+            if self._similarity(entry.signature, signature) >= self.threshold:
+                return index
+        return None
+
+    def find(self, job) -> Optional[Dict]:
+        """Return the indexed job that this one duplicates, if any."""
+        described = self._describe(job)
+        index = self._match(*described)
+        return None if index is None else self._entries[index].job
+
+    def is_duplicate(self, job) -> bool:
+        return self.find(job) is not None
+
+    def add(self, job, key_only: bool = False):
+        """
+        Index a job without checking it.
+
+        Args:
+            key_only: Match it only by job key or exact title/company, e.g. when its
+                description is unknown rather than empty
+        """
+        self._insert(*self._describe(job), key_only=key_only)
+
+    def add_if_new(self, job) -> bool:
+        """
+        Index a job unless it duplicates one already indexed.
+
+        Returns:
+            True if the job was new and has been added
+        """
+        described = self._describe(job)
+        if self._match(*described) is not None:
+            return False
+        self._insert(*described)
+        return True
+
+    def _insert(self, job, company, title, signature, has_description, key_only=False):
+        index = len(self._entries)
+        self._entries.append(_Entry(company, title, job.location_lower.strip(), signature, has_description, job))
+        if job.job_key:
+            self._keys.setdefault(job.job_key, index)
+        if job.title_lower and job.company_lower:
+            self._exact.setdefault((job.title_lower, job.company_lower), index)
+        if key_only:
+            return
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(index)
+        if company:
+            self._by_company.setdefault(company, []).append(index)
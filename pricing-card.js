@@ -1,23 +1,10 @@
-const PRICING_DATA = {
-  title: 'Monthly Subscription',
-  price: 300,
-  period: 'month',
-  features: [
-    { text: 'STORAGE OPTIONS!', href: 'storage-options.html' },
-    { text: 'Premium family cargo bike' },
-    { text: 'All-inclusive preventative maintenance and repairs' },
-    { text: 'Theft protection' },
-    { text: 'Free delivery in NYC' },
-    { text: 'Month-to-month flexibility' },
-    { text: 'Option to purchase' },
-  ],
-};
+// Pricing data lives in pricing.json. The site build (python -m site_build) renders
+// the card into each page, so this script only runs when a page is served unbuilt.
+// Keep the markup below in sync with site_build/pricing.py.
+var PRICING_DATA_URL = 'pricing.json';
 
-function renderPricingCard(containerId, options) {
-  var container = document.getElementById(containerId);
-  if (!container) return;
-
-  var featuresHtml = PRICING_DATA.features.map(function(f) {
+function pricingCardHtml(data, options) {
+  var featuresHtml = data.features.map(function(f) {
     var inner = f.href
       ? '<a href="' + f.href + '" style="color: var(--primary-color); text-decoration: none; font-weight: 600;">\u2713 ' + f.text + '</a>'
       : '\u2713 ' + f.text;
@@ -28,15 +15,14 @@ function renderPricingCard(containerId, options) {
     ? '<a href="get-started.html" class="cta-button primary full-width">Get Started Today</a>'
     : '';
 
-  container.innerHTML =
-    '<div class="pricing-card">' +
+  return '<div class="pricing-card">' +
       '<div class="pricing-header">' +
-        '<h3>' + PRICING_DATA.title + '</h3>' +
+        '<h3>' + data.title + '</h3>' +
         '<div style="margin-bottom: 0.5rem; color: var(--text-light); font-size: 0.875rem;">(starts at)</div>' +
         '<div class="price-display">' +
           '<span class="currency">$</span>' +
-          '<span class="amount">' + PRICING_DATA.price + '</span>' +
-          '<span class="period">/' + PRICING_DATA.period + '</span>' +
+          '<span class="amount">' + data.price + '</span>' +
+          '<span class="period">/' + data.period + '</span>' +
         '</div>' +
       '</div>' +
       '<ul class="pricing-features">' +
@@ -45,3 +31,14 @@ function renderPricingCard(containerId, options) {
       ctaHtml +
     '</div>';
 }
+
+function renderPricingCard(containerId, options) {
+  var container = document.getElementById(containerId);
+  // Nothing to do when the build has already rendered the card
+  if (!container || container.children.length) return;
+
+  fetch(PRICING_DATA_URL)
+    .then(function(response) { return response.json(); })
+    .then(function(data) { container.innerHTML = pricingCardHtml(data, options); })
+    .catch(function(error) { console.error('Could not load pricing data:', error); });
+}
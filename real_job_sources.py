@@ -6,9 +6,12 @@ import requests
 import logging
 import json
 from typing import List, Dict, Optional
-from datetime import datetime
 import time
 
+from config import Config
+from retry import request_with_retry
+from job_record import JobRecord, as_record, batch_timestamp
+
 logger = logging.getLogger(__name__)
 
 class RealJobSources:
@@ -35,7 +38,7 @@ class RealJobSources:
                 'full_time': 'true'
             }
             
-            response = self.session.get(url, params=params, timeout=30)
+            response = request_with_retry(self.session, 'GET', url, name='github_jobs', params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -54,9 +57,9 @@ class RealJobSources:
         Free API, no authentication required.
         """
         try:
-            url = "https://remoteok.io/api"
+            url = Config.REMOTEOK_API_URL
             
-            response = self.session.get(url, timeout=30)
+            response = request_with_retry(self.session, 'GET', url, name='remoteok', timeout=30)
             
             if response.status_code == 200:
                 # The first line is usually a comment, skip it
@@ -92,7 +95,7 @@ class RealJobSources:
                 'limit': min(limit, 50)
             }
             
-            response = self.session.get(url, params=params, timeout=30)
+            response = request_with_retry(self.session, 'GET', url, name='jobspresso', params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -111,7 +114,7 @@ class RealJobSources:
         Requires a real API key from https://serpapi.com/
         """
         try:
-            url = "https://serpapi.com/search"
+            url = Config.SERPAPI_URL
             
             params = {
                 'api_key': api_key,
@@ -122,7 +125,7 @@ class RealJobSources:
                 'num': min(limit, 10)
             }
             
-            response = requests.get(url, params=params, timeout=30)
+            response = request_with_retry(requests, 'GET', url, name='serpapi', params=params, timeout=30)
             
             if response.status_code == 200:
                 data = response.json()
@@ -138,19 +141,20 @@ class RealJobSources:
     def _parse_github_jobs_results(self, data: List[dict]) -> List[Dict]:
         """Parse GitHub Jobs API results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data:
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company', ''),
-                'location': job_data.get('location', ''),
-                'salary': 'Not specified',  # GitHub Jobs doesn't usually include salary
-                'description': job_data.get('description', '')[:500],
-                'url': job_data.get('url', ''),
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S'),
-                'source': 'GitHub Jobs'
-            }
+            job = JobRecord(
+                title=job_data.get('title', ''),
+                company=job_data.get('company', ''),
+                location=job_data.get('location', ''),
+                salary='Not specified',  # GitHub Jobs doesn't usually include salary
+                description=job_data.get('description', ''),
+                url=job_data.get('url', ''),
+                scraped_date=scraped_date,
+                scraped_time=scraped_time,
+                source='GitHub Jobs'
+            )
             
             if self._is_hardware_manager_job(job):
                 jobs.append(job)
@@ -160,6 +164,7 @@ class RealJobSources:
     def _parse_remoteok_results(self, data: List[dict], keywords: str, limit: int) -> List[Dict]:
         """Parse RemoteOK API results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data[:limit * 2]:  # Get more to filter
             if not isinstance(job_data, dict) or not job_data.get('position'):
@@ -167,20 +172,20 @@ class RealJobSources:
             
             # Check if it matches our criteria
             position = job_data.get('position', '').lower()
-            description = job_data.get('description', '').lower()
             
             if 'hardware' in position and 'manager' in position:
-                job = {
-                    'title': job_data.get('position', ''),
-                    'company': job_data.get('company', ''),
-                    'location': 'Remote',  # RemoteOK is for remote jobs
-                    'salary': job_data.get('salary', 'Not specified'),
-                    'description': job_data.get('description', '')[:500],
-                    'url': job_data.get('url', ''),
-                    'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                    'scraped_time': datetime.now().strftime('%H:%M:%S'),
-                    'source': 'RemoteOK'
-                }
+                job = JobRecord(
+                    title=job_data.get('position', ''),
+                    company=job_data.get('company', ''),
+                    location='Remote',  # RemoteOK is for remote jobs
+                    salary=job_data.get('salary', 'Not specified'),
+                    description=job_data.get('description', ''),
+                    url=job_data.get('url', ''),
+                    scraped_date=scraped_date,
+                    scraped_time=scraped_time,
+                    source='RemoteOK',
+                    source_id=f"remoteok:{job_data['id']}" if job_data.get('id') else ''
+                )
                 jobs.append(job)
         
         return jobs[:limit]
@@ -188,19 +193,20 @@ class RealJobSources:
     def _parse_jobspresso_results(self, data: dict) -> List[Dict]:
         """Parse JobsPresso API results."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('jobs', []):
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company', ''),
-                'location': 'Remote',  # JobsPresso focuses on remote
-                'salary': job_data.get('salary', 'Not specified'),
-                'description': job_data.get('description', '')[:500],
-                'url': job_data.get('url', ''),
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S'),
-                'source': 'JobsPresso'
-            }
+            job = JobRecord(
+                title=job_data.get('title', ''),
+                company=job_data.get('company', ''),
+                location='Remote',  # JobsPresso focuses on remote
+                salary=job_data.get('salary', 'Not specified'),
+                description=job_data.get('description', ''),
+                url=job_data.get('url', ''),
+                scraped_date=scraped_date,
+                scraped_time=scraped_time,
+                source='JobsPresso'
+            )
             
             if self._is_hardware_manager_job(job):
                 jobs.append(job)
@@ -210,19 +216,21 @@ class RealJobSources:
     def _parse_serpapi_real_results(self, data: dict) -> List[Dict]:
         """Parse SerpAPI Google Jobs results with real data."""
         jobs = []
+        scraped_date, scraped_time = batch_timestamp()
         
         for job_data in data.get('jobs_results', []):
-            job = {
-                'title': job_data.get('title', ''),
-                'company': job_data.get('company_name', ''),
-                'location': job_data.get('location', ''),
-                'salary': job_data.get('salary', {}).get('salary_text', 'Not specified') if job_data.get('salary') else 'Not specified',
-                'description': job_data.get('description', '')[:500],
-                'url': job_data.get('apply_options', [{}])[0].get('link', '') if job_data.get('apply_options') else '',
-                'scraped_date': datetime.now().strftime('%Y-%m-%d'),
-                'scraped_time': datetime.now().strftime('%H:%M:%S'),
-                'source': 'SerpAPI (Google Jobs)'
-            }
+            job = JobRecord(
+                title=job_data.get('title', ''),
+                company=job_data.get('company_name', ''),
+                location=job_data.get('location', ''),
+                salary=job_data.get('salary', {}).get('salary_text', 'Not specified') if job_data.get('salary') else 'Not specified',
+                description=job_data.get('description', ''),
+                url=job_data.get('apply_options', [{}])[0].get('link', '') if job_data.get('apply_options') else '',
+                scraped_date=scraped_date,
+                scraped_time=scraped_time,
+                source_id=f"serpapi:{job_data['job_id']}" if job_data.get('job_id') else '',
+                source='SerpAPI (Google Jobs)'
+            )
             
             if self._is_hardware_manager_job(job) and self._is_ny_location(job):
                 jobs.append(job)
@@ -231,8 +239,9 @@ class RealJobSources:
     
     def _is_hardware_manager_job(self, job: Dict) -> bool:
         """Check if job is hardware manager related."""
-        title = job.get('title', '').lower()
-        description = job.get('description', '').lower()
+        job = as_record(job)
+        title = job.title_lower
+        description = job.description_lower
         
         hardware_keywords = ['hardware', 'engineering manager', 'product manager', 'technical manager']
         manager_keywords = ['manager', 'director', 'lead', 'head']
@@ -244,7 +253,7 @@ class RealJobSources:
     
     def _is_ny_location(self, job: Dict) -> bool:
         """Check if job is in New York area."""
-        location = job.get('location', '').lower()
+        location = as_record(job).location_lower
         ny_keywords = ['new york', 'ny', 'nyc', 'queens', 'brooklyn', 'manhattan', 'bronx', 'staten island']
         return any(keyword in location for keyword in ny_keywords)
 
@@ -0,0 +1,198 @@
+"""
+Shared retry layer for HTTP adapters, Selenium navigation and Google Sheets calls.
+Uses exponential backoff with full jitter, honors Retry-After and caps the total
+time a single call may spend retrying.
+"""
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, Type
+
+from config import Config
+from instrumentation import add_bytes
+from metrics import record_sheets_call
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+_metrics_lock = threading.Lock()
+_metrics: Dict[str, Dict[str, float]] = {}
+
+
+class RetryableError(Exception):
+    """Raised for a transient failure that should be retried."""
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given (0-based) attempt."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _record(name: str, attempts: int, slept: float, failed: bool):
+    """Update per-call retry metrics."""
+    with _metrics_lock:
+        stats = _metrics.setdefault(name, {
+            'calls': 0, 'retries': 0, 'failures': 0, 'sleep_seconds': 0.0
+        })
+        stats['calls'] += 1
+        stats['retries'] += attempts - 1
+        stats['sleep_seconds'] += slept
+        if failed:
+            stats['failures'] += 1
+
+
+def get_retry_metrics() -> Dict[str, Dict[str, float]]:
+    """Return a snapshot of retry metrics keyed by call name."""
+    with _metrics_lock:
+        return {name: dict(stats) for name, stats in _metrics.items()}
+
+
+def retry_call(func: Callable, *args, name: str = None,
+               retry_on: Tuple[Type[BaseException], ...] = (RetryableError,),
+               max_retries: int = None, base_delay: float = None,
+               max_delay: float = None, budget: float = None, **kwargs):
+    """
+    Call func(*args, **kwargs), retrying transient failures.
+
+    Args:
+        func: Callable to invoke
+        name: Label used for logging and metrics (defaults to func's name)
+        retry_on: Exception types that trigger a retry
+        max_retries: Retries after the first attempt (defaults to Config.MAX_RETRIES)
+        base_delay: Backoff base in seconds (defaults to Config.RETRY_DELAY)
+        max_delay: Cap on a single backoff sleep (defaults to Config.RETRY_MAX_DELAY)
+        budget: Total seconds the call may take, including sleeps (defaults to Config.RETRY_BUDGET)
+
+    Returns:
+        Whatever func returns. The last exception is re-raised once retries
+        or the time budget are exhausted.
+    """
+    name = name or getattr(func, '__qualname__', repr(func))
+    max_retries = Config.MAX_RETRIES if max_retries is None else max_retries
+    base_delay = Config.RETRY_DELAY if base_delay is None else base_delay
+    max_delay = Config.RETRY_MAX_DELAY if max_delay is None else max_delay
+    budget = Config.RETRY_BUDGET if budget is None else budget
+
+    deadline = time.monotonic() + budget
+    slept = 0.0
+    attempt = 0
+
+    while True:
+        attempt += 1
+        try:
+            result = func(*args, **kwargs)
+        except retry_on as e:
+            retries_left = attempt <= max_retries
+            delay = backoff_delay(attempt - 1, base_delay, max_delay)
+            retry_after = getattr(e, 'retry_after', None)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+            if not retries_left or time.monotonic() + delay > deadline:
+                _record(name, attempt, slept, failed=True)
+                logger.warning(f"{name}: giving up after {attempt} attempt(s): {e}")
+                raise
+
+            logger.info(f"{name}: attempt {attempt} failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            slept += delay
+            continue
+
+        _record(name, attempt, slept, failed=False)
+        if attempt > 1:
+            logger.info(f"{name}: succeeded after {attempt} attempts ({slept:.1f}s backing off)")
+        return result
+
+
+def request_with_retry(session, method: str, url: str, name: str = None, **retry_kwargs):
+    """
+    Issue an HTTP request through a requests Session (or the requests module),
+    retrying on 429/5xx responses and connection errors.
+
+    Request arguments are passed via retry_kwargs alongside the retry options
+    accepted by retry_call. The final response is returned even when it still
+    carries an error status, so callers keep their existing status handling.
+    """
+    import requests
+
+    retry_options = {key: retry_kwargs.pop(key) for key in
+                     ('max_retries', 'base_delay', 'max_delay', 'budget')
+                     if key in retry_kwargs}
+    last_response = {}
+
+    def attempt():
+        try:
+            response = session.request(method, url, **retry_kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            # An earlier attempt's response must not stand in for this failure
+            last_response.pop('value', None)
+            raise RetryableError(str(e)) from e
+
+        last_response['value'] = response
+        add_bytes(len(response.content))
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            raise RetryableError(
+                f"HTTP {response.status_code}",
+                status=response.status_code,
+                retry_after=parse_retry_after(response.headers.get('Retry-After'))
+            )
+        return response
+
+    try:
+        return retry_call(attempt, name=name or url, **retry_options)
+    except RetryableError as e:
+        if 'value' in last_response:
+            return last_response['value']
+        raise (e.__cause__ or e)
+
+
+def execute_with_retry(request, name: str = 'sheets'):
+    """Execute a googleapiclient request, retrying quota and server errors."""
+    from googleapiclient.errors import HttpError
+
+    def attempt():
+        try:
+            result = request.execute()
+        except HttpError as e:
+            status = getattr(e.resp, 'status', None)
+            record_sheets_call(name, str(status))
+            if status in RETRYABLE_STATUS_CODES:
+                raise RetryableError(
+                    f"HTTP {status}", status=status,
+                    retry_after=parse_retry_after(e.resp.get('retry-after'))
+                ) from e
+            raise
+        except (ConnectionError, TimeoutError) as e:
+            record_sheets_call(name, 'connection_error')
+            raise RetryableError(str(e)) from e
+        record_sheets_call(name, 'ok')
+        return result
+
+    try:
+        return retry_call(attempt, name=name)
+    except RetryableError as e:
+        # Surface the original API error to callers once retries are exhausted
+        raise (e.__cause__ or e)
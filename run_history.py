@@ -0,0 +1,149 @@
+"""
+Columnar run history: every run's job records appended to partitioned Parquet files.
+
+Each run writes one Parquet file per scraped date under
+<HISTORY_DIR>/scraped_date=YYYY-MM-DD/, so months of postings can be analysed
+with pyarrow, pandas or DuckDB without paging through the Sheets API.
+Requires pyarrow; when it is not installed the history sink is skipped.
+"""
+import logging
+import os
+import uuid
+from typing import Dict, List, Optional
+
+from config import Config
+from job_record import as_record
+from instrumentation import stage
+
+logger = logging.getLogger(__name__)
+
+# pyarrow takes ~100 ms to import, so it is loaded on first use rather than at agent startup
+pa = ds = pq = None
+
+UNKNOWN_DATE = 'unknown'
+
+_pyarrow_missing = False
+_warned_missing = False
+
+
+def _load_pyarrow() -> bool:
+    """Import pyarrow on first use; False when it is not installed."""
+    global pa, ds, pq, _pyarrow_missing
+    if pa is None and not _pyarrow_missing:
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+            pa, ds, pq = pyarrow, pyarrow.dataset, pyarrow.parquet
+        except ImportError:
+            _pyarrow_missing = True
+    return pa is not None
+
+
+def _schema():
+    return pa.schema([
+        ('run_id', pa.string()),
+        ('run_name', pa.string()),
+        ('rank', pa.int32()),
+        ('title', pa.string()),
+        ('company', pa.string()),
+        ('location', pa.string()),
+        ('salary', pa.string()),
+        ('salary_min', pa.int64()),
+        ('description', pa.string()),
+        ('url', pa.string()),
+        ('canonical_url', pa.string()),
+        ('source', pa.string()),
+        ('scraped_time', pa.string()),
+    ])
+
+
+def history_available() -> bool:
+    """True when pyarrow is installed (warns once otherwise)."""
+    global _warned_missing
+    if not _load_pyarrow():
+        if not _warned_missing:
+            logger.warning("pyarrow not installed; run history will not be written to Parquet")
+            _warned_missing = True
+        return False
+    return True
+
+
+def write_run_history(jobs: List[Dict], run_id: Optional[str] = None, run_name: str = '',
+                      history_dir: Optional[str] = None) -> List[str]:
+    """
+    Append a run's job records to the Parquet history, partitioned by scraped date.
+
+    Args:
+        jobs: Job records (or dicts) in relevance order
+        run_id: Identifier shared by all rows of the run
+        run_name: Which agent produced the run ('linkedin', 'legitimate', ...)
+        history_dir: Dataset root, defaults to Config.HISTORY_DIR
+
+    Returns:
+        Paths of the Parquet files written
+    """
+    history_dir = history_dir or Config.HISTORY_DIR
+    if not jobs or not history_dir or not history_available():
+        return []
+
+    run_id = run_id or uuid.uuid4().hex[:12]
+    partitions: Dict[str, Dict[str, list]] = {}
+    names = _schema().names
+
+    with stage('history_write') as history_stage:
+        for rank, job in enumerate(jobs, 1):
+            job = as_record(job)
+            columns = partitions.setdefault(job.scraped_date or UNKNOWN_DATE, {name: [] for name in names})
+            columns['run_id'].append(run_id)
+            columns['run_name'].append(run_name)
+            columns['rank'].append(rank)
+            columns['title'].append(job.title)
+            columns['company'].append(job.company)
+            columns['location'].append(job.location)
+            columns['salary'].append(job.salary)
+            columns['salary_min'].append(job.salary_min)
+            columns['description'].append(job.description)
+            columns['url'].append(job.url)
+            columns['canonical_url'].append(job.canonical_url)
+            columns['source'].append(job.source)
+            columns['scraped_time'].append(job.scraped_time)
+
+        paths = []
+        try:
+            for scraped_date, columns in partitions.items():
+                directory = os.path.join(history_dir, f'scraped_date={scraped_date}')
+                os.makedirs(directory, exist_ok=True)
+                path = os.path.join(directory, f'run-{run_id}.parquet')
+                table = pa.Table.from_pydict(columns, schema=_schema())
+                pq.write_table(table, path, compression='zstd')
+                paths.append(path)
+                history_stage['bytes'] += os.path.getsize(path)
+            history_stage['count'] = len(jobs)
+            logger.info(f"Wrote {len(jobs)} job records to run history in {history_dir}")
+        except Exception as e:
+            logger.error(f"Error writing run history: {e}")
+        return paths
+
+
+def load_history(history_dir: Optional[str] = None, columns: Optional[List[str]] = None, filter=None):
+    """
+    Open the run history as a pyarrow Table.
+
+    Args:
+        history_dir: Dataset root, defaults to Config.HISTORY_DIR
+        columns: Optional column projection (scraped_date is available as a column)
+        filter: Optional pyarrow.dataset expression, e.g. ds.field('scraped_date') >= '2024-01-01'
+
+    Returns:
+        A pyarrow.Table, or None if pyarrow is missing or no history exists
+    """
+    history_dir = history_dir or Config.HISTORY_DIR
+    if not _load_pyarrow():
+        logger.warning("pyarrow not installed; cannot read run history")
+        return None
+    if not history_dir or not os.path.isdir(history_dir):
+        return None
+    partitioning = ds.partitioning(pa.schema([('scraped_date', pa.string())]), flavor='hive')
+    dataset = ds.dataset(history_dir, format='parquet', partitioning=partitioning)
+    return dataset.to_table(columns=columns, filter=filter)
@@ -0,0 +1,228 @@
+"""
+Persistent, scalable Bloom filter of seen job keys.
+
+The filter answers "definitely not seen" for almost every new posting without
+touching the exact seen-job index, so a run only pays for a binary search when
+a key may have been seen before. It is a chain of Bloom filters stored in one
+file and memory-mapped at startup: when the newest filter reaches its capacity
+a larger one with a tighter error rate is appended, keeping the overall false
+positive rate bounded as the archive grows to millions of postings.
+
+File layout: a header, then per layer a small header followed by its bit array.
+"""
+import logging
+import math
+import mmap
+import os
+import struct
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'JSBF'
+VERSION = 1
+
+# magic | version | layers | error rate | growth | tightening | total keys
+FILE_HEADER = struct.Struct('<4sHHdddQ')
+# capacity | keys | hash count | bit count
+LAYER_HEADER = struct.Struct('<QQIQ')
+
+MASK_64 = (1 << 64) - 1
+
+
+def _mix(value: int) -> int:
+    """splitmix64 finalizer; spreads the second hash independently of the first."""
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+def layer_size(capacity: int, error_rate: float):
+    """Bit and hash counts for a Bloom filter holding capacity keys at error_rate."""
+    bits = max(64, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+    bits += -bits % 8
+    hashes = max(1, int(round(bits / capacity * math.log(2))))
+    return bits, hashes
+
+
+class _Layer:
+    __slots__ = ('offset', 'capacity', 'count', 'hashes', 'bits', 'data_offset')
+
+    def __init__(self, offset, capacity, count, hashes, bits):
+        self.offset = offset
+        self.capacity = capacity
+        self.count = count
+        self.hashes = hashes
+        self.bits = bits
+        self.data_offset = offset + LAYER_HEADER.size
+
+    @property
+    def end(self) -> int:
+        return self.data_offset + self.bits // 8
+
+
+class ScalableBloomFilter:
+    """
+    Memory-mapped scalable Bloom filter over 64-bit integer keys.
+
+    Args:
+        path: File backing the filter; created on first use
+        capacity: Keys the first layer holds before a new layer is added
+        error_rate: Target false positive rate of the first layer
+        growth: Capacity multiplier for each new layer
+        tightening: Error rate multiplier for each new layer
+    """
+
+    def __init__(self, path: str, capacity: int = 100000, error_rate: float = 0.001,
+                 growth: float = 2.0, tightening: float = 0.5):
+        self.path = path
+        self._file = None
+        self._map = None
+        self._layers: List[_Layer] = []
+        if os.path.exists(path) and os.path.getsize(path) >= FILE_HEADER.size:
+            try:
+                self._open()
+                return
+            except ValueError as e:
+                logger.warning(f"Discarding unreadable seen filter {path}: {e}")
+                self.close()
+        self._create(capacity, error_rate, growth, tightening)
+
+    def _create(self, capacity: int, error_rate: float, growth: float, tightening: float):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'wb') as f:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, 0, error_rate, growth, tightening, 0))
+        self._open()
+        self._add_layer(capacity, error_rate)
+
+    def _open(self):
+        self._file = open(self.path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, layers, self.error_rate, self.growth, self.tightening, self.total = \
+            FILE_HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a seen filter file")
+        self._layers = []
+        offset = FILE_HEADER.size
+        for _ in range(layers):
+            if offset + LAYER_HEADER.size > len(self._map):
+                raise ValueError("truncated layer header")
+            layer = _Layer(offset, *LAYER_HEADER.unpack_from(self._map, offset))
+            if layer.end > len(self._map):
+                raise ValueError("truncated layer")
+            self._layers.append(layer)
+            offset = layer.end
+
+    def _add_layer(self, capacity: int, error_rate: float):
+        bits, hashes = layer_size(capacity, error_rate)
+        offset = self._layers[-1].end if self._layers else FILE_HEADER.size
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(offset + LAYER_HEADER.size + bits // 8)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        LAYER_HEADER.pack_into(self._map, offset, capacity, 0, hashes, bits)
+        self._layers.append(_Layer(offset, capacity, 0, hashes, bits))
+        self._write_header()
+        logger.debug(f"Seen filter {self.path}: added layer {len(self._layers)} "
+                     f"({capacity} keys, {bits // 8} bytes)")
+
+    def _write_header(self):
+        FILE_HEADER.pack_into(self._map, 0, MAGIC, VERSION, len(self._layers), self.error_rate,
+                              self.growth, self.tightening, self.total)
+
+    @staticmethod
+    def _hashes(key: int):
+        # Kirsch-Mitzenmacher double hashing: position i is (h1 + i * h2) mod bits
+        h1 = key & MASK_64
+        return h1, _mix(h1) | 1
+
+    def _layer_contains(self, h1: int, h2: int, layer: _Layer) -> bool:
+        data = self._map
+        base = layer.data_offset
+        bits = layer.bits
+        position = h1 % bits
+        step = h2 % bits
+        for _ in range(layer.hashes):
+            if not data[base + (position >> 3)] & (1 << (position & 7)):
+                return False
+            position = (position + step) % bits
+        return True
+
+    def __contains__(self, key: int) -> bool:
+        h1, h2 = self._hashes(key)
+        for layer in reversed(self._layers):
+            if self._layer_contains(h1, h2, layer):
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self.total
+
+    def add(self, key: int):
+        """Add a key; callers add each key once so layer counts stay exact."""
+        layer = self._layers[-1]
+        if layer.count >= layer.capacity:
+            index = len(self._layers)
+            self._add_layer(int(layer.capacity * self.growth),
+                            self.error_rate * self.tightening ** index)
+            layer = self._layers[-1]
+        data = self._map
+        base = layer.data_offset
+        bits = layer.bits
+        h1, h2 = self._hashes(key)
+        position = h1 % bits
+        step = h2 % bits
+        for _ in range(layer.hashes):
+            data[base + (position >> 3)] |= 1 << (position & 7)
+            position = (position + step) % bits
+        layer.count += 1
+        self.total += 1
+
+    def update(self, keys: Iterable[int]):
+        for key in keys:
+            self.add(key)
+
+    def flush(self):
+        """Write layer counts and the header, then flush the mapping to disk."""
+        if self._map is None:
+            return
+        for layer in self._layers:
+            LAYER_HEADER.pack_into(self._map, layer.offset, layer.capacity, layer.count,
+                                   layer.hashes, layer.bits)
+        self._write_header()
+        self._map.flush()
+
+    def clear(self):
+        """Drop every key, keeping the first layer's sizing."""
+        first = self._layers[0]
+        error_rate, growth, tightening = self.error_rate, self.growth, self.tightening
+        self.close()
+        os.remove(self.path)
+        self._layers = []
+        self._create(first.capacity, error_rate, growth, tightening)
+
+    def size_bytes(self) -> int:
+        return len(self._map) if self._map is not None else 0
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_seen_filter(path: Optional[str], capacity: int = 100000,
+                     error_rate: float = 0.001) -> Optional[ScalableBloomFilter]:
+    """Open or create the filter at path, or return None when disabled or unusable."""
+    if not path:
+        return None
+    try:
+        return ScalableBloomFilter(path, capacity=capacity, error_rate=error_rate)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Seen filter disabled, could not open {path}: {e}")
+        return None
@@ -0,0 +1,172 @@
+"""
+Batched Google Sheets reads and writes.
+
+Every values().get / values().update is a separate request against the
+per-minute Sheets quota. SheetsBatcher reads any number of ranges with one
+values().batchGet and queues writes until they go out together in one
+values().batchUpdate. Queued writes flush automatically once they reach
+max_ranges or max_cells, and every request first takes a slot from a
+process-wide per-minute budget, so bursts wait briefly instead of hitting 429s.
+A failed batchUpdate puts its ranges back in the queue; the caller's own
+flush() decides whether they are retried or dropped with clear().
+"""
+import json
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from config import Config
+from retry import execute_with_retry
+from instrumentation import stage
+from sheets_client import get_sheets_service
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """Token bucket allowing per_minute requests per minute, shared by all threads."""
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self._tokens = float(per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one request slot, sleeping until one is free.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if self.per_minute <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            rate = self.per_minute / 60.0
+            self._tokens = min(float(self.per_minute), self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+        if wait:
+            logger.info(f"Sheets request budget exhausted, waiting {wait:.1f}s")
+            time.sleep(wait)
+        return wait
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_request_budget() -> RequestBudget:
+    """Process-wide budget for Config.SHEETS_REQUESTS_PER_MINUTE (0 disables throttling)."""
+    global _budget
+    with _budget_lock:
+        if _budget is None or _budget.per_minute != Config.SHEETS_REQUESTS_PER_MINUTE:
+            _budget = RequestBudget(Config.SHEETS_REQUESTS_PER_MINUTE)
+        return _budget
+
+
+class SheetsBatcher:
+    """
+    Combines Sheets value reads into batchGet calls and writes into batchUpdate calls.
+
+    Args:
+        spreadsheet_id: Target spreadsheet, defaults to Config.GOOGLE_SHEET_ID
+        max_ranges: Queued write ranges that trigger an automatic flush
+        max_cells: Queued cells that trigger an automatic flush (keeps request bodies small)
+    """
+
+    def __init__(self, spreadsheet_id: Optional[str] = None, max_ranges: int = 100, max_cells: int = 50000):
+        self.spreadsheet_id = spreadsheet_id or Config.GOOGLE_SHEET_ID
+        self.max_ranges = max_ranges
+        self.max_cells = max_cells
+        self._pending: List[dict] = []
+        self._pending_cells = 0
+        self.calls = 0
+
+    def _execute(self, request, name: str):
+        get_request_budget().acquire()
+        self.calls += 1
+        return execute_with_retry(request, name=name)
+
+    def batch_get(self, ranges: List[str]) -> List[List[list]]:
+        """
+        Read several ranges, max_ranges per request.
+
+        Returns:
+            The values of each range, in the order requested
+        """
+        values = []
+        for start in range(0, len(ranges), self.max_ranges):
+            chunk = ranges[start:start + self.max_ranges]
+            result = self._execute(get_sheets_service().spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=chunk
+            ), name='sheets.values.batchGet')
+            value_ranges = result.get('valueRanges', [])
+            values.extend(value_range.get('values', []) for value_range in value_ranges)
+            # Keep positions aligned if a range comes back without an entry
+            values.extend([] for _ in range(len(chunk) - len(value_ranges)))
+        return values
+
+    def queue_update(self, range_name: str, rows: List[list]):
+        """
+        Queue rows to write at range_name; flushes once the queue is full.
+
+        A failed automatic flush is only logged: the ranges stay queued for the
+        next flush(), whose caller sees the error.
+        """
+        if not rows:
+            return
+        self._pending.append({'range': range_name, 'values': rows})
+        self._pending_cells += sum(len(row) for row in rows)
+        if len(self._pending) >= self.max_ranges or self._pending_cells >= self.max_cells:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Automatic flush failed, keeping {len(self._pending)} ranges queued: {e}")
+
+    @property
+    def pending(self) -> int:
+        """Number of queued write ranges."""
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Write every queued range with one batchUpdate.
+
+        Returns:
+            Number of rows written
+        """
+        if not self._pending:
+            return 0
+        data, cells = self._pending, self._pending_cells
+        self._pending, self._pending_cells = [], 0
+        body = {'valueInputOption': 'RAW', 'data': data}
+        rows = sum(len(value_range['values']) for value_range in data)
+        try:
+            with stage('sheet_write', count=rows, bytes=len(json.dumps(body))):
+                self._execute(get_sheets_service().spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body=body
+                ), name='sheets.values.batchUpdate')
+        except Exception:
+            # Nothing was written; keep the ranges ahead of anything queued since
+            self._pending = data + self._pending
+            self._pending_cells += cells
+            raise
+        logger.debug(f"Flushed {len(data)} ranges ({rows} rows) to the sheet")
+        return rows
+
+    def clear(self) -> int:
+        """
+        Drop every queued write.
+
+        Returns:
+            Number of ranges dropped
+        """
+        dropped = len(self._pending)
+        self._pending, self._pending_cells = [], 0
+        return dropped
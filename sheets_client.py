@@ -0,0 +1,139 @@
+"""
+Process-wide Google Sheets client.
+
+Reading the service-account key, building the Sheets service and opening a new
+HTTPS connection used to happen for every GoogleSheetsManager. Credentials are
+now loaded once per process and their access token is refreshed ahead of
+expiry; each thread gets one Sheets service whose httplib2 transport keeps its
+connections open between calls. httplib2 is not thread-safe, so threads share
+credentials but never a transport. A token refresh runs outside the module
+lock; other threads keep using the current, still valid token meanwhile.
+"""
+import copy
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from config import Config
+from retry import retry_call
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+
+_lock = threading.Lock()
+_local = threading.local()
+_credentials = None
+_credentials_source = None
+_refresh_request = None
+_refreshing = False  # A thread is fetching a new access token
+_generation = 0  # Bumped whenever credentials are replaced so thread services are rebuilt
+
+
+def _source():
+    return (Config.GOOGLE_CREDENTIALS_FILE, Config.SHEETS_API_ENDPOINT)
+
+
+def _load_credentials():
+    from google.oauth2 import service_account
+    from google.auth.credentials import AnonymousCredentials
+
+    if os.path.exists(Config.GOOGLE_CREDENTIALS_FILE):
+        return service_account.Credentials.from_service_account_file(
+            Config.GOOGLE_CREDENTIALS_FILE, scopes=SCOPES)
+    if Config.SHEETS_API_ENDPOINT:
+        # Alternate endpoint without a key file, e.g. a local mock for load testing
+        return AnonymousCredentials()
+    raise FileNotFoundError(f"Credentials file not found: {Config.GOOGLE_CREDENTIALS_FILE}")
+
+
+def _refresh_if_expiring(credentials):
+    """
+    Refresh the access token when it expires within Config.SHEETS_TOKEN_REFRESH_MARGIN seconds.
+    
+    Called without _lock held. One thread refreshes a copy of the credentials and
+    takes the lock only to swap the new token in; threads arriving meanwhile return
+    straight away with the current token, which is still valid for the margin.
+    """
+    global _refresh_request, _refreshing
+    expiry = getattr(credentials, 'expiry', None)
+    if expiry is None:
+        # Anonymous, or no token fetched yet (the transport fetches one on first use)
+        return
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if expiry - now > timedelta(seconds=Config.SHEETS_TOKEN_REFRESH_MARGIN):
+        return
+    with _lock:
+        if _refreshing or credentials.expiry != expiry:
+            # Another thread is refreshing, or just has
+            return
+        _refreshing = True
+    try:
+        import google.auth.exceptions
+        import google_auth_httplib2
+        import httplib2
+
+        if _refresh_request is None:
+            _refresh_request = google_auth_httplib2.Request(httplib2.Http(timeout=Config.SHEETS_HTTP_TIMEOUT))
+        fresh = copy.copy(credentials)
+        retry_call(fresh.refresh, _refresh_request, name='sheets.token_refresh',
+                   retry_on=(google.auth.exceptions.TransportError,))
+        with _lock:
+            credentials.token, credentials.expiry = fresh.token, fresh.expiry
+        logger.debug(f"Refreshed Sheets access token (was valid until {expiry} UTC)")
+    except Exception as e:
+        # The transport refreshes on its own once the token has actually expired
+        logger.warning(f"Error refreshing Sheets access token ahead of expiry: {e}")
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+def get_credentials():
+    """Shared Sheets credentials, reloaded only when the credentials file or endpoint changes."""
+    global _credentials, _credentials_source, _generation
+    with _lock:
+        if _credentials is None or _credentials_source != _source():
+            _credentials = _load_credentials()
+            _credentials_source = _source()
+            _generation += 1
+            logger.info("Loaded Google Sheets credentials")
+        credentials = _credentials
+    _refresh_if_expiring(credentials)
+    return credentials
+
+
+def _build_service(credentials):
+    import google_auth_httplib2
+    import httplib2
+    from googleapiclient.discovery import build
+
+    client_options = None
+    if Config.SHEETS_API_ENDPOINT:
+        client_options = {'api_endpoint': Config.SHEETS_API_ENDPOINT}
+    # One keep-alive transport per thread; AuthorizedHttp adds the token and retries once on 401
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=Config.SHEETS_HTTP_TIMEOUT))
+    # Use the discovery document bundled with the client library instead of fetching it
+    return build('sheets', 'v4', http=http, client_options=client_options,
+                 static_discovery=True, cache_discovery=False)
+
+
+def get_sheets_service():
+    """The calling thread's Sheets service, built on first use and reused afterwards."""
+    credentials = get_credentials()
+    if getattr(_local, 'generation', None) != _generation:
+        _local.service = _build_service(credentials)
+        _local.generation = _generation
+        logger.debug(f"Built Sheets service for thread {threading.current_thread().name}")
+    return _local.service
+
+
+def reset_sheets_client():
+    """Drop the cached credentials and make every thread rebuild its service."""
+    global _credentials, _credentials_source, _generation
+    with _lock:
+        _credentials = None
+        _credentials_source = None
+        _generation += 1
@@ -0,0 +1,6 @@
+"""
+Build step for the static website (python -m site_build).
+"""
+from site_build.build import build_site
+
+__all__ = ['build_site']
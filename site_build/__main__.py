@@ -0,0 +1,135 @@
+"""
+Command-line entry point for the site build.
+
+Usage:
+    python -m site_build
+    python -m site_build --clean --json build_report.json
+    python -m site_build --watch
+    python -m site_build --check-links
+    python -m site_build --audit --json build_report.json
+    python -m site_build --out public --formats webp --jobs 2 --no-minify --no-critical-css
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from site_build.audit import audit_site, load_budgets, print_audit
+from site_build.build import DEFAULT_CACHE_DIR, DEFAULT_OUT_DIR, SITE_DIR, build_site, watch
+from site_build.links import check_links
+
+
+def _kb(size: int) -> str:
+    return f'{size / 1024:.1f}KB'
+
+
+def _saved(before: int, after: int) -> str:
+    return f'{100 * (1 - after / before):.1f}%' if before else '-'
+
+
+def print_report(report):
+    print(f"{'page':<24} {'html':>9} {'built':>9} {'saved':>7} {'images':>10} {'optimized':>10} {'saved':>7}")
+    for page, sizes in report.pages.items():
+        print(f"{page:<24} {_kb(sizes['html_bytes']):>9} {_kb(sizes['published_html_bytes']):>9} "
+              f"{_saved(sizes['html_bytes'], sizes['published_html_bytes']):>7} "
+              f"{_kb(sizes['original_image_bytes']):>10} {_kb(sizes['optimized_image_bytes']):>10} "
+              f"{_saved(sizes['original_image_bytes'], sizes['optimized_image_bytes']):>7}")
+    critical = {page: sizes for page, sizes in report.pages.items() if 'critical_css_bytes' in sizes}
+    if critical:
+        print(f"\n{'render-blocking css':<24} {'before':>9} {'inlined':>9} {'saved':>7}")
+        for page, sizes in critical.items():
+            before, after = sizes['blocking_css_bytes'], sizes['critical_css_bytes']
+            print(f"{page:<24} {_kb(before):>9} {_kb(after):>9} {_saved(before, after):>7}")
+    text_assets = {path: asset for path, asset in report.assets.items() if asset['bytes'] != asset['published_bytes']}
+    if text_assets:
+        print()
+        for path, asset in text_assets.items():
+            print(f"{path:<24} {_kb(asset['bytes']):>9} {_kb(asset['published_bytes']):>9} "
+                  f"{_saved(asset['bytes'], asset['published_bytes']):>7}  -> {asset['name']}")
+    problems = [f"broken link: {problem['page']} -> {problem['reference']} ({problem['problem']})"
+                for problem in report.links['broken']]
+    problems += [f"orphan page: {page} (not in the sitemap)" for page in report.links['orphans']]
+    problems += [f"oversized page: {page} ({_kb(report.pages[page]['published_html_bytes'])})"
+                 for page in report.links['oversized']]
+    if problems:
+        print('\n' + '\n'.join(problems))
+    print(f"\n{report.written} files written, {report.encoded} images encoded, {report.reused} reused from cache, "
+          f"{report.removed} stale files removed in {report.seconds:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the static site')
+    parser.add_argument('--source', default=SITE_DIR, help='Site root (default: repository root)')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='Output directory')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIR, help='Image and minification cache directory')
+    parser.add_argument('--formats', help='Comma-separated modern image formats (default: avif,webp)')
+    parser.add_argument('--jobs', type=int, help='Worker processes encoding images (default: CPU count)')
+    parser.add_argument('--no-minify', action='store_true', help='Publish pages, CSS and JS unminified')
+    parser.add_argument('--no-critical-css', action='store_true',
+                        help='Link stylesheets normally instead of inlining above-the-fold CSS')
+    parser.add_argument('--no-prune', action='store_true', help='Keep style rules no page uses')
+    parser.add_argument('--no-loading-hints', action='store_true',
+                        help='Load every image eagerly instead of lazy-loading those below the fold')
+    parser.add_argument('--no-link-hints', action='store_true',
+                        help='Leave out prefetch, preconnect and dns-prefetch hints')
+    parser.add_argument('--clean', action='store_true', help='Delete the output directory first')
+    parser.add_argument('--watch', action='store_true', help='Rebuild incrementally whenever a source file changes')
+    parser.add_argument('--json', help='Also write the build report to this file')
+    parser.add_argument('--check-links', action='store_true',
+                        help="Don't build; print the link graph and fail on broken links or oversized pages")
+    parser.add_argument('--sitemap', action='store_true', help='With --check-links, also print the sitemap')
+    parser.add_argument('--audit', action='store_true',
+                        help='After building, check every page against its performance budgets; fail if over')
+    parser.add_argument('--budgets', help='Budgets file (default: performance-budgets.json in the site root)')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose or args.watch else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    options = {
+        'out_dir': args.out,
+        'cache_dir': args.cache,
+        'formats': args.formats.split(',') if args.formats else None,
+        'jobs': args.jobs,
+        'minify_output': not args.no_minify,
+        'clean': args.clean,
+        'critical_css': not args.no_critical_css,
+        'prune_css': not args.no_prune,
+        'loading_hints': not args.no_loading_hints,
+        'link_hints': not args.no_link_hints,
+    }
+    if args.check_links:
+        sys.exit(1 if check_links(args.source, show_sitemap=args.sitemap) else 0)
+    if args.watch:
+        try:
+            watch(args.source, **options)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    budgets = None
+    if args.audit:
+        try:
+            budgets = load_budgets(args.source, args.budgets)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    report = build_site(args.source, **options)
+    print_report(report)
+    result = report.as_dict()
+    if args.audit:
+        print()
+        result['audit'] = audit_site(report.out_dir, budgets)
+        result['audit']['site'] = os.path.relpath(report.out_dir, args.source)
+        print_audit(result['audit'])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.audit and result['audit']['violations']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
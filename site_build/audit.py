@@ -0,0 +1,307 @@
+"""
+Offline page-performance budgets.
+
+Nothing used to stop a 3 MB image or a new render-blocking script from
+reaching the site; the cost only showed in the field. The audit replays what
+a browser fetches for each page, with no browser and no network, and checks
+the numbers against budgets before deploy:
+
+- critical path: the HTML plus render-blocking stylesheets and synchronous
+  <head> scripts, i.e. what must arrive before the first paint;
+- initial load: everything fetched while the page loads (critical path,
+  preloaded and non-blocking stylesheets, async scripts, the favicon and
+  every eagerly loaded image);
+- total: initial load plus lazy images below the fold and carousel slides
+  kept in data-src/data-srcset.
+
+For each <img> the candidate a browser picks is chosen: the first <picture>
+source in a supported format, then the srcset entry covering the slot from
+sizes at the profile's viewport width and device pixel ratio. Only local files
+are weighed. Third-party requests (the gtag script) are counted but have no
+size offline. CSS background images and fetch() calls are not seen.
+
+Budgets come from DEFAULT_BUDGETS, overridden by performance-budgets.json at
+the site root:
+
+    {"default": {"initial_kb": 500}, "pages": {"index.html": {"total_kb": 3000}}}
+"""
+import json
+import os
+import re
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+from site_build.critical import above_fold, parse_document
+from site_build.markup import local_path
+
+BUDGETS_FILE = 'performance-budgets.json'
+
+# Viewport width (CSS px) and device pixel ratio of each audited device
+PROFILES = {'mobile': (390, 3.0), 'desktop': (1280, 1.0)}
+
+# Limits per page and profile; sizes in KB (1024 bytes) of the files as served
+DEFAULT_BUDGETS = {
+    'critical_kb': 100,
+    'critical_requests': 4,
+    'initial_kb': 500,
+    'requests': 25,
+    'total_kb': 2500,
+    'largest_asset_kb': 500,
+    'blocking_scripts': 0,
+    'third_party_requests': 3,
+}
+
+SUPPORTED_TYPES = ('image/avif', 'image/webp', 'image/jpeg', 'image/png', 'image/gif', 'image/svg+xml')
+CATEGORIES = ('html', 'css', 'js', 'images')
+
+# A resource a page fetches: category is css/js/images, blocking means it delays the first paint,
+# deferred that it is fetched after load (lazy images, carousel slides)
+PageRequest = namedtuple('PageRequest', ['category', 'url', 'blocking', 'deferred'])
+
+_MEDIA_CONDITION = re.compile(r'^\(\s*(min|max)-width\s*:\s*([\d.]+)px\s*\)\s+(.+)$')
+
+
+def slot_width(sizes: Optional[str], viewport: int) -> float:
+    """CSS pixel width of an image slot from a sizes attribute (min/max-width conditions, px and vw lengths)."""
+    for entry in (sizes or '100vw').split(','):
+        entry = entry.strip()
+        match = _MEDIA_CONDITION.match(entry)
+        if match:
+            kind, limit, length = match.group(1), float(match.group(2)), match.group(3)
+            if (kind == 'max' and viewport > limit) or (kind == 'min' and viewport < limit):
+                continue
+            entry = length
+        if entry.endswith('vw'):
+            return viewport * float(entry[:-2]) / 100
+        if entry.endswith('px'):
+            return float(entry[:-2])
+    return float(viewport)
+
+
+def pick_candidate(srcset: str, sizes: Optional[str], viewport: int, dpr: float) -> Optional[str]:
+    """The srcset URL a browser picks: the smallest width descriptor covering the slot, else the largest."""
+    candidates = []
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        descriptor = parts[1] if len(parts) > 1 else '1x'
+        if descriptor.endswith('w'):
+            candidates.append((float(descriptor[:-1]), parts[0]))
+        elif descriptor.endswith('x'):
+            candidates.append((float(descriptor[:-1]) * slot_width(sizes, viewport), parts[0]))
+    if not candidates:
+        return None
+    candidates.sort()
+    needed = slot_width(sizes, viewport) * dpr
+    return next((url for width, url in candidates if width >= needed), candidates[-1][1])
+
+
+def _image_url(element, viewport: int, dpr: float) -> Optional[str]:
+    picture = element.parent if element.parent is not None and element.parent.tag == 'picture' else None
+    if picture is not None:
+        for source in picture.children:
+            if source.tag != 'source' or not source.attrs.get('srcset'):
+                continue
+            if source.attrs.get('type', 'image/jpeg') in SUPPORTED_TYPES:
+                return pick_candidate(source.attrs['srcset'], source.attrs.get('sizes'), viewport, dpr)
+    if element.attrs.get('srcset'):
+        return pick_candidate(element.attrs['srcset'], element.attrs.get('sizes'), viewport, dpr)
+    return element.attrs.get('src') or None
+
+
+def _deferred_url(element, viewport: int, dpr: float) -> Optional[str]:
+    """What a deferred carousel slide fetches once the page script loads it."""
+    picture = element.parent if element.parent is not None and element.parent.tag == 'picture' else None
+    for source in (picture.children if picture is not None else []):
+        if source.tag == 'source' and source.attrs.get('data-srcset'):
+            return pick_candidate(source.attrs['data-srcset'], source.attrs.get('sizes'), viewport, dpr)
+    if element.attrs.get('data-srcset'):
+        return pick_candidate(element.attrs['data-srcset'], element.attrs.get('sizes'), viewport, dpr)
+    return element.attrs.get('data-src') or None
+
+
+def _inside(element, *tags: str) -> bool:
+    ancestor = element.parent
+    while ancestor is not None:
+        if ancestor.tag in tags:
+            return True
+        ancestor = ancestor.parent
+    return False
+
+
+def page_requests(html: str, viewport: int, dpr: float) -> List[PageRequest]:
+    """Every request a page makes while loading, deferred images included, in document order."""
+    root, _ = parse_document(html)
+    fold = {id(element) for element in above_fold(root)}
+    requests = []
+    icon = None
+    for element in root.iter():
+        attrs = element.attrs
+        if _inside(element, 'noscript', 'template'):
+            continue
+        if element.tag == 'link':
+            rel = attrs.get('rel', '').lower().split()
+            if 'stylesheet' in rel:
+                blocking = attrs.get('media', 'all') not in ('print', 'none') and 'disabled' not in attrs
+                requests.append(PageRequest('css', attrs.get('href'), blocking, False))
+            elif 'preload' in rel and attrs.get('as') == 'style':
+                requests.append(PageRequest('css', attrs.get('href'), False, False))
+            elif 'preload' in rel and attrs.get('as') == 'image':
+                if attrs.get('type', 'image/jpeg') in SUPPORTED_TYPES:
+                    url = (pick_candidate(attrs['imagesrcset'], attrs.get('imagesizes'), viewport, dpr)
+                           if attrs.get('imagesrcset') else attrs.get('href'))
+                    requests.append(PageRequest('images', url, False, False))
+            elif 'icon' in rel and icon is None:
+                icon = attrs.get('href')
+                requests.append(PageRequest('images', icon, False, False))
+        elif element.tag == 'script' and attrs.get('src'):
+            synchronous = ('async' not in attrs and 'defer' not in attrs
+                           and attrs.get('type', '').lower() != 'module')
+            requests.append(PageRequest('js', attrs['src'], synchronous and _inside(element, 'head'), False))
+        elif element.tag == 'img':
+            if attrs.get('data-src') or attrs.get('data-srcset'):
+                requests.append(PageRequest('images', _deferred_url(element, viewport, dpr), False, True))
+            elif attrs.get('loading') == 'lazy' and id(element) not in fold:
+                requests.append(PageRequest('images', _image_url(element, viewport, dpr), False, True))
+            else:
+                requests.append(PageRequest('images', _image_url(element, viewport, dpr), False, False))
+    return [request for request in requests if request.url]
+
+
+def measure_page(site_dir: str, page: str, viewport: int, dpr: float) -> dict:
+    """
+    What a page fetches at one viewport; every URL counts once (the browser cache dedupes).
+
+    Returns:
+        Byte and request counts, per-category initial bytes, the largest file fetched
+        and local references that do not exist
+    """
+    path = os.path.join(site_dir, page)
+    with open(path, encoding='utf-8') as f:
+        html = f.read()
+    html_bytes = os.path.getsize(path)
+    metrics = {
+        'critical_bytes': html_bytes, 'critical_requests': 1,
+        'initial_bytes': html_bytes, 'requests': 1,
+        'total_bytes': html_bytes, 'total_requests': 1,
+        'blocking_scripts': 0, 'third_party_requests': 0,
+        'largest_asset': {'path': page, 'bytes': html_bytes},
+        'categories': dict(dict.fromkeys(CATEGORIES, 0), html=html_bytes),
+        'missing': [],
+    }
+    seen = set()
+    for request in page_requests(html, viewport, dpr):
+        relative = local_path(request.url)
+        key = relative or request.url
+        if key in seen:
+            continue
+        seen.add(key)
+        if request.category == 'js' and request.blocking:
+            metrics['blocking_scripts'] += 1
+        if relative is None:
+            if request.url.startswith(('http://', 'https://', '//')):
+                metrics['third_party_requests'] += 1
+                metrics['total_requests'] += 1
+                if not request.deferred:
+                    metrics['requests'] += 1
+                    metrics['critical_requests'] += request.blocking
+            continue
+        file_path = os.path.join(site_dir, os.path.dirname(page), relative)
+        if not os.path.isfile(file_path):
+            metrics['missing'].append(relative)
+            continue
+        size = os.path.getsize(file_path)
+        metrics['total_bytes'] += size
+        metrics['total_requests'] += 1
+        if size > metrics['largest_asset']['bytes']:
+            metrics['largest_asset'] = {'path': relative, 'bytes': size}
+        if request.deferred:
+            continue
+        metrics['initial_bytes'] += size
+        metrics['requests'] += 1
+        metrics['categories'][request.category] += size
+        if request.blocking:
+            metrics['critical_bytes'] += size
+            metrics['critical_requests'] += 1
+    return metrics
+
+
+def load_budgets(site_dir: str, path: Optional[str] = None) -> dict:
+    """{'default': {...}, 'pages': {page: {...}}} from DEFAULT_BUDGETS and the budgets file, if there is one."""
+    budgets = {'default': dict(DEFAULT_BUDGETS), 'pages': {}}
+    path = path or os.path.join(site_dir, BUDGETS_FILE)
+    if not os.path.exists(path):
+        return budgets
+    with open(path) as f:
+        overrides = json.load(f)
+    unknown = set(overrides.get('default', {})).union(*overrides.get('pages', {}).values()) - set(DEFAULT_BUDGETS)
+    if unknown:
+        raise ValueError(f"{path}: unknown budget(s) {', '.join(sorted(unknown))}; "
+                         f"known: {', '.join(DEFAULT_BUDGETS)}")
+    budgets['default'].update(overrides.get('default', {}))
+    budgets['pages'] = overrides.get('pages', {})
+    return budgets
+
+
+def _budget_value(metrics: dict, name: str) -> float:
+    if name == 'largest_asset_kb':
+        return metrics['largest_asset']['bytes'] / 1024
+    if name.endswith('_kb'):
+        return metrics[f'{name[:-3]}_bytes'] / 1024
+    return metrics[name]
+
+
+def audit_site(site_dir: str, budgets: Optional[dict] = None, profiles: Optional[Dict[str, tuple]] = None) -> dict:
+    """
+    Measure every page of a site under each profile and check it against its budgets.
+
+    Returns:
+        JSON-serializable report: profiles, budgets, per-page metrics per profile and violations
+    """
+    from site_build.build import site_pages
+
+    budgets = budgets or load_budgets(site_dir)
+    profiles = profiles or PROFILES
+    report = {'site': site_dir, 'profiles': {name: {'viewport': viewport, 'dpr': dpr}
+                                             for name, (viewport, dpr) in profiles.items()},
+              'budgets': budgets, 'pages': {}, 'violations': []}
+    for page in site_pages(site_dir):
+        limits = dict(budgets['default'], **budgets['pages'].get(page, {}))
+        report['pages'][page] = {}
+        for profile, (viewport, dpr) in profiles.items():
+            metrics = measure_page(site_dir, page, viewport, dpr)
+            report['pages'][page][profile] = metrics
+            for name, limit in limits.items():
+                if limit is None:
+                    continue
+                value = _budget_value(metrics, name)
+                if value > limit:
+                    report['violations'].append({'page': page, 'profile': profile, 'budget': name,
+                                                 'value': round(value, 1), 'limit': limit})
+    return report
+
+
+def _kb(size: int) -> str:
+    return f'{size / 1024:.1f}'
+
+
+def print_audit(report: dict):
+    print(f"{'page':<24} {'profile':<8} {'critical KB':>11} {'reqs':>4} {'initial KB':>10} {'reqs':>4} "
+          f"{'total KB':>9} {'3rd':>3} {'blocking':>8}  largest")
+    for page, profiles in report['pages'].items():
+        for profile, metrics in profiles.items():
+            largest = metrics['largest_asset']
+            print(f"{page:<24} {profile:<8} {_kb(metrics['critical_bytes']):>11} {metrics['critical_requests']:>4} "
+                  f"{_kb(metrics['initial_bytes']):>10} {metrics['requests']:>4} {_kb(metrics['total_bytes']):>9} "
+                  f"{metrics['third_party_requests']:>3} {metrics['blocking_scripts']:>8}  "
+                  f"{largest['path']} ({_kb(largest['bytes'])} KB)")
+            for missing in metrics['missing']:
+                print(f"    missing: {missing}")
+    if report['violations']:
+        print(f"\n{len(report['violations'])} budget(s) exceeded:")
+        for violation in report['violations']:
+            print(f"  {violation['page']} ({violation['profile']}): {violation['budget']} "
+                  f"{violation['value']} > {violation['limit']}")
+    else:
+        print("\nEvery page is within its budgets")
@@ -0,0 +1,432 @@
+"""
+Build the static site into a deployable directory.
+
+Pages and assets are copied from the repository root into dist/:
+
+1. the pricing card is rendered from pricing.json into the pages
+   (see site_build.pricing);
+2. images shown through <img> become responsive, modern-format variants
+   (see site_build.images), and load lazily or with priority depending on
+   where they sit on the page (see site_build.loading);
+3. style rules no page can use are pruned (see site_build.css);
+4. stylesheets and scripts are minified and, like every other file a page
+   references, published under a content-hashed name in assets/
+   (see site_build.fingerprint);
+5. each page gets its above-the-fold CSS inlined and loads the stylesheet
+   without blocking rendering (see site_build.critical);
+6. pages are rewritten to the hashed names and minified;
+7. pages prefetch the pages most likely opened next and preconnect to the
+   third-party origins they use, and sitemap.xml is generated from the link
+   graph, which is also checked for broken links (see site_build.links).
+
+Builds are incremental: encoded images and minified text are cached in the
+cache directory by content hash, unchanged outputs are not rewritten, and stale
+generated files are removed. --watch rebuilds whenever a source file changes.
+"""
+import glob
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from typing import Callable, Dict, List, Optional
+
+from site_build import critical, fingerprint, links, loading, minify, pricing
+from site_build.css import parse_stylesheet, prune_unused, serialize
+from site_build.markup import local_path
+from site_build.images import ImageOptimizer, OUTPUT_DIR, page_images, pillow_available, rewrite_images
+
+logger = logging.getLogger(__name__)
+
+SITE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT_DIR = 'dist'
+DEFAULT_CACHE_DIR = '.site_cache'
+
+# Files served alongside the pages (everything else in the repo is the job agent)
+STATIC_FILES = ['CNAME', pricing.DATA_FILE]
+STATIC_DIRS = ['images']
+HEADERS_FILE = '_headers'
+
+MINIFIERS = {
+    '.css': minify.minify_css,
+    '.js': minify.minify_js,
+    '.html': minify.minify_html,
+}
+
+
+def site_pages(source_dir: str) -> List[str]:
+    """HTML pages at the site root, as paths relative to it."""
+    return sorted(os.path.basename(path) for path in glob.glob(os.path.join(source_dir, '*.html')))
+
+
+def source_files(source_dir: str) -> List[str]:
+    """Every file a build reads, for --watch."""
+    paths = [os.path.join(source_dir, page) for page in site_pages(source_dir)]
+    paths += [os.path.join(source_dir, name) for name in STATIC_FILES + [HEADERS_FILE]]
+    paths += glob.glob(os.path.join(source_dir, '*.css')) + glob.glob(os.path.join(source_dir, '*.js'))
+    for directory in STATIC_DIRS:
+        paths += glob.glob(os.path.join(source_dir, directory, '*'))
+    return sorted(path for path in set(paths) if os.path.isfile(path))
+
+
+def copy_if_changed(source: str, target: str) -> bool:
+    """Copy source to target unless target already has the same size and mtime."""
+    if os.path.exists(target):
+        source_stat, target_stat = os.stat(source), os.stat(target)
+        if source_stat.st_size == target_stat.st_size and int(source_stat.st_mtime) == int(target_stat.st_mtime):
+            return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(source, target)
+    return True
+
+
+def write_if_changed(path: str, data: bytes) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def _remove_stale(out_dir: str, directory: str, keep: set) -> int:
+    removed = 0
+    for path in glob.glob(os.path.join(out_dir, directory, '*')):
+        relative = os.path.relpath(path, out_dir).replace(os.sep, '/')
+        if relative not in keep:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+class TextCache:
+    """
+    Memoizes text transforms (minification) on disk by content hash.
+
+    The minifier source is part of the key, so editing minify.py invalidates it.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = os.path.join(cache_dir, 'text')
+        with open(minify.__file__, 'rb') as f:
+            self._version = hashlib.sha256(f.read()).digest()
+        self.hits = 0
+        self.misses = 0
+
+    def apply(self, kind: str, text: str, transform: Callable[[str], str]) -> str:
+        digest = hashlib.sha256(self._version + kind.encode() + text.encode('utf-8')).hexdigest()
+        path = os.path.join(self.cache_dir, digest[:2], digest)
+        try:
+            with open(path, encoding='utf-8') as f:
+                result = f.read()
+            self.hits += 1
+            return result
+        except OSError:
+            pass
+        result = transform(text)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            f.write(result)
+        os.replace(f'{path}.tmp', path)
+        self.misses += 1
+        return result
+
+
+class BuildReport:
+    """What a build produced, for the CLI summary and --json."""
+
+    def __init__(self, out_dir: str = DEFAULT_OUT_DIR):
+        self.out_dir = out_dir
+        self.pages: Dict[str, Dict[str, int]] = {}
+        self.assets: Dict[str, Dict] = {}
+        self.written = 0
+        self.encoded = 0
+        self.reused = 0
+        self.removed = 0
+        self.seconds = 0.0
+        self.links: Dict[str, list] = {'broken': [], 'orphans': [], 'oversized': []}
+
+    def as_dict(self) -> dict:
+        return {'pages': self.pages, 'assets': self.assets, 'written': self.written, 'encoded': self.encoded,
+                'reused': self.reused, 'removed': self.removed, 'seconds': round(self.seconds, 3),
+                'links': self.links}
+
+
+def _page_image_bytes(source_dir: str, out_dir: str, html: str, optimizer: Optional[ImageOptimizer]) -> Dict[str, int]:
+    """Bytes of the page's distinct images: originals, and the variant a 960px-wide viewport fetches."""
+    original = optimized = 0
+    for source in dict.fromkeys(page_images(html)):
+        path = os.path.join(source_dir, source)
+        if not os.path.isfile(path):
+            continue
+        original += os.path.getsize(path)
+        variants = optimizer.variants(source) if optimizer else None
+        if variants:
+            best = (variants.modern_formats() or [variants.fallback])[0]
+            optimized += os.path.getsize(os.path.join(out_dir, variants.closest(best, 960)))
+        else:
+            optimized += os.path.getsize(path)
+    return {'original_image_bytes': original, 'optimized_image_bytes': optimized}
+
+
+class _Publisher:
+    """Writes fingerprinted assets and remembers their hashed names."""
+
+    def __init__(self, source_dir: str, out_dir: str, texts: TextCache, report: BuildReport, minify_assets: bool):
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self.texts = texts
+        self.report = report
+        self.minify_assets = minify_assets
+        self.mapping: Dict[str, str] = {}
+
+    def publish(self, path: str, data: bytes, original_size: int):
+        name = fingerprint.hashed_name(path, data)
+        if write_if_changed(os.path.join(self.out_dir, name), data):
+            self.report.written += 1
+        self.mapping[path] = name
+        self.report.assets[path] = {'name': name, 'bytes': original_size, 'published_bytes': len(data)}
+
+    def publish_file(self, path: str):
+        with open(os.path.join(self.source_dir, path), 'rb') as f:
+            data = f.read()
+        self.publish(path, data, len(data))
+
+    def publish_text(self, path: str, text: str, original_size: int):
+        ext = os.path.splitext(path)[1].lower()
+        if self.minify_assets and ext in MINIFIERS:
+            text = self.texts.apply(ext, text, MINIFIERS[ext])
+        self.publish(path, text.encode('utf-8'), original_size)
+
+
+def _inline_critical_css(page: str, html: str, stylesheet_nodes: Dict[str, list], script_texts: Dict[str, str],
+                         mapping: Dict[str, str], texts: TextCache, minify_output: bool, report: BuildReport) -> str:
+    """Inline the above-the-fold rules of each local stylesheet and load the stylesheet itself lazily."""
+    links = [link for link in critical.stylesheet_links(html) if local_path(link.get('href')) in stylesheet_nodes]
+    if not links:
+        return html
+    root, inline_scripts = critical.parse_document(html)
+    page_scripts = [script_texts[path] for path in fingerprint.page_references(html) if path in script_texts]
+    dynamic = critical.script_words(inline_scripts + page_scripts)
+    elements = critical.above_fold(root)
+    blocking = inlined = 0
+    for link in reversed(links):
+        path = local_path(link.get('href'))
+        nodes = stylesheet_nodes[path]
+        # Cached on the page and stylesheet text, so unchanged pages skip selector matching
+        key = '\0'.join([html, path, serialize(nodes)] + page_scripts)
+        css = texts.apply('critical', key, lambda _: serialize(critical.critical_rules(nodes, elements, dynamic)))
+        css = fingerprint.rewrite_css_urls(css, path, page, mapping)
+        if minify_output:
+            css = texts.apply('.css', css, minify.minify_css)
+        with open(os.path.join(report.out_dir, mapping[path]), 'rb') as f:
+            blocking += len(f.read())
+        inlined += len(css.encode('utf-8'))
+        html = critical.inline_critical(html, link, css)
+    report.pages[page]['blocking_css_bytes'] = blocking
+    report.pages[page]['critical_css_bytes'] = inlined
+    return html
+
+
+def build_site(source_dir: str = SITE_DIR, out_dir: str = DEFAULT_OUT_DIR, cache_dir: str = DEFAULT_CACHE_DIR,
+               formats: Optional[List[str]] = None, jobs: Optional[int] = None, minify_output: bool = True,
+               clean: bool = False, critical_css: bool = True, prune_css: bool = True,
+               loading_hints: bool = True, link_hints: bool = True) -> BuildReport:
+    """
+    Build the site.
+
+    Args:
+        source_dir: Site root containing the pages
+        out_dir: Output directory (relative paths are resolved against source_dir)
+        cache_dir: Image and minification cache (relative paths are resolved against source_dir)
+        formats: Modern image formats to emit, defaults to all Pillow supports
+        jobs: Worker processes encoding images
+        minify_output: Minify pages, stylesheets and scripts
+        clean: Delete out_dir first instead of updating it in place
+        critical_css: Inline each page's above-the-fold CSS and load stylesheets without blocking render
+        prune_css: Drop style rules whose selectors match nothing on the site
+        loading_hints: Lazy-load images below the fold and preload the hero image
+        link_hints: Prefetch likely next pages and preconnect to third-party origins
+
+    Returns:
+        BuildReport
+    """
+    started = time.perf_counter()
+    out_dir = os.path.join(source_dir, out_dir)
+    cache_dir = os.path.join(source_dir, cache_dir)
+    if clean and os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    report = BuildReport(out_dir)
+    texts = TextCache(cache_dir)
+
+    optimizer = None
+    if pillow_available():
+        optimizer = ImageOptimizer(source_dir, out_dir, cache_dir, formats=formats, jobs=jobs)
+    else:
+        logger.warning("Pillow is not installed; images are published without responsive variants")
+
+    pages = {}
+    for page in site_pages(source_dir):
+        with open(os.path.join(source_dir, page), encoding='utf-8') as f:
+            pages[page] = f.read()
+    pricing_data = pricing.load_pricing(source_dir)
+    if pricing_data:
+        for page, html in pages.items():
+            pages[page], cards = pricing.prerender_pricing(html, pricing_data)
+            if cards:
+                logger.debug(f"Rendered {cards} pricing card(s) into {page}")
+    graph = links.LinkGraph(pages)
+    report.links['broken'] = [{'page': page, 'reference': reference, 'problem': problem}
+                              for page, reference, problem in graph.broken_links(source_dir)]
+    report.links['orphans'] = graph.orphans()
+    for problem in report.links['broken']:
+        logger.warning(f"Broken link in {problem['page']}: {problem['reference']} ({problem['problem']})")
+    for page in report.links['orphans']:
+        logger.warning(f"{page} is not reachable from {links.HOME_PAGE}; it is left out of {links.SITEMAP_FILE}")
+    if optimizer:
+        # One pass over every page's images so misses encode in parallel
+        optimizer.prepare(source for html in pages.values() for source in page_images(html))
+
+    built = {}
+    for page, html in pages.items():
+        built[page] = rewrite_images(html, optimizer) if optimizer else html
+        if loading_hints:
+            built[page] = loading.add_loading_hints(built[page])
+        if link_hints:
+            built[page] = links.add_link_hints(built[page], **links.page_hints(graph, page))
+        report.pages[page] = _page_image_bytes(source_dir, out_dir, html, optimizer)
+
+    # Fingerprint what the pages reference: plain files first, then stylesheets
+    # (whose url()s may name those files), then scripts
+    publisher = _Publisher(source_dir, out_dir, texts, report, minify_output)
+    generated = optimizer.outputs if optimizer else set()
+    references = [path for html in built.values() for path in fingerprint.page_references(html)
+                  if path not in generated and not path.endswith('.html')
+                  and os.path.isfile(os.path.join(source_dir, path))]
+    stylesheets = [path for path in references if path.endswith('.css')]
+    scripts = [path for path in references if path.endswith('.js')]
+    stylesheet_texts = {}
+    for path in stylesheets:
+        with open(os.path.join(source_dir, path), encoding='utf-8') as f:
+            stylesheet_texts[path] = f.read()
+    css_files = [referenced for path, css in stylesheet_texts.items()
+                 for referenced in fingerprint.css_references(css, path)
+                 if os.path.isfile(os.path.join(source_dir, referenced))]
+    for path in dict.fromkeys(css_files + references):
+        if path not in stylesheets and path not in scripts:
+            publisher.publish_file(path)
+    script_texts = {}
+    for path in dict.fromkeys(scripts):
+        with open(os.path.join(source_dir, path), encoding='utf-8') as f:
+            script_texts[path] = f.read()
+
+    stylesheet_nodes = {path: parse_stylesheet(css) for path, css in stylesheet_texts.items()}
+    if prune_css:
+        # Every token of the markup and scripts, so classes added at runtime count as used
+        words = set()
+        for text in list(built.values()) + list(script_texts.values()):
+            words.update(re.findall(r'[\w-]+', text))
+        for path, nodes in stylesheet_nodes.items():
+            stylesheet_nodes[path] = prune_unused(nodes, words)
+            stylesheet_texts[path] = serialize(stylesheet_nodes[path])
+    for path, css in stylesheet_texts.items():
+        output_path = fingerprint.hashed_name(path, b'')  # only the directory matters for relative url()s
+        with open(os.path.join(source_dir, path), 'rb') as f:
+            original_size = len(f.read())
+        publisher.publish_text(path, fingerprint.rewrite_css_urls(css, path, output_path, publisher.mapping),
+                               original_size)
+    for path, js in script_texts.items():
+        publisher.publish_text(path, js, len(js.encode('utf-8')))
+
+    for page, html in built.items():
+        if critical_css:
+            html = _inline_critical_css(page, html, stylesheet_nodes, script_texts, publisher.mapping, texts,
+                                        minify_output, report)
+        html = fingerprint.rewrite_page_references(html, publisher.mapping)
+        report.pages[page]['html_bytes'] = len(html.encode('utf-8'))
+        if minify_output:
+            html = texts.apply('.html', html, minify.minify_html)
+        data = html.encode('utf-8')
+        if write_if_changed(os.path.join(out_dir, page), data):
+            report.written += 1
+        report.pages[page]['published_html_bytes'] = len(data)
+        if len(data) > links.MAX_PAGE_BYTES:
+            report.links['oversized'].append(page)
+            logger.warning(f"{page} is {len(data) / 1024:.1f} KB of HTML, over the "
+                           f"{links.MAX_PAGE_BYTES / 1024:.0f} KB page limit")
+
+    base_url = links.site_url(source_dir)
+    if base_url:
+        lastmod = {page: links.last_modified(source_dir, page) for page in pages}
+        sitemap = links.sitemap_xml(graph, base_url, lastmod).encode('utf-8')
+        if write_if_changed(os.path.join(out_dir, links.SITEMAP_FILE), sitemap):
+            report.written += 1
+
+    for name in STATIC_FILES:
+        path = os.path.join(source_dir, name)
+        if os.path.exists(path) and copy_if_changed(path, os.path.join(out_dir, name)):
+            report.written += 1
+    for directory in STATIC_DIRS:
+        # Originals stay available under their old names for links from outside the site
+        for path in glob.glob(os.path.join(source_dir, directory, '*')):
+            if os.path.isfile(path):
+                relative = os.path.relpath(path, source_dir)
+                if copy_if_changed(path, os.path.join(out_dir, relative)):
+                    report.written += 1
+
+    extra_headers = None
+    if os.path.exists(os.path.join(source_dir, HEADERS_FILE)):
+        with open(os.path.join(source_dir, HEADERS_FILE)) as f:
+            extra_headers = f.read()
+    if write_if_changed(os.path.join(out_dir, HEADERS_FILE), fingerprint.headers_file(extra=extra_headers).encode()):
+        report.written += 1
+
+    report.removed = _remove_stale(out_dir, fingerprint.ASSET_DIR, set(publisher.mapping.values()))
+    if optimizer:
+        report.encoded, report.reused = optimizer.encoded, optimizer.reused
+        report.removed += _remove_stale(out_dir, OUTPUT_DIR, optimizer.outputs)
+    report.seconds = time.perf_counter() - started
+    logger.info(f"Built {len(report.pages)} pages into {out_dir} in {report.seconds:.2f}s: "
+                f"{report.written} files written, {report.encoded} images encoded, "
+                f"{report.reused} reused from cache, {texts.hits} minified texts reused")
+    return report
+
+
+def _snapshot(source_dir: str) -> Dict[str, float]:
+    snapshot = {}
+    for path in source_files(source_dir):
+        try:
+            snapshot[path] = os.stat(path).st_mtime
+        except OSError:
+            pass
+    return snapshot
+
+
+def watch(source_dir: str = SITE_DIR, interval: float = 1.0, **options):
+    """
+    Build, then rebuild incrementally whenever a source file is added, changed or removed.
+
+    Runs until interrupted. options are passed to build_site.
+    """
+    snapshot = _snapshot(source_dir)
+    build_site(source_dir, **options)
+    options['clean'] = False  # rebuilds update the output in place
+    logger.info(f"Watching {len(snapshot)} files for changes")
+    while True:
+        time.sleep(interval)
+        current = _snapshot(source_dir)
+        if current == snapshot:
+            continue
+        changed = sorted(path for path in set(current) | set(snapshot) if current.get(path) != snapshot.get(path))
+        snapshot = current
+        logger.info(f"Changed: {', '.join(os.path.relpath(path, source_dir) for path in changed)}")
+        try:
+            build_site(source_dir, **options)
+        except Exception as e:
+            # Keep watching; the next save usually fixes whatever broke
+            logger.error(f"Build failed: {e}")
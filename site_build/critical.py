@@ -0,0 +1,216 @@
+"""
+Critical (above-the-fold) CSS per page.
+
+Without a browser the fold is approximated from the page structure: the
+navigation bar and the hero section, plus the block after a compact hero,
+which shares the first screen with it. A rule is critical when one of its
+selectors matches an element there. Structural pseudo-classes and
+pseudo-elements are treated as matching, and so are classes the page's scripts
+add at runtime, so the inlined subset errs on the side of too much rather than
+too little; interaction states (:hover, :focus, ...) wait for the full sheet.
+
+The critical rules are inlined in a <style> block and the page's full
+stylesheet is fetched without blocking rendering (rel=preload, switched to a
+stylesheet on load, with a <noscript> fallback). Loading the complete
+stylesheet rather than "everything else" keeps the cascade order intact and
+lets every page share one cached file.
+"""
+import re
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Set
+
+from site_build.css import AtRule, Compound, Rule, keyframes_used, parse_selector
+from site_build.markup import find_tags, render_start_tag, splice
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+             'track', 'wbr'}
+# Selectors that only apply to user interaction never affect the first paint
+_INTERACTIVE_PSEUDOS = re.compile(r':(hover|focus|focus-within|focus-visible|active|visited)\b')
+_STRING_LITERAL = re.compile(r'''(["'`])((?:\\.|(?!\1).)*?)\1''', re.S)
+
+
+class Element:
+    __slots__ = ('tag', 'attrs', 'classes', 'id', 'parent', 'children', 'index')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional['Element']):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = set((attrs.get('class') or '').split())
+        self.id = attrs.get('id')
+        self.parent = parent
+        self.children: List['Element'] = []
+        self.index = len(parent.children) if parent else 0
+        if parent:
+            parent.children.append(self)
+
+    def iter(self):
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+    def previous_siblings(self):
+        if self.parent:
+            yield from reversed(self.parent.children[:self.index])
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element('#document', {}, None)
+        self.stack = [self.root]
+        self.scripts: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        element = Element(tag, {key: value or '' for key, value in attrs}, self.stack[-1])
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_startendtag(self, tag, attrs):
+        Element(tag, {key: value or '' for key, value in attrs}, self.stack[-1])
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, 0, -1):
+            if self.stack[depth].tag == tag:
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        if self.stack[-1].tag == 'script':
+            self.scripts.append(data)
+
+
+def parse_document(html: str):
+    """(root Element, inline script texts) of a page."""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root, builder.scripts
+
+
+def script_words(scripts: Iterable[str]) -> Set[str]:
+    """Class-like tokens inside the string literals of scripts (classList.add('active') etc.)."""
+    words = set()
+    for script in scripts:
+        for match in _STRING_LITERAL.finditer(script):
+            words.update(re.findall(r'[A-Za-z_][\w-]*', match.group(2)))
+    return words
+
+
+def above_fold(root: Element) -> List[Element]:
+    """Elements rendered on the first screen: <html>, <body>, the navigation and the hero."""
+    html = next((element for element in root.children if element.tag == 'html'), root)
+    body = next((element for element in html.children if element.tag == 'body'), None)
+    if body is None:
+        return list(root.iter())
+    elements = [root, html, body]
+    blocks = [child for child in body.children if child.tag not in ('script', 'noscript', 'style', 'template')]
+    for position, block in enumerate(blocks):
+        elements.extend(block.iter())
+        if 'hero' in block.classes:
+            if 'hero-compact' in block.classes and position + 1 < len(blocks):
+                elements.extend(blocks[position + 1].iter())
+            break
+    return elements
+
+
+def _compound_matches(compound: Compound, element: Element, dynamic: Set[str]) -> bool:
+    if compound.tag != '*' and compound.tag != element.tag:
+        return False
+    if any(identifier != element.id for identifier in compound.ids):
+        return False
+    if any(name not in element.classes and name not in dynamic for name in compound.classes):
+        return False
+    for name, operator, value in compound.attributes:
+        if name not in element.attrs:
+            return False
+        actual = element.attrs[name]
+        if operator == '=' and actual != value:
+            return False
+        if operator == '~=' and value not in actual.split():
+            return False
+        if operator == '^=' and not actual.startswith(value):
+            return False
+        if operator == '$=' and not actual.endswith(value):
+            return False
+        if operator == '*=' and value not in actual:
+            return False
+        if operator == '|=' and not (actual == value or actual.startswith(value + '-')):
+            return False
+    for pseudo in compound.pseudos:
+        if pseudo == ':root' and element.tag != 'html':
+            return False
+    return True
+
+
+def _matches(parts, position: int, element: Element, dynamic: Set[str]) -> bool:
+    combinator, compound = parts[position]
+    if not _compound_matches(compound, element, dynamic):
+        return False
+    if position == 0:
+        return True
+    if combinator == '>':
+        return element.parent is not None and _matches(parts, position - 1, element.parent, dynamic)
+    if combinator == ' ':
+        ancestor = element.parent
+        while ancestor is not None:
+            if _matches(parts, position - 1, ancestor, dynamic):
+                return True
+            ancestor = ancestor.parent
+        return False
+    siblings = element.previous_siblings()
+    if combinator == '+':
+        sibling = next(siblings, None)
+        return sibling is not None and _matches(parts, position - 1, sibling, dynamic)
+    return any(_matches(parts, position - 1, sibling, dynamic) for sibling in siblings)
+
+
+def selector_matches(selector: str, elements: Iterable[Element], dynamic: Set[str]) -> bool:
+    if _INTERACTIVE_PSEUDOS.search(selector):
+        return False
+    parts = parse_selector(selector)
+    if parts is None:
+        return True
+    return any(_matches(parts, len(parts) - 1, element, dynamic) for element in elements)
+
+
+def critical_rules(nodes: list, elements: List[Element], dynamic: Set[str]) -> list:
+    """The subset of nodes that styles the given elements, in stylesheet order."""
+    selected = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = [selector for selector in node.selectors if selector_matches(selector, elements, dynamic)]
+            if selectors:
+                selected.append(Rule(','.join(selectors), node.body))
+        elif node.children is not None:
+            children = critical_rules(node.children, elements, dynamic)
+            if children:
+                selected.append(AtRule(node.prelude, children=children))
+        elif node.name in ('@font-face', '@charset', '@import', '@namespace', '@property'):
+            selected.append(node)
+    # Animations that start on load need their @keyframes before the full stylesheet arrives
+    names = keyframes_used(selected)
+    for node in nodes:
+        if isinstance(node, AtRule) and node.name.endswith('keyframes') and node.prelude.split()[-1] in names:
+            selected.append(node)
+    return selected
+
+
+def stylesheet_links(html: str) -> List:
+    """Render-blocking local <link rel="stylesheet"> tags of a page."""
+    links = []
+    for tag in find_tags(html, 'link'):
+        rel = (tag.get('rel') or '').lower().split()
+        media = (tag.get('media') or 'all').lower()
+        if 'stylesheet' in rel and media in ('all', 'screen') and tag.get('href'):
+            links.append(tag)
+    return links
+
+
+def inline_critical(html: str, link, critical_css: str) -> str:
+    """Replace a stylesheet link with inlined critical CSS plus a non-blocking load of the full file."""
+    href = link.get('href')
+    preload = render_start_tag('link', [('rel', 'preload'), ('href', href), ('as', 'style'),
+                                        ('onload', "this.onload=null;this.rel='stylesheet'")])
+    fallback = render_start_tag('link', [('rel', 'stylesheet'), ('href', href)])
+    markup = f'<style>{critical_css}</style>{preload}<noscript>{fallback}</noscript>'
+    return splice(html, [(link.start, link.end, markup)])
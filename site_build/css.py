@@ -0,0 +1,287 @@
+"""
+A small CSS parser and selector model for build-time stylesheet analysis.
+
+Stylesheets are split into style rules and at-rules (@media/@supports blocks
+are parsed recursively, everything else is kept verbatim). Selectors are parsed
+into compound selectors joined by combinators, which is enough to match them
+against a page (site_build.critical) or to check whether the classes, ids and
+tags they need occur anywhere on the site (prune_unused).
+"""
+import re
+from typing import Iterable, List, Optional, Set, Tuple
+
+GROUPING_AT_RULES = ('@media', '@supports', '@layer', '@container')
+
+
+class Rule:
+    """A style rule: selector list and declaration block."""
+
+    __slots__ = ('selector_text', 'body')
+
+    def __init__(self, selector_text: str, body: str):
+        self.selector_text = selector_text
+        self.body = body
+
+    @property
+    def selectors(self) -> List[str]:
+        return split_top_level(self.selector_text, ',')
+
+    def css(self) -> str:
+        return f'{self.selector_text}{{{self.body}}}'
+
+
+class AtRule:
+    """An at-rule; grouping rules (@media etc.) carry parsed child rules, the rest only their text."""
+
+    __slots__ = ('prelude', 'children', 'body')
+
+    def __init__(self, prelude: str, children: Optional[list] = None, body: Optional[str] = None):
+        self.prelude = prelude
+        self.children = children
+        self.body = body
+
+    @property
+    def name(self) -> str:
+        return re.match(r'@[\w-]+', self.prelude).group().lower()
+
+    def css(self) -> str:
+        if self.children is not None:
+            return f'{self.prelude}{{{serialize(self.children)}}}'
+        if self.body is None:
+            return f'{self.prelude};'
+        return f'{self.prelude}{{{self.body}}}'
+
+
+def _skip_string(css: str, i: int) -> int:
+    quote = css[i]
+    i += 1
+    while i < len(css) and css[i] != quote:
+        i += 2 if css[i] == '\\' else 1
+    return i + 1
+
+
+def _strip_comments(css: str) -> str:
+    out = []
+    i = 0
+    while i < len(css):
+        if css[i] in '"\'':
+            end = _skip_string(css, i)
+            out.append(css[i:end])
+            i = end
+        elif css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = len(css) if end == -1 else end + 2
+            out.append(' ')
+        else:
+            out.append(css[i])
+            i += 1
+    return ''.join(out)
+
+
+def _block_end(css: str, i: int) -> int:
+    """Index just past the } matching the { at i."""
+    depth = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return len(css)
+
+
+def parse_stylesheet(css: str) -> list:
+    """Parse a stylesheet into Rule and AtRule nodes (comments are dropped)."""
+    return _parse_nodes(_strip_comments(css))
+
+
+def _parse_nodes(css: str) -> list:
+    nodes = []
+    i = 0
+    start = 0
+    while i < len(css):
+        char = css[i]
+        if char in '"\'':
+            i = _skip_string(css, i)
+            continue
+        if char == ';' and css[start:i].strip().startswith('@'):
+            nodes.append(AtRule(' '.join(css[start:i].split())))
+            start = i = i + 1
+            continue
+        if char == '{':
+            prelude = ' '.join(css[start:i].split())
+            end = _block_end(css, i)
+            body = css[i + 1:end - 1]
+            if prelude.startswith('@'):
+                if prelude.lower().startswith(GROUPING_AT_RULES):
+                    nodes.append(AtRule(prelude, children=_parse_nodes(body)))
+                else:
+                    nodes.append(AtRule(prelude, body=body.strip()))
+            elif prelude:
+                nodes.append(Rule(prelude, body.strip()))
+            start = i = end
+            continue
+        if char == '}':
+            # Stray closing brace; skip it like a browser would
+            start = i + 1
+        i += 1
+    return nodes
+
+
+def serialize(nodes: Iterable) -> str:
+    return '\n'.join(node.css() for node in nodes)
+
+
+def split_top_level(text: str, separator: str) -> List[str]:
+    """Split on separator outside (), [] and strings."""
+    parts = []
+    depth = 0
+    start = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char in '"\'':
+            i = _skip_string(text, i)
+            continue
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+        i += 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+class Compound:
+    """One compound selector, e.g. a.cta-button[href]:hover."""
+
+    __slots__ = ('tag', 'ids', 'classes', 'attributes', 'pseudos')
+
+    def __init__(self):
+        self.tag = '*'
+        self.ids: List[str] = []
+        self.classes: List[str] = []
+        self.attributes: List[Tuple[str, Optional[str], Optional[str]]] = []  # (name, operator, value)
+        self.pseudos: List[str] = []
+
+
+_COMPOUND_PART = re.compile(r'''
+    (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>(?:\\.|[\w-])+)
+  | \.(?P<cls>(?:\\.|[\w-])+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?P<value>"[^"]*"|'[^']*'|[^\]\s]+)\s*[is]?\s*)?\]
+  | (?P<pseudo>::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?)
+''', re.VERBOSE)
+
+
+def _unescape(name: str) -> str:
+    return re.sub(r'\\(.)', r'\1', name)
+
+
+def parse_selector(selector: str) -> Optional[List[Tuple[str, Compound]]]:
+    """
+    Parse one complex selector into [(combinator, Compound)], combinator '' for the first.
+
+    Returns None for selectors this parser does not understand (callers keep those).
+    """
+    parts = []
+    combinator = ''
+    i = 0
+    selector = selector.strip()
+    while i < len(selector):
+        if selector[i].isspace() or selector[i] in '>+~':
+            match = re.match(r'\s*([>+~]?)\s*', selector[i:])
+            combinator = match.group(1) or ' '
+            i += match.end()
+            continue
+        compound = Compound()
+        start = i
+        while i < len(selector) and not selector[i].isspace() and selector[i] not in '>+~':
+            match = _COMPOUND_PART.match(selector, i)
+            if not match:
+                return None
+            if match.group('tag'):
+                if i != start:
+                    return None
+                compound.tag = match.group('tag').lower()
+            elif match.group('id'):
+                compound.ids.append(_unescape(match.group('id')))
+            elif match.group('cls'):
+                compound.classes.append(_unescape(match.group('cls')))
+            elif match.group('attr'):
+                value = match.group('value')
+                if value and value[0] in '"\'':
+                    value = value[1:-1]
+                compound.attributes.append((match.group('attr').lower(), match.group('op'), value))
+            else:
+                compound.pseudos.append(match.group('pseudo'))
+            i = match.end()
+        parts.append((combinator if parts else '', compound))
+        combinator = ' '
+    return parts or None
+
+
+def selector_tokens(selector: str) -> Optional[Tuple[Set[str], Set[str], Set[str]]]:
+    """(classes, ids, tags) a selector needs, ignoring anything inside :not() and other pseudo-classes."""
+    parsed = parse_selector(selector)
+    if parsed is None:
+        return None
+    classes, ids, tags = set(), set(), set()
+    for _, compound in parsed:
+        classes.update(compound.classes)
+        ids.update(compound.ids)
+        if compound.tag != '*':
+            tags.add(compound.tag)
+    return classes, ids, tags
+
+
+def prune_unused(nodes: list, words: Set[str]) -> list:
+    """
+    Drop style rules whose selectors all need a class, id or tag that occurs nowhere in words.
+
+    words holds every token of the site's markup and scripts, so a class that
+    JavaScript adds at runtime still counts as used. Unparseable selectors are kept.
+    """
+    kept = []
+    for node in nodes:
+        if isinstance(node, Rule):
+            selectors = [selector for selector in node.selectors if _may_be_used(selector, words)]
+            if selectors:
+                if len(selectors) != len(node.selectors):
+                    node = Rule(','.join(selectors), node.body)
+                kept.append(node)
+        elif node.children is not None:
+            children = prune_unused(node.children, words)
+            if children:
+                kept.append(AtRule(node.prelude, children=children))
+        else:
+            kept.append(node)
+    return kept
+
+
+def _may_be_used(selector: str, words: Set[str]) -> bool:
+    tokens = selector_tokens(selector)
+    if tokens is None:
+        return True
+    classes, ids, tags = tokens
+    return all(name in words for name in classes | ids | tags)
+
+
+def keyframes_used(nodes: Iterable) -> Set[str]:
+    """Names that appear in the declarations of the given rules (candidate @keyframes names)."""
+    names = set()
+    for node in nodes:
+        if isinstance(node, Rule):
+            names.update(re.findall(r'[\w-]+', node.body))
+        elif node.children is not None:
+            names |= keyframes_used(node.children)
+    return names
@@ -0,0 +1,124 @@
+"""
+Content-hashed asset names.
+
+Stylesheets, scripts and other files the pages reference are published as
+assets/<name>.<hash>.<ext>, and every reference in the pages (and every url()
+in the stylesheets) is rewritten to the hashed name. A changed file gets a new
+name, so assets can be served with a year-long immutable cache lifetime and
+hand-maintained ?v=1 query strings are no longer needed.
+"""
+import hashlib
+import posixpath
+import re
+from typing import Dict, Iterable, List, Optional
+
+from site_build.markup import find_tags, local_path, render_start_tag, set_attrs, splice
+
+ASSET_DIR = 'assets'
+URL_ATTRIBUTES = ('href', 'src', 'srcset', 'data-full', 'data-src', 'data-srcset', 'poster')
+# Output paths whose names already carry a content hash
+IMMUTABLE_PATHS = ('/assets/*', '/images/responsive/*')
+
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+
+
+def hashed_name(path: str, data: bytes) -> str:
+    """assets/<stem>.<first 10 hex digits of sha256>.<ext> for a site-relative path."""
+    stem, ext = posixpath.splitext(posixpath.basename(path))
+    stem = re.sub(r'[^A-Za-z0-9_-]+', '-', stem).strip('-')
+    return f'{ASSET_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+
+
+def _srcset_paths(value: str) -> List[str]:
+    return [candidate.split()[0] for candidate in value.split(',') if candidate.strip()]
+
+
+def page_references(html: str) -> List[str]:
+    """Site-relative paths of every local file a page references through URL attributes."""
+    paths = []
+    for tag in find_tags(html):
+        for name in URL_ATTRIBUTES:
+            value = tag.get(name)
+            if not value:
+                continue
+            for reference in (_srcset_paths(value) if name.endswith('srcset') else [value]):
+                path = local_path(reference)
+                if path:
+                    paths.append(path)
+    return list(dict.fromkeys(paths))
+
+
+def _rewrite_reference(reference: str, mapping: Dict[str, str]) -> str:
+    path = local_path(reference)
+    if path in mapping:
+        # The hash replaces any cache-busting query string; keep a #fragment (e.g. SVG sprites)
+        fragment = reference.split('#', 1)[1] if '#' in reference else None
+        return mapping[path] + (f'#{fragment}' if fragment else '')
+    return reference
+
+
+def rewrite_page_references(html: str, mapping: Dict[str, str]) -> str:
+    """Point every URL attribute that names a fingerprinted file at its hashed name."""
+    replacements = []
+    for tag in find_tags(html):
+        updates = {}
+        for name in URL_ATTRIBUTES:
+            value = tag.get(name)
+            if not value:
+                continue
+            if name.endswith('srcset'):
+                candidates = []
+                for candidate in value.split(','):
+                    parts = candidate.split()
+                    if parts:
+                        candidates.append(' '.join([_rewrite_reference(parts[0], mapping)] + parts[1:]))
+                rewritten = ', '.join(candidates)
+            else:
+                rewritten = _rewrite_reference(value, mapping)
+            if rewritten != value:
+                updates[name] = rewritten
+        if updates:
+            replacements.append((tag.start, tag.end,
+                                 render_start_tag(tag.name, set_attrs(tag.attrs, updates), tag.self_closing)))
+    return splice(html, replacements)
+
+
+def css_references(css: str, css_path: str) -> List[str]:
+    """Site-relative paths of the local files a stylesheet at css_path references with url()."""
+    paths = []
+    for match in _CSS_URL.finditer(css):
+        path = local_path(match.group(2))
+        if path and not match.group(2).startswith('data:'):
+            paths.append(posixpath.normpath(posixpath.join(posixpath.dirname(css_path), path)))
+    return list(dict.fromkeys(paths))
+
+
+def rewrite_css_urls(css: str, css_path: str, output_path: str, mapping: Dict[str, str]) -> str:
+    """
+    Rewrite url() references of a stylesheet moving from css_path to output_path.
+
+    Fingerprinted files get their hashed names; everything else keeps its
+    location, re-expressed relative to the new stylesheet directory.
+    """
+    def replace(match):
+        reference = match.group(2)
+        path = local_path(reference)
+        if not path or reference.startswith('/'):
+            return match.group(0)
+        path = posixpath.normpath(posixpath.join(posixpath.dirname(css_path), path))
+        target = mapping.get(path, path)
+        relative = posixpath.relpath(target, posixpath.dirname(output_path) or '.')
+        return f'url({match.group(1)}{relative}{match.group(1)})'
+
+    return _CSS_URL.sub(replace, css)
+
+
+def headers_file(immutable_paths: Iterable[str] = IMMUTABLE_PATHS, extra: Optional[str] = None) -> str:
+    """A Cloudflare Pages _headers file marking content-hashed paths as immutable."""
+    lines = ['# Generated by python -m site_build: these file names change whenever their content does']
+    for path in immutable_paths:
+        lines.append(path)
+        lines.append('  Cache-Control: public, max-age=31536000, immutable')
+    if extra:
+        lines.append(extra.rstrip('\n'))
+    return '\n'.join(lines) + '\n'
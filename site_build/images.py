@@ -0,0 +1,360 @@
+"""
+Responsive image variants for the static site.
+
+Every local raster image shown through an <img> is resized to several widths
+(never upscaled) and encoded as AVIF, WebP and a JPEG fallback (PNG when the
+image uses transparency). The <img> is wrapped in a <picture> whose sources
+carry srcset/sizes, so browsers download the smallest file in the best format
+they support instead of the multi-megabyte original. The favicon link is
+replaced by 32px and 192px PNG icons.
+
+Encoded files are cached under <cache>/images/<hash>/, keyed by the source
+bytes and the encoder settings, so a rebuild only re-encodes images that
+changed. Output names carry the same hash and can be cached forever.
+"""
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from site_build.markup import find_tags, local_path, render_start_tag, set_attrs, splice
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - the build reports this and copies images unchanged
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (160, 320, 640, 960, 1280, 1920)
+ICON_SIZES = (32, 192)
+FALLBACK_WIDTH = 960  # src of the <img> for browsers without srcset support
+
+RASTER_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+OUTPUT_DIR = 'images/responsive'
+
+# Encoder settings per output format; part of the cache key, so changing them re-encodes
+FORMATS = {
+    'avif': {'mime': 'image/avif', 'ext': 'avif', 'save': {'format': 'AVIF', 'quality': 50, 'speed': 6}},
+    'webp': {'mime': 'image/webp', 'ext': 'webp', 'save': {'format': 'WEBP', 'quality': 78, 'method': 4}},
+    'jpeg': {'mime': 'image/jpeg', 'ext': 'jpg',
+             'save': {'format': 'JPEG', 'quality': 80, 'progressive': True, 'optimize': True}},
+    'png': {'mime': 'image/png', 'ext': 'png', 'save': {'format': 'PNG', 'optimize': True}},
+}
+
+# Rendered width of each image class (see styles.css), used for the sizes attribute
+SIZES_BY_CLASS = {
+    'hero-carousel-image': '(max-width: 968px) 100vw, 50vw',
+    'hero-bike-image': '(max-width: 968px) 100vw, 50vw',
+    'gsd-carousel-image': '(max-width: 968px) 100vw, 50vw',
+    'bike-image': '(max-width: 768px) 100vw, (max-width: 968px) 50vw, 400px',
+    'storage-image': '(max-width: 768px) 100vw, 50vw',
+    'profile-image': '200px',
+}
+# Images without a sizing class, keyed by src
+SIZES_BY_SRC = {
+    'images/logowhee1.png': '200px',  # .navbar-logo img: 45px high, at most 200px wide
+}
+DEFAULT_SIZES = '100vw'
+
+
+def pillow_available() -> bool:
+    return Image is not None
+
+
+def available_formats() -> List[str]:
+    """Modern formats this Pillow build can encode, best first."""
+    if Image is None:
+        return []
+    return [name for name in ('avif', 'webp') if features.check(name)]
+
+
+def local_image_path(src: Optional[str]) -> Optional[str]:
+    """The site-relative path of a local raster image reference, or None."""
+    path = local_path(src)
+    if not path or not path.lower().endswith(RASTER_EXTENSIONS):
+        return None
+    return path
+
+
+class ImageVariants:
+    """The encoded widths of one source image, per format."""
+
+    __slots__ = ('source', 'width', 'height', 'fallback', 'files')
+
+    def __init__(self, source: str, width: int, height: int, fallback: str,
+                 files: Dict[str, List[Tuple[int, str]]]):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fallback = fallback
+        self.files = files  # format -> [(width, site-relative path)], ascending
+
+    def srcset(self, fmt: str) -> str:
+        return ', '.join(f'{path} {width}w' for width, path in self.files[fmt])
+
+    def closest(self, fmt: str, width: int) -> str:
+        return min(self.files[fmt], key=lambda item: abs(item[0] - width))[1]
+
+    def largest(self, fmt: str) -> str:
+        return self.files[fmt][-1][1]
+
+    def modern_formats(self) -> List[str]:
+        return [fmt for fmt in ('avif', 'webp') if fmt in self.files]
+
+
+def _variant_widths(width: int, widths: Iterable[int]) -> List[int]:
+    """Requested widths below the original, plus the original itself when it is in range."""
+    widths = sorted(widths)
+    chosen = [w for w in widths if w < width]
+    if width <= widths[-1] or not chosen:
+        chosen.append(min(width, widths[-1]))
+    return chosen
+
+
+def _has_alpha(image) -> bool:
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        alpha = image.convert('RGBA').getchannel('A')
+        return alpha.getextrema()[0] < 255
+    return False
+
+
+def _save(image, path: str, fmt: str, icc_profile: Optional[bytes]):
+    options = dict(FORMATS[fmt]['save'])
+    if icc_profile and fmt != 'png':
+        options['icc_profile'] = icc_profile
+    temp_path = f'{path}.tmp'
+    image.save(temp_path, **options)
+    os.replace(temp_path, path)
+
+
+def _output_stem(source: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_-]+', '-', os.path.splitext(os.path.basename(source))[0]).strip('-')
+
+
+def _encode(path: str, entry_dir: str, widths: Tuple[int, ...], formats: List[str]) -> dict:
+    """Encode every width and format of one image into entry_dir and return its manifest."""
+    os.makedirs(entry_dir, exist_ok=True)
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        icc_profile = original.info.get('icc_profile')
+        alpha = _has_alpha(image)
+        image = image.convert('RGBA' if alpha else 'RGB')
+        fallback = 'png' if alpha else 'jpeg'
+        manifest = {'width': image.width, 'height': image.height, 'fallback': fallback, 'files': {}}
+        for width in _variant_widths(image.width, widths):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats + [fallback]:
+                name = f"{width}.{FORMATS[fmt]['ext']}"
+                _save(resized, os.path.join(entry_dir, name), fmt, icc_profile)
+                manifest['files'].setdefault(fmt, []).append([width, name])
+    # The manifest is written last, so an interrupted encode is redone on the next build
+    with open(os.path.join(entry_dir, 'manifest.json.tmp'), 'w') as f:
+        json.dump(manifest, f)
+    os.replace(os.path.join(entry_dir, 'manifest.json.tmp'), os.path.join(entry_dir, 'manifest.json'))
+    return manifest
+
+
+class ImageOptimizer:
+    """
+    Produces and caches responsive variants for the images a build references.
+
+    Args:
+        source_dir: Site root the image paths are relative to
+        out_dir: Build output directory; variants are copied to <out_dir>/images/responsive
+        cache_dir: Directory for encoded variants, reused across builds
+        widths: Target widths in pixels
+        formats: Modern formats to emit (defaults to every one Pillow can encode)
+        jobs: Worker processes encoding images
+    """
+
+    def __init__(self, source_dir: str, out_dir: str, cache_dir: str, widths: Iterable[int] = WIDTHS,
+                 formats: Optional[List[str]] = None, jobs: Optional[int] = None):
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self.cache_dir = os.path.join(cache_dir, 'images')
+        self.widths = tuple(sorted(widths))
+        supported = available_formats()
+        self.formats = [fmt for fmt in (formats if formats is not None else supported) if fmt in supported]
+        self.jobs = jobs or os.cpu_count() or 1
+        self._variants: Dict[str, Optional[ImageVariants]] = {}
+        self._icons: Dict[Tuple[str, int], Optional[str]] = {}
+        self.outputs = set()  # site-relative paths written to out_dir
+        self.encoded = 0
+        self.reused = 0
+
+    def _settings(self) -> str:
+        return json.dumps({'widths': self.widths, 'formats': self.formats,
+                           'encoders': {fmt: FORMATS[fmt]['save'] for fmt in FORMATS}}, sort_keys=True)
+
+    def _digest(self, path: str, extra: str = '') -> str:
+        digest = hashlib.sha256(self._settings().encode() + extra.encode())
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()[:16]
+
+    def _publish(self, cached_path: str, relative_path: str) -> str:
+        """Copy a cached file into the build output unless an identical copy is already there."""
+        target = os.path.join(self.out_dir, relative_path)
+        if not (os.path.exists(target) and os.path.getsize(target) == os.path.getsize(cached_path)):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(cached_path, target)
+        self.outputs.add(relative_path)
+        return relative_path
+
+    def _publish_entry(self, source: str, digest: str, manifest: dict) -> ImageVariants:
+        entry_dir = os.path.join(self.cache_dir, digest)
+        stem = _output_stem(source)
+        files = {}
+        for fmt, entries in manifest['files'].items():
+            files[fmt] = [(width, self._publish(os.path.join(entry_dir, name),
+                                                f'{OUTPUT_DIR}/{stem}-{digest[:8]}-{name.replace(".", "w.", 1)}'))
+                          for width, name in entries]
+        return ImageVariants(source, manifest['width'], manifest['height'], manifest['fallback'], files)
+
+    def prepare(self, sources: Iterable[str]):
+        """Load several images from the cache, encoding the missing ones in parallel processes."""
+        manifests = {}
+        missing = {}
+        for source in dict.fromkeys(sources):
+            if source in self._variants:
+                continue
+            path = os.path.join(self.source_dir, source)
+            if not os.path.isfile(path):
+                logger.warning(f"Image not found: {source}")
+                self._variants[source] = None
+                continue
+            digest = self._digest(path)
+            try:
+                with open(os.path.join(self.cache_dir, digest, 'manifest.json')) as f:
+                    manifests[source] = (digest, json.load(f))
+                self.reused += 1
+            except (OSError, ValueError):
+                missing[source] = (path, digest)
+
+        if missing:
+            # Encoders hold the GIL, so only processes encode images concurrently
+            with concurrent.futures.ProcessPoolExecutor(max_workers=min(self.jobs, len(missing))) as executor:
+                futures = {source: executor.submit(_encode, path, os.path.join(self.cache_dir, digest),
+                                                   self.widths, self.formats)
+                           for source, (path, digest) in missing.items()}
+                for source, future in futures.items():
+                    try:
+                        manifests[source] = (missing[source][1], future.result())
+                    except Exception as e:
+                        logger.error(f"Error encoding {source}: {e}")
+                        self._variants[source] = None
+                        continue
+                    self.encoded += 1
+                    logger.info(f"Encoded {source} ({manifests[source][1]['width']}x{manifests[source][1]['height']})")
+
+        for source, (digest, manifest) in manifests.items():
+            self._variants[source] = self._publish_entry(source, digest, manifest)
+
+    def variants(self, source: str) -> Optional[ImageVariants]:
+        if source not in self._variants:
+            self.prepare([source])
+        return self._variants[source]
+
+    def icon(self, source: str, size: int) -> Optional[str]:
+        """A size x size PNG of the image for <link rel="icon">."""
+        key = (source, size)
+        if key in self._icons:
+            return self._icons[key]
+        path = os.path.join(self.source_dir, source)
+        result = None
+        if os.path.isfile(path):
+            digest = self._digest(path, extra=f'icon{size}')
+            cached_path = os.path.join(self.cache_dir, digest, f'icon-{size}.png')
+            if os.path.exists(cached_path):
+                self.reused += 1
+            else:
+                os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+                with Image.open(path) as original:
+                    image = ImageOps.fit(original.convert('RGBA'), (size, size), Image.LANCZOS)
+                    _save(image, cached_path, 'png', None)
+                self.encoded += 1
+            result = self._publish(cached_path, f'{OUTPUT_DIR}/{_output_stem(source)}-{digest[:8]}-{size}.png')
+        else:
+            logger.warning(f"Icon not found: {source}")
+        self._icons[key] = result
+        return result
+
+
+def image_sizes(tag) -> str:
+    """The sizes attribute for an <img>: the author's own, else by class, else by src."""
+    if tag.get('sizes'):
+        return tag.get('sizes')
+    for name in (tag.get('class') or '').split():
+        if name in SIZES_BY_CLASS:
+            return SIZES_BY_CLASS[name]
+    return SIZES_BY_SRC.get(local_image_path(tag.get('src')), DEFAULT_SIZES)
+
+
+def _picture(tag, variants: ImageVariants) -> str:
+    sizes = image_sizes(tag)
+    sources = [render_start_tag('source', [('type', FORMATS[fmt]['mime']), ('srcset', variants.srcset(fmt)),
+                                           ('sizes', sizes)])
+               for fmt in variants.modern_formats()]
+    fallback = variants.fallback
+    updates = {
+        'src': variants.closest(fallback, FALLBACK_WIDTH),
+        'srcset': variants.srcset(fallback),
+        'sizes': sizes,
+    }
+    if tag.get('width') is None and tag.get('height') is None:
+        # Reserves the image's box before it loads; every image class sets its own CSS size
+        updates['width'], updates['height'] = str(variants.width), str(variants.height)
+    if local_image_path(tag.get('data-full')) == variants.source:
+        updates['data-full'] = variants.largest(fallback)
+    onerror = tag.get('onerror')
+    if onerror:
+        # The placeholder the handler reveals is now the <picture>'s sibling, not the <img>'s
+        updates['onerror'] = onerror.replace('this.', 'this.parentNode.')
+    img = render_start_tag('img', set_attrs(tag.attrs, updates), tag.self_closing)
+    return f"<picture>{''.join(sources)}{img}</picture>"
+
+
+def page_images(html: str) -> List[str]:
+    """Local raster images shown through <img> tags, in page order."""
+    return [path for path in (local_image_path(tag.get('src')) for tag in find_tags(html, 'img')) if path]
+
+
+def rewrite_images(html: str, optimizer: ImageOptimizer) -> str:
+    """
+    Wrap every local raster <img> in a responsive <picture> and resize the favicon.
+
+    Images that already declare a srcset, or sit inside a <picture>, are left as written.
+    """
+    tags = find_tags(html, 'img', 'picture', 'link')
+    optimizer.prepare(page_images(html))
+    replacements = []
+    in_picture = False
+    for tag in tags:
+        if tag.name == 'picture':
+            in_picture = True
+        elif tag.name == 'img':
+            source = local_image_path(tag.get('src'))
+            if in_picture or not source or tag.get('srcset') is not None:
+                in_picture = False
+                continue
+            variants = optimizer.variants(source)
+            if variants:
+                replacements.append((tag.start, tag.end, _picture(tag, variants)))
+        elif tag.name == 'link' and 'icon' in (tag.get('rel') or '').lower().split():
+            source = local_image_path(tag.get('href'))
+            icons = [(size, optimizer.icon(source, size)) for size in ICON_SIZES] if source else []
+            if icons and all(path for _, path in icons):
+                links = [render_start_tag('link', set_attrs(tag.attrs, {'type': 'image/png', 'sizes': f'{size}x{size}',
+                                                                        'href': path}))
+                         for size, path in icons]
+                indent = html[html.rfind('\n', 0, tag.start) + 1:tag.start]
+                separator = '\n' + indent if not indent.strip() else ' '
+                replacements.append((tag.start, tag.end, separator.join(links)))
+    return splice(html, replacements)
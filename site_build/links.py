@@ -0,0 +1,295 @@
+"""
+The site's link graph: sitemap, navigation hints and link checks.
+
+Every page was fetched cold when a visitor clicked through from the home page,
+although most of them follow the same few calls to action. The build now
+crawls the <a href> graph of the pages and, for each page:
+
+- prefetches the pages a visitor is most likely to open next
+  (<link rel="prefetch">), ranked by where the links to them sit: calls to
+  action and hero links outweigh body links, which outweigh the navigation
+  and footer that link everywhere;
+- preconnects to third-party origins the page loads from (the gtag script),
+  and only resolves (dns-prefetch) origins its scripts use later, such as the
+  Apps Script endpoint a form posts to, since an unused preconnect is dropped
+  after a few seconds.
+
+It also writes sitemap.xml for the pages reachable from index.html, and
+reports broken internal links (missing files or #fragments), pages nothing
+links to and pages over MAX_PAGE_BYTES of HTML.
+
+    python -m site_build --check-links   # check the pages as written
+"""
+import os
+import re
+import subprocess
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+from site_build.critical import above_fold, parse_document
+from site_build.markup import find_tags, insert_line, local_path, render_start_tag
+
+SITEMAP_FILE = 'sitemap.xml'
+HOME_PAGE = 'index.html'
+PREFETCH_LIMIT = 2  # Pages prefetched from each page
+MAX_PAGE_BYTES = 100 * 1024  # HTML over this is reported as oversized
+
+# Weight of a link by where it sits; a page's most likely next pages have the largest totals
+CTA_WEIGHT = 3  # Call-to-action buttons and links on the first screen
+CONTENT_WEIGHT = 2
+NAVIGATION_WEIGHT = 1  # <nav>, <header> and <footer>, which link to every page
+CTA_CLASSES = ('cta-button',)
+NAVIGATION_TAGS = ('nav', 'header', 'footer')
+
+# Attributes whose local references must resolve to a file
+REFERENCE_ATTRIBUTES = {'a': 'href', 'link': 'href', 'script': 'src', 'img': 'src', 'source': 'srcset',
+                        'form': 'action', 'iframe': 'src'}
+
+_URL_IN_SCRIPT = re.compile(r'''['"`](https://[\w.-]+)[/'"`]''')
+
+
+def _origin(url: str) -> Optional[str]:
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        return None
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+def _link_weight(element, first_screen: Set[int]) -> int:
+    if any(name in element.classes for name in CTA_CLASSES):
+        return CTA_WEIGHT
+    ancestor = element.parent
+    while ancestor is not None:
+        if ancestor.tag in NAVIGATION_TAGS:
+            return NAVIGATION_WEIGHT
+        ancestor = ancestor.parent
+    return CTA_WEIGHT if id(element) in first_screen else CONTENT_WEIGHT
+
+
+class LinkGraph:
+    """
+    Links between a site's pages, with what each page references.
+
+    Args:
+        pages: Page path -> HTML
+    """
+
+    def __init__(self, pages: Dict[str, str]):
+        self.pages = pages
+        self.links: Dict[str, Dict[str, int]] = {}  # page -> linked page -> total link weight
+        self.ids: Dict[str, Set[str]] = {}
+        self.references: Dict[str, List[Tuple[str, str]]] = {}  # page -> (tag, local reference)
+        self.load_origins: Dict[str, List[str]] = {}  # third-party origins fetched while loading
+        self.script_origins: Dict[str, List[str]] = {}  # third-party origins named in inline scripts
+        for page, html in pages.items():
+            self._scan(page, html)
+
+    def _scan(self, page: str, html: str):
+        root, scripts = parse_document(html)
+        first_screen = {id(element) for element in above_fold(root)}
+        links: Dict[str, int] = {}
+        references = []
+        load_origins = []
+        for element in root.iter():
+            attribute = REFERENCE_ATTRIBUTES.get(element.tag)
+            value = element.attrs.get(attribute) if attribute else None
+            if not value:
+                continue
+            if attribute == 'srcset':
+                value = value.split(',')[0].split()[0] if value.split() else ''
+            if element.tag == 'a' and value.startswith('#'):
+                references.append(('a', f'{page}{value}'))
+                continue
+            path = local_path(value)
+            if path is None:
+                origin = _origin(value)
+                if origin and element.tag in ('script', 'link', 'img', 'source', 'iframe'):
+                    if element.tag != 'link' or 'stylesheet' in element.attrs.get('rel', '').split():
+                        load_origins.append(origin)
+                continue
+            fragment = value.split('#', 1)[1] if '#' in value else ''
+            references.append((element.tag, f'{path}#{fragment}' if fragment else path))
+            if element.tag == 'a' and path.endswith('.html') and path != page:
+                links[path] = links.get(path, 0) + _link_weight(element, first_screen)
+        self.links[page] = links
+        self.ids[page] = {element.id for element in root.iter() if element.id}
+        self.references[page] = references
+        self.load_origins[page] = list(dict.fromkeys(load_origins))
+        script_origins = [match.group(1) for script in scripts for match in _URL_IN_SCRIPT.finditer(script)]
+        self.script_origins[page] = [origin for origin in dict.fromkeys(script_origins)
+                                     if origin not in self.load_origins[page]]
+
+    def in_degree(self) -> Dict[str, int]:
+        """Number of pages linking to each page."""
+        counts = dict.fromkeys(self.pages, 0)
+        for links in self.links.values():
+            for target in links:
+                counts[target] = counts.get(target, 0) + 1
+        return counts
+
+    def reachable(self, start: str = HOME_PAGE) -> Dict[str, int]:
+        """Click depth of every page reachable from start, breadth first."""
+        if start not in self.pages:
+            return {}
+        depths = {start: 0}
+        queue = deque([start])
+        while queue:
+            page = queue.popleft()
+            for target in self.links.get(page, {}):
+                if target in self.pages and target not in depths:
+                    depths[target] = depths[page] + 1
+                    queue.append(target)
+        return depths
+
+    def orphans(self, start: str = HOME_PAGE) -> List[str]:
+        """Pages that cannot be reached by following links from start."""
+        reachable = self.reachable(start)
+        return [page for page in self.pages if page not in reachable]
+
+    def likely_next(self, page: str, limit: int = PREFETCH_LIMIT) -> List[str]:
+        """The pages a visitor of page most likely opens next: heaviest links first, then the most linked-to."""
+        in_degree = self.in_degree()
+        candidates = [target for target in self.links.get(page, {}) if target in self.pages]
+        candidates.sort(key=lambda target: (-self.links[page][target], -in_degree.get(target, 0), target))
+        return candidates[:limit]
+
+    def broken_links(self, source_dir: str) -> List[Tuple[str, str, str]]:
+        """(page, reference, problem) for every local reference to a missing file or #fragment."""
+        broken = []
+        for page, references in self.references.items():
+            for tag, reference in dict.fromkeys(references):
+                path, _, fragment = reference.partition('#')
+                if path not in self.pages and not os.path.isfile(os.path.join(source_dir, path)):
+                    broken.append((page, reference, 'missing file'))
+                elif fragment and path in self.ids and fragment not in self.ids[path]:
+                    broken.append((page, reference, f'no element with id "{fragment}"'))
+        return broken
+
+
+def oversized_pages(pages: Dict[str, str], limit: int = MAX_PAGE_BYTES) -> Dict[str, int]:
+    """HTML size of the pages larger than limit."""
+    sizes = {page: len(html.encode('utf-8')) for page, html in pages.items()}
+    return {page: size for page, size in sizes.items() if size > limit}
+
+
+def _hint_position(html: str) -> int:
+    """Offset of the first element in <head> that makes a request, else of </head> (which must exist)."""
+    head_end = re.search(r'</head\s*>', html, re.I)
+    for tag in find_tags(html[:head_end.start()], 'script', 'link'):
+        if tag.name == 'script' and tag.get('src'):
+            return tag.start
+        if tag.name == 'link' and {'stylesheet', 'preload'} & set((tag.get('rel') or '').lower().split()):
+            return tag.start
+    return head_end.start()
+
+
+def add_link_hints(html: str, prefetch: List[str], preconnect: List[str], dns_prefetch: List[str]) -> str:
+    """
+    Insert preconnect and dns-prefetch links ahead of the page's first request, and prefetch links
+    at the end of <head> (they are fetched at idle priority wherever they appear).
+    """
+    existing = {(tuple((tag.get('rel') or '').lower().split()), tag.get('href')) for tag in find_tags(html, 'link')}
+
+    def hints(rel: str, targets: List[str]) -> List[str]:
+        return [render_start_tag('link', [('rel', rel), ('href', href)])
+                for href in targets if ((rel,), href) not in existing]
+
+    head_end = re.search(r'</head\s*>', html, re.I)
+    if not head_end:
+        return html
+    for hint in reversed(hints('prefetch', prefetch)):
+        html = insert_line(html, head_end.start(), hint)
+    position = _hint_position(html)
+    for hint in reversed(hints('preconnect', preconnect) + hints('dns-prefetch', dns_prefetch)):
+        html = insert_line(html, position, hint)
+    return html
+
+
+def page_hints(graph: LinkGraph, page: str, limit: int = PREFETCH_LIMIT) -> Dict[str, List[str]]:
+    """The hints add_link_hints gets for a page."""
+    return {'prefetch': graph.likely_next(page, limit), 'preconnect': graph.load_origins.get(page, []),
+            'dns_prefetch': graph.script_origins.get(page, [])}
+
+
+def site_url(source_dir: str) -> Optional[str]:
+    """https://<domain>/ from the CNAME file GitHub Pages serves the site under."""
+    try:
+        with open(os.path.join(source_dir, 'CNAME')) as f:
+            domain = f.read().strip()
+    except OSError:
+        return None
+    return f'https://{domain}/' if domain else None
+
+
+def last_modified(source_dir: str, page: str) -> str:
+    """Date of the page's last commit (checkouts reset mtimes), else of the file."""
+    try:
+        result = subprocess.run(['git', 'log', '-1', '--format=%cs', '--', page], cwd=source_dir,
+                                capture_output=True, text=True, timeout=10)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        pass
+    mtime = os.path.getmtime(os.path.join(source_dir, page))
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime('%Y-%m-%d')
+
+
+def sitemap_xml(graph: LinkGraph, base_url: str, lastmod: Optional[Dict[str, str]] = None) -> str:
+    """A sitemap of the pages reachable from the home page, shallowest first; priority falls with click depth."""
+    depths = graph.reachable()
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page, depth in sorted(depths.items(), key=lambda item: (item[1], item[0])):
+        if re.search(r'<meta[^>]+name=["\']robots["\'][^>]+noindex', graph.pages[page], re.I):
+            continue
+        location = base_url if page == HOME_PAGE else base_url + page
+        lines.append('  <url>')
+        lines.append(f'    <loc>{escape(location)}</loc>')
+        if lastmod and page in lastmod:
+            lines.append(f'    <lastmod>{lastmod[page]}</lastmod>')
+        lines.append(f'    <priority>{max(0.1, 1.0 - 0.2 * depth):.1f}</priority>')
+        lines.append('  </url>')
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def check_links(source_dir: str, max_page_bytes: int = MAX_PAGE_BYTES, show_sitemap: bool = False) -> int:
+    """
+    Print the link graph, navigation hints and link problems of the pages as written.
+
+    Returns:
+        Number of broken links and oversized pages
+    """
+    from site_build.build import site_pages
+
+    pages = {}
+    for page in site_pages(source_dir):
+        with open(os.path.join(source_dir, page), encoding='utf-8') as f:
+            pages[page] = f.read()
+    graph = LinkGraph(pages)
+    depths = graph.reachable()
+    in_degree = graph.in_degree()
+    print(f"{'page':<24} {'depth':>5} {'linked from':>11}  prefetch / preconnect / dns-prefetch")
+    for page in pages:
+        hints = page_hints(graph, page)
+        depth = depths.get(page)
+        print(f"{page:<24} {'-' if depth is None else depth:>5} {in_degree.get(page, 0):>11}  "
+              f"{', '.join(hints['prefetch']) or '-'} / {', '.join(hints['preconnect']) or '-'} / "
+              f"{', '.join(hints['dns_prefetch']) or '-'}")
+    if show_sitemap:
+        print()
+        print(sitemap_xml(graph, site_url(source_dir) or 'https://example.com/'), end='')
+
+    problems = 0
+    for page, reference, problem in graph.broken_links(source_dir):
+        print(f"broken link: {page} -> {reference} ({problem})")
+        problems += 1
+    for page in graph.orphans():
+        print(f"orphan page: {page} (not reachable from {HOME_PAGE})")
+    for page, size in oversized_pages(pages, max_page_bytes).items():
+        print(f"oversized page: {page} ({size / 1024:.1f} KB of HTML)")
+        problems += 1
+    return problems
@@ -0,0 +1,122 @@
+"""
+Loading hints for page images.
+
+Browsers fetch every <img> with the page unless told otherwise, so the models
+grid and the hidden carousel slides competed with the hero image for
+bandwidth. The build now marks them up by position (the fold is the one
+site_build.critical inlines CSS for):
+
+- images below the fold get loading="lazy" and decoding="async";
+- the first image of the hero, the page's largest paint, gets
+  fetchpriority="high" and a <link rel="preload"> in the head so it starts
+  downloading before the stylesheet and scripts;
+- carousel slides other than the active one keep their sources in
+  data-src/data-srcset; the carousel script moves them back shortly before a
+  slide rotates in, so the first screen downloads one hero image instead of
+  three.
+
+Attributes the author already set are left alone.
+"""
+import re
+from typing import List, Optional, Set, Tuple
+
+from site_build.critical import above_fold, parse_document, stylesheet_links
+from site_build.markup import find_tags, insert_line, render_start_tag, set_attrs, splice
+
+# Slides whose images the page script loads on demand (see loadSlide() in index.html)
+DEFERRED_SLIDE_CLASSES = ('hero-carousel-slide',)
+ACTIVE_CLASS = 'active'
+
+
+def _image_positions(html: str) -> Tuple[Set[int], Optional[int]]:
+    """Document-order indexes of the <img> tags above the fold, and of the hero's first image."""
+    root, _ = parse_document(html)
+    images = [element for element in root.iter() if element.tag == 'img']
+    index = {id(element): position for position, element in enumerate(images)}
+    fold = above_fold(root)
+    hero_image = None
+    hero = next((element for element in fold if 'hero' in element.classes), None)
+    if hero is not None:
+        first = next((element for element in hero.iter() if element.tag == 'img' and element.attrs.get('src')), None)
+        hero_image = index[id(first)] if first is not None else None
+    return {index[id(element)] for element in fold if element.tag == 'img'}, hero_image
+
+
+def _deferred_attrs(tag) -> dict:
+    updates = {}
+    for name in ('src', 'srcset'):
+        if tag.get(name) is not None:
+            updates[name] = None
+            updates[f'data-{name}'] = tag.get(name)
+    return updates
+
+
+def _preload_link(img, sources: List) -> str:
+    """A high-priority preload matching what the browser picks for img (its best <picture> source first)."""
+    if sources:
+        source = sources[0]
+        attrs = [('rel', 'preload'), ('as', 'image'), ('type', source.get('type')),
+                 ('imagesrcset', source.get('srcset')), ('imagesizes', source.get('sizes'))]
+    else:
+        attrs = [('rel', 'preload'), ('as', 'image'), ('href', img.get('src')),
+                 ('imagesrcset', img.get('srcset')), ('imagesizes', img.get('sizes'))]
+    attrs.append(('fetchpriority', 'high'))
+    return render_start_tag('link', [(key, value) for key, value in attrs if value])
+
+
+def _insert_in_head(html: str, markup: str) -> str:
+    """Insert markup before the first stylesheet link, else before </head>, on its own line."""
+    links = stylesheet_links(html)
+    if links:
+        position = links[0].start
+    else:
+        match = re.search(r'</head\s*>', html, re.I)
+        if not match:
+            return html
+        position = match.start()
+    return insert_line(html, position, markup)
+
+
+def add_loading_hints(html: str) -> str:
+    """Add lazy loading, fetch priorities, a hero image preload and deferred carousel slides to a page."""
+    fold, hero_image = _image_positions(html)
+    replacements = []
+    preload = None
+    sources = []
+    deferring = False
+    image_index = -1
+    for tag in find_tags(html, 'div', 'picture', 'source', 'img'):
+        if tag.name == 'div':
+            # Slides hold only their image, so any other <div> ends the deferred one
+            deferring = (any(tag.has_class(name) for name in DEFERRED_SLIDE_CLASSES)
+                         and not tag.has_class(ACTIVE_CLASS))
+        elif tag.name == 'picture':
+            sources = []
+        elif tag.name == 'source':
+            sources.append(tag)
+            if deferring and tag.get('srcset') is not None:
+                replacements.append((tag.start, tag.end,
+                                     render_start_tag('source', set_attrs(tag.attrs, _deferred_attrs(tag)),
+                                                      tag.self_closing)))
+        else:
+            image_index += 1
+            updates = {}
+            if deferring and image_index != hero_image:
+                updates.update(_deferred_attrs(tag))
+            elif image_index == hero_image:
+                if tag.get('fetchpriority') is None:
+                    updates['fetchpriority'] = 'high'
+                preload = _preload_link(tag, sources)
+            elif image_index not in fold and tag.get('src') and tag.get('loading') is None:
+                # An empty src is filled in by a script (the lightbox), which expects it to load at once
+                updates['loading'] = 'lazy'
+                if tag.get('decoding') is None:
+                    updates['decoding'] = 'async'
+            if updates:
+                replacements.append((tag.start, tag.end,
+                                     render_start_tag('img', set_attrs(tag.attrs, updates), tag.self_closing)))
+            sources = []
+    html = splice(html, replacements)
+    if preload:
+        html = _insert_in_head(html, preload)
+    return html
@@ -0,0 +1,134 @@
+"""
+Minimal HTML tag scanning and splicing for build-time rewrites.
+
+Pages are edited as text so everything the build does not touch (formatting,
+comments, inline scripts) is preserved byte for byte. html.parser finds the
+start tags and their offsets; rewrites replace those spans.
+"""
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+_EXTERNAL = re.compile(r'^([a-z][a-z0-9+.-]*:|//|#)', re.IGNORECASE)
+
+
+def local_path(reference: Optional[str]) -> Optional[str]:
+    """The site-relative file path of a local reference (query and fragment dropped), or None."""
+    if not reference or _EXTERNAL.match(reference.strip()):
+        return None
+    path = reference.strip().split('#', 1)[0].split('?', 1)[0].lstrip('/')
+    return path or None
+
+
+class Tag:
+    """A start tag found in a page, with its attributes and [start, end) offsets."""
+
+    __slots__ = ('name', 'attrs', 'start', 'end', 'self_closing')
+
+    def __init__(self, name: str, attrs: List[Tuple[str, Optional[str]]], start: int, end: int,
+                 self_closing: bool):
+        self.name = name
+        self.attrs = attrs
+        self.start = start
+        self.end = end
+        self.self_closing = self_closing
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        for key, value in self.attrs:
+            if key == name:
+                return value if value is not None else ''
+        return default
+
+    def has_class(self, name: str) -> bool:
+        return name in (self.get('class') or '').split()
+
+    def __repr__(self):
+        return f'<Tag {self.name} {dict(self.attrs)}>'
+
+
+class _TagScanner(HTMLParser):
+    def __init__(self, source: str, names: Optional[Iterable[str]]):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.names = set(names) if names else None
+        self.tags: List[Tag] = []
+        self._line_starts = [0]
+        for index, char in enumerate(source):
+            if char == '\n':
+                self._line_starts.append(index + 1)
+
+    def _record(self, tag: str, attrs, self_closing: bool):
+        if self.names is not None and tag not in self.names:
+            return
+        line, column = self.getpos()
+        start = self._line_starts[line - 1] + column
+        text = self.get_starttag_text() or ''
+        self.tags.append(Tag(tag, attrs, start, start + len(text), self_closing))
+
+    def handle_starttag(self, tag, attrs):
+        self._record(tag, attrs, False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._record(tag, attrs, True)
+
+
+def find_tags(source: str, *names: str) -> List[Tag]:
+    """Start tags in document order, optionally only those named (script/style contents are skipped)."""
+    scanner = _TagScanner(source, names or None)
+    scanner.feed(source)
+    scanner.close()
+    return scanner.tags
+
+
+def attr_value(value: str) -> str:
+    """Escape an attribute value for double quotes, leaving single quotes readable."""
+    return escape(value, quote=False).replace('"', '&quot;')
+
+
+def render_start_tag(name: str, attrs: Iterable[Tuple[str, Optional[str]]], self_closing: bool = False) -> str:
+    parts = [name]
+    for key, value in attrs:
+        parts.append(key if value is None else f'{key}="{attr_value(value)}"')
+    return f"<{' '.join(parts)}{' /' if self_closing else ''}>"
+
+
+def set_attrs(attrs: List[Tuple[str, Optional[str]]], updates: Dict[str, Optional[str]]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Return attrs with updates applied in place (new keys appended, None values removed).
+    """
+    result = []
+    seen = set()
+    for key, value in attrs:
+        if key in updates:
+            seen.add(key)
+            if updates[key] is not None:
+                result.append((key, updates[key]))
+        else:
+            result.append((key, value))
+    for key, value in updates.items():
+        if key not in seen and value is not None:
+            result.append((key, value))
+    return result
+
+
+def splice(source: str, replacements: Iterable[Tuple[int, int, str]]) -> str:
+    """Replace non-overlapping [start, end) spans of source."""
+    parts = []
+    position = 0
+    for start, end, text in sorted(replacements, key=lambda item: item[0]):
+        parts.append(source[position:start])
+        parts.append(text)
+        position = end
+    parts.append(source[position:])
+    return ''.join(parts)
+
+
+def insert_line(source: str, position: int, text: str) -> str:
+    """Insert text at position, on its own line with that line's indentation when position starts a line."""
+    line_start = source.rfind('\n', 0, position) + 1
+    indent = source[line_start:position]
+    if indent.strip():
+        return splice(source, [(position, position, text)])
+    return splice(source, [(line_start, line_start, f'{indent}{text}\n')])
@@ -0,0 +1,299 @@
+"""
+Conservative CSS, JavaScript and HTML minifiers.
+
+No third-party tools: each minifier tokenizes just enough to leave strings,
+regular expressions, template literals and <pre>/<textarea> contents alone,
+then drops comments and whitespace that cannot change meaning. JavaScript keeps
+its line breaks wherever automatic semicolon insertion could depend on them, so
+the output parses exactly like the input.
+"""
+import json
+import re
+
+# --- CSS ---------------------------------------------------------------------
+
+_CSS_TOKEN = re.compile(r'''("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')|(/\*.*?\*/)|(\s+)|([^"'/\s]+|/)''', re.S)
+_CSS_TIGHT_BOTH = set('{};,>')
+_CSS_TIGHT_AFTER = set(':')
+
+
+def minify_css(css: str) -> str:
+    """Strip comments (except /*! ... */ notices) and insignificant whitespace from a stylesheet."""
+    out = []
+    pending_space = False
+    for match in _CSS_TOKEN.finditer(css):
+        string, comment, space, other = match.groups()
+        if space is not None:
+            pending_space = True
+            continue
+        if comment is not None:
+            if comment.startswith('/*!'):
+                out.append(comment)
+            else:
+                # A comment separates tokens like whitespace does
+                pending_space = True
+            continue
+        token = string if string is not None else other.replace(';}', '}')
+        if pending_space and out:
+            previous = out[-1][-1]
+            if previous not in _CSS_TIGHT_BOTH and previous not in _CSS_TIGHT_AFTER \
+                    and token[0] not in _CSS_TIGHT_BOTH:
+                out.append(' ')
+        pending_space = False
+        if token[0] == '}' and out and out[-1][-1] == ';' and out[-1][0] not in '"\'':
+            out[-1] = out[-1][:-1]
+        out.append(token)
+    return ''.join(out)
+
+
+# --- JavaScript --------------------------------------------------------------
+
+_JS_JOIN_AFTER = set('{;,([=:?&|')  # a line ending in one of these continues on the next line
+_JS_JOIN_BEFORE = set('})],?:')
+_REGEX_KEYWORDS = {'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                   'instanceof', 'yield', 'await'}
+_UNSAFE_PAIRS = {'</', '<!', '->', '--', '++', '+-', '-+', '//', '/*', '*/'}
+_IDENTIFIER = re.compile(r'[\w$\\\u0080-￿]+')
+
+
+def _scan_string(js: str, start: int) -> int:
+    quote = js[start]
+    i = start + 1
+    while i < len(js):
+        char = js[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == quote or char == '\n':
+            return i + 1
+        i += 1
+    return i
+
+
+def _scan_regex(js: str, start: int) -> int:
+    """End of the regex literal at start, or -1 if it is not one (no closing / on the line)."""
+    i = start + 1
+    in_class = False
+    while i < len(js):
+        char = js[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '\n':
+            return -1
+        if in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '/':
+            i += 1
+            while i < len(js) and (js[i].isalnum() or js[i] == '_'):
+                i += 1
+            return i
+        i += 1
+    return -1
+
+
+def _scan_template(js: str, start: int) -> int:
+    """End of the template literal at start; ${...} substitutions are scanned as code."""
+    i = start + 1
+    while i < len(js):
+        char = js[i]
+        if char == '\\':
+            i += 2
+            continue
+        if char == '`':
+            return i + 1
+        if js.startswith('${', i):
+            i = _scan_code_until_brace(js, i + 2)
+            continue
+        i += 1
+    return i
+
+
+def _scan_code_until_brace(js: str, i: int) -> int:
+    depth = 0
+    while i < len(js):
+        char = js[i]
+        if char in '"\'':
+            i = _scan_string(js, i)
+            continue
+        if char == '`':
+            i = _scan_template(js, i)
+            continue
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    return i
+
+
+def _js_tokens(js: str):
+    """Yield ('space', has_newline) and ('code', text) tokens; comments become whitespace."""
+    i = 0
+    last = ''  # last significant token, for the regex-or-division decision
+    while i < len(js):
+        char = js[i]
+        if char.isspace():
+            end = i
+            while end < len(js) and js[end].isspace():
+                end += 1
+            yield 'space', '\n' in js[i:end]
+            i = end
+        elif js.startswith('//', i):
+            end = js.find('\n', i)
+            end = len(js) if end == -1 else end
+            yield 'space', False
+            i = end
+        elif js.startswith('/*', i):
+            end = js.find('*/', i + 2)
+            end = len(js) if end == -1 else end + 2
+            yield 'space', '\n' in js[i:end]
+            i = end
+        elif char in '"\'':
+            end = _scan_string(js, i)
+            yield 'code', js[i:end]
+            last, i = js[i:end], end
+        elif char == '`':
+            end = _scan_template(js, i)
+            yield 'code', js[i:end]
+            last, i = js[i:end], end
+        elif char == '/':
+            regex_allowed = (not last or last in _REGEX_KEYWORDS
+                             or (not _IDENTIFIER.fullmatch(last) and last[-1] not in ')]"\'`'))
+            end = _scan_regex(js, i) if regex_allowed else -1
+            if end == -1:
+                yield 'code', char
+                last, i = char, i + 1
+            else:
+                yield 'code', js[i:end]
+                last, i = js[i:end], end
+        else:
+            match = _IDENTIFIER.match(js, i)
+            if match:
+                # Numbers like 1.5e-3 are scanned as identifier pieces plus punctuation, which is fine
+                yield 'code', match.group()
+                last, i = match.group(), match.end()
+            else:
+                yield 'code', char
+                last, i = char, i + 1
+
+
+def minify_js(js: str) -> str:
+    """Strip comments and whitespace from a script, keeping the line breaks ASI could rely on."""
+    out = []
+    pending = None  # None, ' ' or '\n'
+    for kind, value in _js_tokens(js):
+        if kind == 'space':
+            if value:
+                pending = '\n'
+            elif pending is None:
+                pending = ' '
+            continue
+        if pending and out:
+            previous, following = out[-1][-1], value[0]
+            if pending == '\n':
+                joinable = previous in _JS_JOIN_AFTER or following in _JS_JOIN_BEFORE or (
+                    following == '.' and not value[1:2].isdigit() and not out[-1][0].isdigit())
+                if not joinable:
+                    out.append('\n')
+                elif previous + following in _UNSAFE_PAIRS or (
+                        _IDENTIFIER.match(previous) and _IDENTIFIER.match(following)):
+                    out.append(' ')
+            elif (previous + following in _UNSAFE_PAIRS
+                  or (_IDENTIFIER.match(previous) and _IDENTIFIER.match(following))
+                  or (following == '.' and out[-1][0].isdigit())):
+                out.append(' ')
+        pending = None
+        out.append(value)
+    return ''.join(out)
+
+
+# --- HTML --------------------------------------------------------------------
+
+_HTML_TOKEN = re.compile(
+    r'''(<!--.*?-->)'''
+    r'''|(<(script|style|pre|textarea)\b(?:[^>"']|"[^"]*"|'[^']*')*>)(.*?)(</\3\s*>)'''
+    r'''|(<[a-zA-Z/!?](?:[^>"']|"[^"]*"|'[^']*')*>)'''
+    r'''|([^<]+|<)''',
+    re.S | re.I)
+_TAG_NAME = re.compile(r'</?([a-zA-Z][a-zA-Z0-9-]*)')
+_SCRIPT_TYPE = re.compile(r'''\btype\s*=\s*["']?([^"'\s>]+)''', re.I)
+
+# Whitespace between two of these tags never renders
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'meta', 'link', 'title', 'script', 'style', 'noscript', 'base',
+    'div', 'section', 'article', 'aside', 'nav', 'header', 'footer', 'main', 'form', 'fieldset',
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'table', 'thead',
+    'tbody', 'tfoot', 'tr', 'td', 'th', 'hr', 'br', 'figure', 'figcaption', 'picture', 'source',
+    'select', 'option', 'blockquote', '!doctype',
+}
+
+
+def _tag_name(tag: str) -> str:
+    if tag.lower().startswith('<!doctype'):
+        return '!doctype'
+    match = _TAG_NAME.match(tag)
+    return match.group(1).lower() if match else ''
+
+
+def minify_html(html: str) -> str:
+    """
+    Drop comments and collapse whitespace in a page, minifying inline <script> and <style> blocks.
+
+    Tags are kept byte for byte; whitespace between block-level tags is removed,
+    other whitespace runs become a single space.
+    """
+    out = []
+    previous_tag = '!doctype'
+    pending_space = None
+    for match in _HTML_TOKEN.finditer(html):
+        comment, open_tag, raw_name, raw_body, close_tag, tag, text = match.groups()
+        if comment is not None:
+            if comment.startswith('<!--[if'):
+                out.append(comment)
+            continue
+        if text is not None:
+            if text.strip():
+                collapsed = re.sub(r'\s+', ' ', text)
+                if previous_tag in BLOCK_TAGS:
+                    collapsed = collapsed.lstrip()
+                if pending_space:
+                    collapsed = ' ' + collapsed.lstrip() if collapsed[0] != ' ' else collapsed
+                    pending_space = None
+                out.append(collapsed)
+                previous_tag = ''
+            else:
+                pending_space = ' '
+            continue
+
+        name = raw_name.lower() if raw_name else _tag_name(tag)
+        if pending_space and not (previous_tag in BLOCK_TAGS and name in BLOCK_TAGS):
+            out.append(' ')
+        pending_space = None
+
+        if raw_name:
+            body = raw_body
+            lowered = raw_name.lower()
+            if lowered == 'style':
+                body = minify_css(body)
+            elif lowered == 'script':
+                script_type = _SCRIPT_TYPE.search(open_tag)
+                script_type = script_type.group(1).lower() if script_type else 'text/javascript'
+                if script_type in ('text/javascript', 'application/javascript', 'module'):
+                    body = minify_js(body).strip()
+                elif script_type.endswith('json'):
+                    try:
+                        body = json.dumps(json.loads(body), separators=(',', ':'), ensure_ascii=False)
+                        body = body.replace('</', '<\\/')
+                    except ValueError:
+                        pass
+            out.append(open_tag + body + close_tag)
+            previous_tag = lowered
+        else:
+            out.append(tag)
+            previous_tag = name
+    return ''.join(out).strip() + '\n'
@@ -0,0 +1,133 @@
+"""
+Build-time rendering of the pricing card.
+
+Pages show the subscription card by calling renderPricingCard() from
+pricing-card.js, which used to build it with innerHTML after the script
+downloaded, so the price popped in late and shifted the layout. The build now
+renders the same markup from pricing.json straight into each container and
+drops the script from pages where every card was rendered. Served unbuilt,
+the pages still render the card client-side from the same data file.
+"""
+import json
+import os
+import re
+from html import escape
+from typing import List, Optional, Tuple
+
+from site_build.markup import find_tags, local_path, splice
+
+DATA_FILE = 'pricing.json'
+SCRIPT_FILE = 'pricing-card.js'
+
+_RENDER_CALL = re.compile(
+    r'''^\s*renderPricingCard\(\s*(['"])([\w-]+)\1\s*(?:,\s*\{(?P<options>[^{}]*)\}\s*)?\)\s*;?\s*$''')
+_SCRIPT_BLOCK = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.S | re.I)
+
+
+def load_pricing(source_dir: str) -> Optional[dict]:
+    path = os.path.join(source_dir, DATA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _parse_options(text: Optional[str]) -> dict:
+    """The object literal passed to renderPricingCard, e.g. { showCta: true }."""
+    options = {}
+    for key, value in re.findall(r'''(\w+)\s*:\s*(true|false|\d+|'[^']*'|"[^"]*")''', text or ''):
+        if value in ('true', 'false'):
+            options[key] = value == 'true'
+        elif value.isdigit():
+            options[key] = int(value)
+        else:
+            options[key] = value[1:-1]
+    return options
+
+
+def render_pricing_card(data: dict, show_cta: bool = False, indent: str = '') -> str:
+    """The card markup renderPricingCard() produces (keep in sync with pricing-card.js)."""
+    features = []
+    for feature in data['features']:
+        text = escape(feature['text'])
+        if feature.get('href'):
+            text = (f'<a href="{escape(feature["href"])}" style="color: var(--primary-color); '
+                    f'text-decoration: none; font-weight: 600;">✓ {text}</a>')
+        else:
+            text = f'✓ {text}'
+        features.append(f'{indent}        <li>{text}</li>')
+    cta = ''
+    if show_cta:
+        cta = f'\n{indent}    <a href="get-started.html" class="cta-button primary full-width">Get Started Today</a>'
+    return (
+        f'<div class="pricing-card">\n'
+        f'{indent}    <div class="pricing-header">\n'
+        f'{indent}        <h3>{escape(data["title"])}</h3>\n'
+        f'{indent}        <div style="margin-bottom: 0.5rem; color: var(--text-light); font-size: 0.875rem;">'
+        f'(starts at)</div>\n'
+        f'{indent}        <div class="price-display">\n'
+        f'{indent}            <span class="currency">$</span>\n'
+        f'{indent}            <span class="amount">{escape(str(data["price"]))}</span>\n'
+        f'{indent}            <span class="period">/{escape(data["period"])}</span>\n'
+        f'{indent}        </div>\n'
+        f'{indent}    </div>\n'
+        f'{indent}    <ul class="pricing-features">\n'
+        + '\n'.join(features) +
+        f'\n{indent}    </ul>{cta}\n'
+        f'{indent}</div>'
+    )
+
+
+def _whole_lines(html: str, start: int, end: int) -> Tuple[int, int]:
+    """Widen start:end to its full line(s) when nothing else is on them, so removal leaves no blank line."""
+    line_start = html.rfind('\n', 0, start) + 1
+    line_end = html.find('\n', end)
+    line_end = len(html) if line_end == -1 else line_end + 1
+    if html[line_start:start].strip() or html[end:line_end].strip():
+        return start, end
+    return line_start, line_end
+
+
+def _render_calls(html: str) -> List[Tuple[int, int, str, dict]]:
+    """(start, end, container id, options) of each inline <script> that only calls renderPricingCard."""
+    calls = []
+    for match in _SCRIPT_BLOCK.finditer(html):
+        call = _RENDER_CALL.match(match.group(1))
+        if call:
+            calls.append((match.start(), match.end(), call.group(2), _parse_options(call.group('options'))))
+    return calls
+
+
+def prerender_pricing(html: str, data: dict) -> Tuple[str, int]:
+    """
+    Render the pricing card into every container a page fills with renderPricingCard().
+
+    The call and the pricing-card.js include are removed once every card on the
+    page is rendered; a container that is missing or not empty keeps its script.
+
+    Returns:
+        The page, and the number of cards rendered
+    """
+    calls = _render_calls(html)
+    if not calls:
+        return html, 0
+    containers = {tag.get('id'): tag for tag in find_tags(html, 'div') if tag.get('id')}
+    replacements = []
+    rendered = 0
+    for start, end, container_id, options in calls:
+        tag = containers.get(container_id)
+        closing = re.compile(r'\s*</div\s*>').match(html, tag.end) if tag else None
+        if not closing:
+            continue
+        line_start = html.rfind('\n', 0, tag.start) + 1
+        indent = re.match(r'[ \t]*', html[line_start:tag.start]).group()
+        card = render_pricing_card(data, show_cta=bool(options.get('showCta')), indent=indent + '    ')
+        replacements.append((tag.end, closing.end(), f'\n{indent}    {card}\n{indent}</div>'))
+        replacements.append(_whole_lines(html, start, end) + ('',))
+        rendered += 1
+    if rendered == len(calls):
+        for match in _SCRIPT_BLOCK.finditer(html):
+            script = next(iter(find_tags(match.group(0), 'script')), None)
+            if script and local_path(script.get('src')) == SCRIPT_FILE:
+                replacements.append(_whole_lines(html, match.start(), match.end()) + ('',))
+    return splice(html, replacements), rendered
@@ -0,0 +1,107 @@
+"""
+Regression tests for GoogleSheetsManager job counts, against the local mock Sheets API.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_job_board import MockSettings, start_mock_server
+from config import Config
+import sheets_client
+
+
+@pytest.fixture
+def mock_sheets(monkeypatch):
+    settings = MockSettings()
+    server = start_mock_server(settings)
+    overrides = {
+        'SHEETS_API_ENDPOINT': f'{server.base_url}/', 'GOOGLE_SHEET_ID': 'test-sheet',
+        'GOOGLE_CREDENTIALS_FILE': os.path.join(ROOT, 'benchmarks', 'no-credentials.json'),
+        'WAL_DIR': '', 'SEEN_INDEX_FILE': '', 'DESCRIPTION_STORE_DIR': '',
+        'MAX_RETRIES': 1, 'RETRY_DELAY': 0.01, 'SHEETS_REQUESTS_PER_MINUTE': 0,
+    }
+    for key, value in overrides.items():
+        monkeypatch.setattr(Config, key, value)
+    sheets_client.reset_sheets_client()
+    yield settings
+    server.shutdown()
+    sheets_client.reset_sheets_client()
+
+
+def _jobs(count):
+    return [{'title': f'Hardware Manager {i}', 'company': f'Company {i}', 'url': f'https://jobs.example/posting/{i}'}
+            for i in range(count)]
+
+
+def test_failed_writes_are_not_counted_as_duplicates(mock_sheets):
+    from google_sheets import GoogleSheetsManager
+
+    manager = GoogleSheetsManager()
+    with manager.batch():
+        manager.create_sheet_if_not_exists()
+        assert manager.add_jobs_to_sheet(_jobs(3)) == 3
+    assert manager.take_counts() == {'added': 3, 'deduped': 0}
+
+    mock_sheets.error_rate = 1.0
+    with manager.batch():
+        assert manager.add_jobs_to_sheet(_jobs(5)) == 0
+    counts = manager.take_counts()
+    assert counts['failed'] == 5 and counts['deduped'] == 0 and counts['added'] == 0
+
+    mock_sheets.error_rate = 0.0
+    assert manager.add_jobs_to_sheet(_jobs(5)) == 2
+    assert manager.take_counts() == {'added': 2, 'deduped': 3}
+
+
+def _sheet_urls(manager):
+    return sorted(job.url for job in manager.get_existing_jobs())
+
+
+def test_failed_automatic_flush_keeps_earlier_rows(mock_sheets):
+    from google_sheets import GoogleSheetsManager
+
+    manager = GoogleSheetsManager()
+    manager.batcher.max_ranges = 2
+    jobs = _jobs(4)
+    with manager.batch():
+        manager.create_sheet_if_not_exists()
+        assert manager.add_jobs_to_sheet(jobs[:2]) == 2
+        mock_sheets.error_rate = 1.0
+        assert manager.add_jobs_to_sheet(jobs[2:]) == 2  # Queue is full: the automatic flush fails
+        mock_sheets.error_rate = 0.0
+    assert manager.take_counts() == {'added': 4, 'deduped': 0}
+    assert _sheet_urls(manager) == sorted(job['url'] for job in jobs)
+
+
+def test_failed_final_flush_counts_every_queued_job_as_failed(mock_sheets):
+    from google_sheets import GoogleSheetsManager
+
+    manager = GoogleSheetsManager()
+    manager.batcher.max_ranges = 2
+    jobs = _jobs(4)
+    with manager.batch():
+        manager.create_sheet_if_not_exists()
+        manager.add_jobs_to_sheet(jobs[:2])
+        mock_sheets.error_rate = 1.0
+        manager.add_jobs_to_sheet(jobs[2:])
+    counts = manager.take_counts()
+    assert counts['failed'] == 4 and counts['added'] == 0
+    assert manager.batcher.pending == 0
+    mock_sheets.error_rate = 0.0
+    assert _sheet_urls(manager) == []
+
+
+def test_existing_rows_match_near_duplicates_by_their_sheet_snippet(mock_sheets):
+    from google_sheets import GoogleSheetsManager
+
+    description = 'Acme Robotics is hiring a hardware engineering manager to lead board bring-up. ' * 12
+    manager = GoogleSheetsManager()
+    assert manager.add_jobs_to_sheet([{'title': 'Sr. Hardware Engineering Manager', 'company': 'Acme Robotics',
+                                       'url': 'https://www.adzuna.com/details/101', 'description': description}]) == 1
+    syndicated = {'title': 'Senior Hardware Engineering Manager', 'company': 'Acme Robotics, Inc.',
+                  'url': 'https://www.indeed.com/viewjob?jk=9f8e7d', 'description': description}
+    assert GoogleSheetsManager().add_jobs_to_sheet([syndicated]) == 0
@@ -0,0 +1,57 @@
+"""
+Regression tests for inquiry_service.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from inquiry_service import InquiryService, _client_ip
+from write_ahead_log import WriteAheadLog
+
+
+class _Sheet:
+    sheet_name = 'website_inquiries'
+
+    def __init__(self):
+        self.rows = []
+
+    def append(self, batch):
+        self.rows.extend(batch)
+        return len(batch)
+
+
+class _BrokenNotifier:
+    enabled = True
+
+    def send(self, batch):
+        raise OSError('notification log is full')
+
+
+class _Handler:
+    def __init__(self, address, forwarded=None):
+        self.client_address = (address, 40000)
+        self.headers = {'X-Forwarded-For': forwarded} if forwarded is not None else {}
+
+
+def test_notifier_failure_does_not_fail_the_write():
+    sheet = _Sheet()
+    service = InquiryService(sheet=sheet, notifier=_BrokenNotifier(), wal=WriteAheadLog(None))
+    service.submit({'email': 'a@example.com'})
+    assert service._flusher.drain() == 1
+    assert sheet.rows == [{'email': 'a@example.com'}]
+    assert service.wal.pending_count == 0
+
+
+def test_forwarded_for_is_ignored_without_a_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(Config, 'INQUIRY_TRUSTED_PROXIES', [])
+    assert _client_ip(_Handler('203.0.113.7', '198.51.100.1')) == '203.0.113.7'
+
+
+def test_forwarded_for_is_read_behind_a_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(Config, 'INQUIRY_TRUSTED_PROXIES', ['10.0.0.0/8'])
+    # The client can prepend anything; the last untrusted hop is what the proxy saw
+    assert _client_ip(_Handler('10.0.0.2', '1.2.3.4, 198.51.100.1, 10.0.0.9')) == '198.51.100.1'
+    assert _client_ip(_Handler('10.0.0.2')) == '10.0.0.2'
+    assert _client_ip(_Handler('203.0.113.7', '198.51.100.1')) == '203.0.113.7'
@@ -0,0 +1,26 @@
+"""
+Regression tests for job_record.JobRecord.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from job_record import JobRecord
+from legitimate_job_scraper import LegitimateJobScraper
+
+
+def test_description_lower_is_the_match_prefix():
+    job = JobRecord(title='Operations Lead', description='Run the Warehouse. ' + 'x' * 1000 + ' HARDWARE')
+    assert job.description_lower == job.description[:Config.DESCRIPTION_MATCH_LENGTH].lower()
+    assert 'hardware' not in job.description_lower
+
+
+def test_keywords_deep_in_the_description_do_not_pass_the_filter():
+    filler = 'We ship logistics software to retailers. ' * 30
+    deep = JobRecord(title='Account Executive', description=filler + 'You will work with our hardware team lead.')
+    early = JobRecord(title='Account Executive', description='Lead our hardware sales team. ' + filler)
+    scraper = LegitimateJobScraper()
+    assert not scraper._is_hardware_manager_job(deep)
+    assert scraper._is_hardware_manager_job(early)
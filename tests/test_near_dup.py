@@ -0,0 +1,60 @@
+"""
+Regression tests for near_dup.DuplicateDetector.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_dup import DuplicateDetector
+
+
+def _job(title, url, description='', company='Acme Robotics', location='New York, NY'):
+    return {'title': title, 'company': company, 'location': location, 'url': url, 'description': description}
+
+
+def test_similar_titles_without_description_are_distinct():
+    detector = DuplicateDetector()
+    assert detector.add_if_new(_job('Hardware Engineering Manager', 'https://acme.example/jobs/1'))
+    assert detector.add_if_new(_job('Software Engineering Manager', 'https://acme.example/jobs/2'))
+
+
+def test_title_subset_without_description_is_distinct():
+    detector = DuplicateDetector()
+    assert detector.add_if_new(_job('Hardware Manager', 'https://acme.example/jobs/10'))
+    assert detector.add_if_new(_job('Senior Hardware Manager', 'https://acme.example/jobs/11'))
+
+
+def test_same_title_and_location_without_description_is_duplicate():
+    detector = DuplicateDetector()
+    assert detector.add_if_new(_job('Sr. Hardware Manager', 'https://adzuna.example/ad/1'))
+    assert not detector.add_if_new(_job('Senior Hardware Manager', 'https://indeed.example/view/2'))
+    assert detector.add_if_new(_job('Senior Hardware Manager', 'https://indeed.example/view/3',
+                                    location='Austin, TX'))
+
+
+BOILERPLATE = ('Acme Robotics builds warehouse robots used by retailers worldwide. We offer competitive pay, '
+               'equity, full health coverage, a generous parental leave policy and a hybrid schedule from our '
+               'Brooklyn office. Acme is an equal opportunity employer. ')
+
+
+def test_same_company_boilerplate_does_not_merge_distinct_roles():
+    detector = DuplicateDetector()
+    assert detector.add_if_new(_job('Hardware Engineering Manager', 'https://www.adzuna.com/details/101',
+                                    BOILERPLATE + 'Lead the hardware team.'))
+    assert detector.add_if_new(_job('Software Engineering Manager', 'https://www.adzuna.com/details/102',
+                                    BOILERPLATE + 'Lead the firmware team.'))
+    assert detector.add_if_new(_job('Senior Hardware Engineering Manager', 'https://www.adzuna.com/details/103',
+                                    BOILERPLATE + 'Lead the hardware team.'))
+    # Same title, same boilerplate, but a different posting ID on the same board
+    assert detector.add_if_new(_job('Hardware Engineering Manager', 'https://www.adzuna.com/details/104',
+                                    BOILERPLATE + 'Lead the hardware team.', location='Austin, TX'))
+
+
+def test_syndicated_posting_is_a_duplicate_across_sources():
+    detector = DuplicateDetector()
+    description = BOILERPLATE + 'Lead the hardware team.'
+    assert detector.add_if_new(_job('Sr. Hardware Engineering Manager', 'https://www.adzuna.com/details/101',
+                                    description))
+    assert not detector.add_if_new(_job('Senior Hardware Engineering Manager',
+                                        'https://www.indeed.com/viewjob?jk=9f8e7d', description))
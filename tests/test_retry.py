@@ -0,0 +1,44 @@
+"""
+Regression tests for retry.request_with_retry.
+"""
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from retry import request_with_retry
+
+
+def _response(status):
+    response = requests.Response()
+    response.status_code = status
+    response._content = b'{}'
+    return response
+
+
+class _Session:
+    """Plays back a script of responses and exceptions."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+
+    def request(self, method, url, **kwargs):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_network_error_after_an_error_status_is_raised():
+    session = _Session(_response(503), requests.ConnectionError('connection reset'))
+    with pytest.raises(requests.ConnectionError):
+        request_with_retry(session, 'GET', 'https://jobs.example/api', max_retries=1, base_delay=0.001)
+
+
+def test_last_error_status_is_returned_when_retries_run_out():
+    session = _Session(requests.ConnectionError('connection reset'), _response(503))
+    response = request_with_retry(session, 'GET', 'https://jobs.example/api', max_retries=1, base_delay=0.001)
+    assert response.status_code == 503
@@ -0,0 +1,55 @@
+"""
+Regression tests for sheets_client token refresh.
+"""
+import os
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sheets_client
+
+
+class _SlowCredentials:
+    """Credentials whose refresh blocks until released, counting refreshes."""
+
+    def __init__(self):
+        self.token = 'old'
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=5)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.refreshes = []  # Shared with the copy sheets_client refreshes
+
+    def refresh(self, request):
+        self.refreshes.append(request)
+        self.started.set()
+        assert self.release.wait(5)
+        self.token = 'new'
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+
+def test_token_refresh_does_not_hold_the_lock():
+    credentials = _SlowCredentials()
+    with sheets_client._lock:
+        sheets_client._credentials = credentials
+        sheets_client._credentials_source = sheets_client._source()
+    try:
+        refresher = threading.Thread(target=sheets_client.get_credentials)
+        refresher.start()
+        assert credentials.started.wait(5)
+
+        # While the refresh is in flight, other callers get the current token at once
+        assert sheets_client._lock.acquire(timeout=1)
+        sheets_client._lock.release()
+        assert sheets_client.get_credentials() is credentials
+        assert credentials.token == 'old'
+
+        credentials.release.set()
+        refresher.join(5)
+        assert credentials.token == 'new'
+        assert len(credentials.refreshes) == 1
+        assert not sheets_client._refreshing
+    finally:
+        credentials.release.set()
+        sheets_client.reset_sheets_client()
@@ -0,0 +1,32 @@
+"""
+Regression tests for url_index.job_key.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_index import job_key
+
+
+def test_known_job_ids():
+    assert job_key('https://www.linkedin.com/jobs/view/senior-hardware-manager-3712345678/?trk=abc') == \
+        'linkedin:3712345678'
+    assert job_key('https://www.indeed.com/viewjob?jk=ABC123&from=serp') == 'indeed:abc123'
+
+
+def test_posting_urls_fall_back_to_the_canonical_url():
+    assert job_key('https://boards.greenhouse.io/acme/jobs/4012345?utm_source=x') == \
+        'url:https://boards.greenhouse.io/acme/jobs/4012345'
+    assert job_key('https://acme.example/careers/hardware-engineering-manager/') == \
+        'url:https://acme.example/careers/hardware-engineering-manager'
+    assert job_key('https://acme.example/careers?gh_jid=4012345') == 'url:https://acme.example/careers?gh_jid=4012345'
+
+
+def test_urls_without_a_posting_have_no_key():
+    for url in ('https://acme.example', 'https://acme.example/', 'https://acme.example/careers',
+                'https://acme.example/jobs/?utm_source=linkedin', 'https://acme.example/search?q=hardware+manager',
+                'https://www.linkedin.com/jobs/search?keywords=hardware', 'https://www.indeed.com/jobs?q=manager',
+                'not a url', ''):
+        assert job_key(url) is None, url
+    assert job_key('https://acme.example/careers', source_id='serpapi:xyz') == 'serpapi:xyz'
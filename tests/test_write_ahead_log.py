@@ -0,0 +1,53 @@
+"""
+Regression tests for write_ahead_log.WriteAheadLog.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from write_ahead_log import WalLockedError, WriteAheadLog
+
+
+def test_second_process_cannot_open_a_locked_directory(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    wal.append([{'row': 1}])
+    result = subprocess.run(
+        [sys.executable, '-c', 'import sys; from write_ahead_log import WriteAheadLog; WriteAheadLog(sys.argv[1])',
+         str(tmp_path)],
+        cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode != 0
+    assert 'WalLockedError' in result.stderr
+    assert str(os.getpid()) in result.stderr
+    wal.close()
+
+
+def test_lock_is_released_on_close(tmp_path):
+    wal = WriteAheadLog(str(tmp_path))
+    wal.append([{'row': 1}])
+    with pytest.raises(WalLockedError):
+        WriteAheadLog(str(tmp_path))
+    wal.close()
+    reopened = WriteAheadLog(str(tmp_path))
+    assert [data for _, data in reopened.pending(10)] == [{'row': 1}]
+    reopened.close()
+
+
+def test_get_wal_falls_back_when_another_process_holds_the_log(tmp_path, monkeypatch, caplog):
+    import write_ahead_log
+    from config import Config
+
+    monkeypatch.setattr(Config, 'WAL_DIR', str(tmp_path))
+    monkeypatch.setattr(write_ahead_log, '_logs', {})
+    monkeypatch.setattr(write_ahead_log, '_locked', {})
+    holder = WriteAheadLog(str(tmp_path / 'jobs'))
+    try:
+        assert write_ahead_log.get_wal('jobs') is None
+        assert 'writing without the write-ahead log' in caplog.text
+        assert write_ahead_log.get_wal('jobs') is None
+    finally:
+        holder.close()
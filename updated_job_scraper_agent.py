@@ -3,14 +3,16 @@ Updated LinkedIn Job Scraper Agent using legitimate APIs and job aggregators.
 This version complies with terms of service and is suitable for personal use.
 """
 import logging
-import schedule
 import time
 from datetime import datetime, timezone
 import sys
 
-from legitimate_job_scraper import LegitimateJobScraper
-from google_sheets import GoogleSheetsManager
 from config import Config
+from job_record import as_record
+from run_history import write_run_history
+from description_store import archive_descriptions
+from instrumentation import RunInstrumentation, stage, profiler_from_argv
+from metrics import record_jobs, start_metrics_server, metrics_port_from_argv
 
 # Configure logging
 logging.basicConfig(
@@ -27,9 +29,10 @@ logger = logging.getLogger(__name__)
 class UpdatedJobScraperAgent:
     """Updated agent using legitimate job APIs and aggregators."""
     
-    def __init__(self):
+    def __init__(self, profiler=None):
         self.legitimate_scraper = None
         self.sheets_manager = None
+        self.profiler = profiler
     
     def initialize(self):
         """Initialize the scraper and sheets manager."""
@@ -39,9 +42,12 @@ class UpdatedJobScraperAgent:
             # Validate configuration
             Config.validate_config()
             
+            # Heavy client libraries are imported here rather than at startup
+            from google_sheets import GoogleSheetsManager
+            from legitimate_job_scraper import LegitimateJobScraper
+            
             # Initialize components
             self.sheets_manager = GoogleSheetsManager()
-            self.sheets_manager.create_sheet_if_not_exists()
             
             self.legitimate_scraper = LegitimateJobScraper()
             
@@ -56,41 +62,58 @@ class UpdatedJobScraperAgent:
         start_time = datetime.now(timezone.utc)
         logger.info(f"Starting daily job scraping at {start_time}")
         
-        try:
-            # Use legitimate job aggregators
-            logger.info("Scraping jobs using legitimate APIs and aggregators...")
-            
-            # Search for hardware manager jobs in NY with salary requirements
-            jobs = self.legitimate_scraper.scrape_all_sources(
-                keywords="hardware manager",
-                location="New York, NY", 
-                limit=Config.MAX_RESULTS
-            )
-            
-            if not jobs:
-                logger.warning("No jobs found from legitimate sources")
-                return
-            
-            logger.info(f"Found {len(jobs)} jobs from legitimate sources")
-            
-            # Sort jobs by relevance
-            sorted_jobs = self.sort_jobs_by_relevance(jobs)
-            
-            # Take top results
-            top_jobs = sorted_jobs[:Config.MAX_RESULTS]
-            logger.info(f"Selected top {len(top_jobs)} jobs for processing")
-            
-            # Add to Google Sheets
-            logger.info("Adding jobs to Google Sheet...")
-            added_count = self.sheets_manager.add_jobs_to_sheet(top_jobs)
-            
-            logger.info(f"Successfully added {added_count} new jobs to Google Sheet")
-            
-            # Log the sources we used
-            self.log_sources_used()
+        with RunInstrumentation('legitimate', profiler=self.profiler) as run:
+            try:
+                # Use legitimate job aggregators
+                logger.info("Scraping jobs using legitimate APIs and aggregators...")
+            
+                # Search for hardware manager jobs in NY with salary requirements
+                jobs = self.legitimate_scraper.scrape_all_sources(
+                    keywords="hardware manager",
+                    location="New York, NY", 
+                    limit=Config.MAX_RESULTS
+                )
+            
+                if not jobs:
+                    logger.warning("No jobs found from legitimate sources")
+                    return
+            
+                logger.info(f"Found {len(jobs)} jobs from legitimate sources")
+                record_jobs('found', len(jobs))
+            
+                # Sort jobs by relevance
+                with stage('scoring', count=len(jobs)):
+                    sorted_jobs = self.sort_jobs_by_relevance(jobs)
+            
+                # Keep every scored job in the columnar run history and full descriptions in the archive
+                write_run_history(sorted_jobs, run_id=run.run_id, run_name=run.run_name)
+                archive_descriptions(sorted_jobs)
+            
+                # Take top results
+                top_jobs = sorted_jobs[:Config.MAX_RESULTS]
+                logger.info(f"Selected top {len(top_jobs)} jobs for processing")
+                record_jobs('filtered', len(top_jobs))
+            
+                # Add to Google Sheets
+                logger.info("Adding jobs to Google Sheet...")
+                # One batch per run: the sheet check rides on the read, writes go out when it exits
+                with self.sheets_manager.batch():
+                    self.sheets_manager.create_sheet_if_not_exists()
+                    self.sheets_manager.add_jobs_to_sheet(top_jobs)
+                # Final once the batch has flushed: duplicates and failed writes are counted apart
+                counts = self.sheets_manager.take_counts()
+            
+                logger.info(f"Successfully added {counts['added']} new jobs to Google Sheet")
+                if counts['failed']:
+                    logger.error(f"{counts['failed']} jobs could not be written to Google Sheet")
+                for step in ('deduped', 'failed', 'added'):
+                    record_jobs(step, counts[step])
+            
+                # Log the sources we used
+                self.log_sources_used()
             
-        except Exception as e:
-            logger.error(f"Error during legitimate job scraping: {e}")
+            except Exception as e:
+                logger.error(f"Error during legitimate job scraping: {e}")
         
         end_time = datetime.now(timezone.utc)
         duration = end_time - start_time
@@ -101,10 +124,11 @@ class UpdatedJobScraperAgent:
         Sort jobs by relevance based on title keywords and salary.
         """
         def relevance_score(job):
+            job = as_record(job)
             score = 0
-            title = job.get('title', '').lower()
-            description = job.get('description', '').lower()
-            salary = job.get('salary', '')
+            title = job.title_lower
+            description = job.description_lower
+            salary_num = job.salary_min
             
             # Title relevance scoring
             if 'hardware' in title:
@@ -121,20 +145,11 @@ class UpdatedJobScraperAgent:
                 score += 5
             
             # Salary scoring
-            if salary and salary != 'not specified' and salary != 'Not specified':
-                import re
-                salary_match = re.search(r'\$?(\d+(?:,\d{3})*)', salary)
-                if salary_match:
-                    try:
-                        salary_num = int(salary_match.group(1).replace(',', ''))
-                        if 'k' in salary.lower() or 'thousand' in salary.lower():
-                            salary_num *= 1000
-                        if salary_num >= Config.MIN_SALARY:
-                            score += 3
-                        if salary_num >= Config.MIN_SALARY * 1.2:
-                            score += 2
-                    except:
-                        pass
+            if salary_num is not None:
+                if salary_num >= Config.MIN_SALARY:
+                    score += 3
+                if salary_num >= Config.MIN_SALARY * 1.2:  # 20% above minimum
+                    score += 2
             
             return score
         
@@ -153,6 +168,8 @@ class UpdatedJobScraperAgent:
     def schedule_jobs(self):
         """Schedule the daily job scraping task."""
         try:
+            import schedule
+            
             logger.info(f"Scheduling daily job scraping for {Config.SCHEDULE_TIME} ET")
             
             # Schedule the job for 8 AM ET daily
@@ -171,6 +188,8 @@ class UpdatedJobScraperAgent:
     
     def start_scheduler(self):
         """Start the scheduler and keep the agent running."""
+        import schedule
+        
         logger.info("Starting updated job scraper agent scheduler...")
         
         while True:
@@ -186,14 +205,17 @@ class UpdatedJobScraperAgent:
 
 def main():
     """Main function to run the updated agent."""
-    agent = UpdatedJobScraperAgent()
+    agent = UpdatedJobScraperAgent(profiler=profiler_from_argv(sys.argv[1:]))
     
     try:
+        # Start the optional metrics endpoint
+        start_metrics_server(metrics_port_from_argv(sys.argv[1:]))
+        
         # Initialize the agent
         agent.initialize()
         
         # Check if we should run immediately or start scheduler
-        if len(sys.argv) > 1 and sys.argv[1] == '--run-now':
+        if '--run-now' in sys.argv[1:]:
             logger.info("Running legitimate job scraping immediately...")
             agent.run_immediately()
         else:
@@ -0,0 +1,281 @@
+"""
+Job URL canonicalization, stable job-ID extraction and a compact seen-job index.
+
+LinkedIn hrefs and aggregator apply links carry tracking parameters, so raw URL
+strings make poor identities. Per-source rules reduce a URL to the posting's
+stable ID (LinkedIn /jobs/view/<id>, Adzuna ad IDs, Indeed jk, ...) and every
+job key maps to a 64-bit integer. SeenIndex keeps those integers in a sorted
+file on disk, 8 bytes per job, memory-mapped (and optionally fronted by a
+Bloom filter, seen_filter.py) so years of runs cost neither memory nor startup
+time.
+"""
+import bisect
+import hashlib
+import heapq
+import logging
+import mmap
+import os
+import re
+from array import array
+from typing import Iterable, Optional
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import Config
+from seen_filter import open_seen_filter
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the click and do not identify the posting
+TRACKING_PARAMS = {'trackingid', 'refid', 'trk', 'trkinfo', 'lipi', 'originalsubdomain', 'gclid', 'fbclid'}
+
+ITEM_SIZE = array('Q').itemsize
+MERGE_CHUNK = 65536  # Keys written per chunk when merging new keys into the index file
+
+_LINKEDIN_VIEW = re.compile(r'/jobs/view/(?:[^/]*-)?(\d+)')
+_ADZUNA_AD = re.compile(r'/(?:land/ad|details|ad)/(\d+)')
+_REMOTEOK_JOB = re.compile(r'/remote-jobs/(?:[^/]*-)?(\d+)$')
+_WTTJ_JOB = re.compile(r'/companies/([^/]+)/jobs/([^/?#]+)')
+
+# Job boards whose posting URLs always carry an ID extract_job_id knows; any other URL there is a listing
+JOB_BOARD_HOSTS = ('.linkedin.com', '.adzuna.', '.indeed.', '.remoteok.com', '.remoteok.io', '.welcometothejungle.com')
+# Last path segments of career pages and searches rather than one posting
+LISTING_SEGMENTS = {'careers', 'career', 'jobs', 'job', 'openings', 'positions', 'vacancies', 'opportunities',
+                    'search', 'results', 'apply', 'join-us', 'work-with-us', 'index.html', 'index.htm'}
+
+
+def _host(parts) -> str:
+    host = parts.netloc.lower().split('@')[-1].split(':')[0]
+    return host[4:] if host.startswith('www.') else host
+
+
+def extract_job_id(url: str) -> Optional[str]:
+    """
+    Return a namespaced stable ID for a job URL, e.g. 'linkedin:3712345678', or None.
+    """
+    url = (url or '').strip()
+    if not url:
+        return None
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    host = _host(parts)
+    path = parts.path.rstrip('/')
+
+    if host.endswith('linkedin.com'):
+        match = _LINKEDIN_VIEW.search(path)
+        if match:
+            return f'linkedin:{match.group(1)}'
+        current = parse_qs(parts.query).get('currentJobId')
+        if current and current[0].isdigit():
+            return f'linkedin:{current[0]}'
+    elif host.endswith('adzuna.com') or '.adzuna.' in f'.{host}':
+        match = _ADZUNA_AD.search(path)
+        if match:
+            return f'adzuna:{match.group(1)}'
+    elif host.endswith('indeed.com') or '.indeed.' in f'.{host}':
+        jk = parse_qs(parts.query).get('jk') or parse_qs(parts.query).get('vjk')
+        if jk and jk[0]:
+            return f'indeed:{jk[0].lower()}'
+    elif host.endswith('remoteok.com') or host.endswith('remoteok.io'):
+        match = _REMOTEOK_JOB.search(path)
+        if match:
+            return f'remoteok:{match.group(1)}'
+    elif host.endswith('welcometothejungle.com'):
+        match = _WTTJ_JOB.search(path)
+        if match:
+            return f'wttj:{match.group(1)}/{match.group(2)}'
+    return None
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a job URL for comparison.
+
+    Known job boards are reduced to their canonical posting URL; other URLs get a
+    lowercase host, no fragment, tracking parameters or trailing slash.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    job_id = extract_job_id(url)
+    if job_id:
+        source, _, value = job_id.partition(':')
+        if source == 'linkedin':
+            return f'https://www.linkedin.com/jobs/view/{value}'
+        if source == 'indeed':
+            return f'https://www.indeed.com/viewjob?jk={value}'
+        if source == 'adzuna':
+            return f'https://www.adzuna.com/details/{value}'
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def _is_posting_url(canonical: str) -> bool:
+    """Whether a canonical URL without a known job ID still points at one posting."""
+    parts = urlsplit(canonical)
+    host = _host(parts)
+    if not host or any(board in f'.{host}' for board in JOB_BOARD_HOSTS):
+        return False
+    segment = parts.path.rstrip('/').rpartition('/')[2].lower()
+    if segment and segment not in LISTING_SEGMENTS:
+        return True
+    # e.g. /careers?gh_jid=4012345; a search (?q=hardware+manager) has no ID-like value
+    return any(any(char.isdigit() for char in value) for _, value in parse_qsl(parts.query))
+
+
+def job_key(url: str, source_id: str = '') -> Optional[str]:
+    """
+    Stable identity for a posting: the ID in its URL, else the source's own ID
+    (e.g. 'serpapi:<job_id>'), else the canonical URL when it points at one
+    posting. Home pages, career pages and searches give None, since many
+    postings share them.
+    """
+    job_id = extract_job_id(url)
+    if job_id:
+        return job_id
+    if source_id:
+        return source_id
+    canonical = canonicalize_url(url)
+    if not canonical or not _is_posting_url(canonical):
+        return None
+    return f'url:{canonical}'
+
+
+def key_to_int(key: str) -> int:
+    """64-bit integer for a job key."""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class SeenIndex:
+    """
+    Persistent set of 64-bit job keys.
+
+    Keys on disk are a sorted uint64 file that is memory-mapped and binary
+    searched, so opening the index costs the same at any size. When a seen
+    filter is configured it is checked first and only keys it reports as
+    maybe-seen reach the binary search. Keys added during the run sit in a
+    small set until save() merges them.
+    """
+
+    def __init__(self, path: Optional[str] = None, filter_path: Optional[str] = None):
+        self.path = path or Config.SEEN_INDEX_FILE
+        self._pending = set()
+        self._file = None
+        self._map = None
+        self._view = None
+        self._keys = ()
+        self._open()
+        self.filter = open_seen_filter(Config.SEEN_FILTER_FILE if filter_path is None else filter_path,
+                                       capacity=Config.SEEN_FILTER_CAPACITY,
+                                       error_rate=Config.SEEN_FILTER_ERROR_RATE)
+        if self.filter is not None and len(self.filter) != len(self._keys):
+            # Missing, stale or from an interrupted save: rebuild from the exact keys
+            logger.info(f"Rebuilding seen filter {self.filter.path} from {len(self._keys)} keys")
+            self.filter.clear()
+            self.filter.update(self._keys)
+            self.filter.flush()
+        logger.debug(f"Opened {len(self._keys)} seen job keys from {self.path}")
+
+    def _open(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        size = os.path.getsize(self.path)
+        usable = size - size % ITEM_SIZE
+        if not usable:
+            return
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._keys = self._view[:usable].cast('Q')
+
+    def _close_map(self):
+        if isinstance(self._keys, memoryview):
+            self._keys.release()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._keys = ()
+
+    def __len__(self) -> int:
+        return len(self._keys) + len(self._pending)
+
+    def _on_disk(self, key: int) -> bool:
+        index = bisect.bisect_left(self._keys, key)
+        return index < len(self._keys) and self._keys[index] == key
+
+    def __contains__(self, key: int) -> bool:
+        if key in self._pending:
+            return True
+        if self.filter is not None and key not in self.filter:
+            return False
+        return self._on_disk(key)
+
+    def add(self, key: int):
+        if key not in self:
+            self._pending.add(key)
+
+    def update(self, keys: Iterable[int]):
+        for key in keys:
+            self.add(key)
+
+    def save(self):
+        """Merge pending keys into the sorted file, replace it atomically, then update the filter."""
+        if not self._pending or not self.path:
+            return
+        pending = sorted(self._pending)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        # Pending keys are never already on disk (add() checks), so a merge keeps the file unique
+        with open(tmp_path, 'wb') as f:
+            chunk = array('Q')
+            for key in heapq.merge(self._keys, pending):
+                chunk.append(key)
+                if len(chunk) >= MERGE_CHUNK:
+                    chunk.tofile(f)
+                    chunk = array('Q')
+            chunk.tofile(f)
+        self._close_map()
+        os.replace(tmp_path, self.path)
+        self._open()
+        if self.filter is not None:
+            self.filter.update(pending)
+            self.filter.flush()
+        self._pending = set()
+
+    def close(self):
+        self._close_map()
+        if self.filter is not None:
+            self.filter.close()
+            self.filter = None
+
+
+_seen_index = None
+
+
+def get_seen_index() -> Optional[SeenIndex]:
+    """Process-wide SeenIndex for Config.SEEN_INDEX_FILE, or None when disabled."""
+    global _seen_index
+    if not Config.SEEN_INDEX_FILE:
+        return None
+    if _seen_index is None or _seen_index.path != Config.SEEN_INDEX_FILE:
+        if _seen_index is not None:
+            _seen_index.close()
+        _seen_index = SeenIndex(Config.SEEN_INDEX_FILE)
+    return _seen_index
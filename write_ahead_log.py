@@ -0,0 +1,442 @@
+"""
+Durable write-ahead log for sheet-bound rows.
+
+A failed Sheets call used to drop whatever it was writing: add_jobs_to_sheet
+logged the error and returned 0, and the Apps Script form backend only logged
+it. Rows now go to an append-only log on local disk first, and are removed
+only after the sheet has accepted them. A WalFlusher drains the log in large
+batches and retries with backoff while Sheets is unavailable, so rows
+accepted during an outage are written once it ends, even across restarts.
+
+Records are JSON objects stored one per line as "<crc32> <json>" in segment
+files named after their first sequence number. A torn last line from a crash
+fails its checksum and is cut off when the log is reopened. Appends that must
+be durable wait for an fsync, and callers arriving while one is in progress
+share the next fsync (group commit), so fsyncs grow with load far more slowly
+than appends. commit(seq) records how far the log has been delivered and
+deletes segments that are fully delivered. Delivery is at least once: a crash
+between a sheet write and its commit replays those rows.
+
+A log directory belongs to one process at a time: opening it takes an
+exclusive flock on its lock file, and a second process opening the same
+directory gets WalLockedError instead of replaying and deleting records
+under the first. get_wal turns that into a warning and no log, so the
+second process writes directly.
+"""
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one process per WAL_DIR is on the operator
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.log'
+CURSOR_FILE = 'cursor'
+LOCK_FILE = 'lock'
+
+
+def _encode(seq: int, data: dict) -> bytes:
+    payload = json.dumps({'seq': seq, 'data': data}, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+
+def _decode(line: bytes) -> Optional[Tuple[int, dict]]:
+    """(seq, data) of a log line, or None when it is torn or corrupt."""
+    if not line.endswith(b'\n') or len(line) < 10 or line[8:9] != b' ':
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        record = json.loads(payload)
+        return record['seq'], record['data']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class WalLockedError(RuntimeError):
+    """The log directory is already open in another process."""
+
+
+def _lock_directory(directory: str):
+    """Take the directory's exclusive lock, raising WalLockedError when another process holds it."""
+    path = os.path.join(directory, LOCK_FILE)
+    lock_file = open(path, 'a+')
+    if fcntl is None:
+        return lock_file
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.seek(0)
+        holder = lock_file.read().strip() or 'unknown'
+        lock_file.close()
+        raise WalLockedError(f"Write-ahead log {directory} is in use by another process (pid {holder}); "
+                             f"give each process its own WAL_DIR") from None
+    lock_file.truncate(0)
+    lock_file.write(str(os.getpid()))
+    lock_file.flush()
+    return lock_file
+
+
+def _fsync_directory(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    """
+    An append-only, fsync-batched record log with a delivery cursor.
+
+    Args:
+        directory: Where segments live; None keeps records in memory only (no durability)
+        segment_bytes: Size at which a new segment file is started
+
+    Raises:
+        WalLockedError: Another process has the directory open
+    """
+
+    def __init__(self, directory: Optional[str], segment_bytes: Optional[int] = None):
+        self.directory = directory
+        self.segment_bytes = segment_bytes or Config.WAL_SEGMENT_BYTES
+        self._cond = threading.Condition()
+        self._pending = deque()  # (seq, data) not yet committed
+        self._segments: List[Tuple[int, str]] = []  # (first seq, path), oldest first
+        self._file = None
+        self._file_bytes = 0
+        self._retired = []  # rotated-out segment files awaiting their final fsync
+        self._committed = 0
+        self._next_seq = 1
+        self._written = 0  # last seq handed to the OS
+        self._synced = 0  # last seq known to be on disk
+        self._syncing = False
+        self.fsyncs = 0
+        self._lock_file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._lock_file = _lock_directory(directory)
+            self._recover()
+
+    @property
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    @property
+    def committed(self) -> int:
+        return self._committed
+
+    def _segment_path(self, first_seq: int) -> str:
+        return os.path.join(self.directory, f'{first_seq:020d}{SEGMENT_SUFFIX}')
+
+    def _recover(self):
+        """Load the cursor and every undelivered record, cutting off a torn tail."""
+        try:
+            with open(os.path.join(self.directory, CURSOR_FILE)) as f:
+                self._committed = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            self._committed = 0
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+        last_seq = self._committed
+        for name in names:
+            path = os.path.join(self.directory, name)
+            self._segments.append((int(name[:-len(SEGMENT_SUFFIX)]), path))
+            good_bytes = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    record = _decode(line)
+                    if record is None:
+                        break
+                    good_bytes += len(line)
+                    seq, data = record
+                    last_seq = max(last_seq, seq)
+                    if seq > self._committed:
+                        self._pending.append((seq, data))
+            if good_bytes < os.path.getsize(path):
+                logger.warning(f"Write-ahead log {path}: dropping a torn record after byte {good_bytes}")
+                with open(path, 'r+b') as f:
+                    f.truncate(good_bytes)
+                    os.fsync(f.fileno())
+        self._next_seq = last_seq + 1
+        self._written = self._synced = last_seq
+        if self._pending:
+            logger.info(f"Write-ahead log {self.directory}: {len(self._pending)} undelivered records")
+        self._delete_delivered()
+
+    def _open_segment(self, first_seq: int):
+        if self._file is not None:
+            self._retired.append(self._file)
+        path = self._segment_path(first_seq)
+        self._file = open(path, 'ab')
+        self._file_bytes = 0
+        self._segments.append((first_seq, path))
+        _fsync_directory(self.directory)
+
+    def append(self, records: List[dict], durable: bool = True) -> int:
+        """
+        Append records to the log.
+
+        Args:
+            records: JSON-serializable dicts
+            durable: Return only once the records are fsynced to disk
+
+        Returns:
+            Sequence number of the last record
+        """
+        with self._cond:
+            for data in records:
+                seq = self._next_seq
+                self._next_seq += 1
+                if self.directory:
+                    line = _encode(seq, data)
+                    if self._file is None or self._file_bytes + len(line) > self.segment_bytes:
+                        self._open_segment(seq)
+                    self._file.write(line)
+                    self._file_bytes += len(line)
+                self._pending.append((seq, data))
+            last = self._next_seq - 1
+            self._written = last
+            if not self.directory:
+                self._synced = last
+            self._cond.notify_all()
+        if durable:
+            self.sync(last)
+        return last
+
+    def sync(self, seq: Optional[int] = None):
+        """Wait until every record up to seq (default: all appended) is on disk."""
+        with self._cond:
+            target = self._written if seq is None else seq
+            while self._synced < target:
+                if self._syncing:
+                    # Another thread's fsync is in flight; ours rides on the next one
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                retired, self._retired = self._retired, []
+                files = retired + ([self._file] if self._file else [])
+                for f in files:
+                    f.flush()
+                upto = self._written
+                self._cond.release()
+                try:
+                    for f in files:
+                        os.fsync(f.fileno())
+                    for f in retired:
+                        f.close()
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._synced = max(self._synced, upto)
+                self.fsyncs += 1
+
+    def pending(self, limit: int) -> List[Tuple[int, dict]]:
+        """Up to limit undelivered (seq, record) pairs, oldest first."""
+        with self._cond:
+            return [self._pending[index] for index in range(min(limit, len(self._pending)))]
+
+    def wait_for_records(self, timeout: Optional[float] = None) -> bool:
+        """Block until there is something to deliver (or timeout); returns whether there is."""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            return bool(self._pending)
+
+    def commit(self, seq: int):
+        """Mark every record up to seq as delivered and delete fully delivered segments."""
+        with self._cond:
+            if seq <= self._committed:
+                return
+            while self._pending and self._pending[0][0] <= seq:
+                self._pending.popleft()
+            self._committed = seq
+            if not self.directory:
+                return
+            path = os.path.join(self.directory, CURSOR_FILE)
+            with open(f'{path}.tmp', 'w') as f:
+                f.write(str(seq))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(f'{path}.tmp', path)
+            self._delete_delivered()
+
+    def _delete_delivered(self):
+        # A segment is done when the next one starts at or below the cursor + 1
+        while len(self._segments) > 1 and self._segments[1][0] <= self._committed + 1:
+            _, path = self._segments.pop(0)
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not delete delivered log segment {path}: {e}")
+
+    def close(self):
+        self.sync()
+        with self._cond:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                self._lock_file.close()  # Releases the flock
+                self._lock_file = None
+
+
+class WalFlusher:
+    """
+    Drains a WriteAheadLog into a sink in batches from a background thread.
+
+    The sink gets a list of records and must raise if they were not delivered;
+    failed batches are retried with exponential backoff (capped at
+    Config.WAL_RETRY_MAX_DELAY) until they go through.
+
+    Args:
+        wal: Log to drain
+        sink: Callable delivering a batch of records
+        batch_size: Most records per sink call
+        linger: Seconds to wait after the first new record so a burst goes out as one batch
+        name: Thread name, also used in log messages
+    """
+
+    def __init__(self, wal: WriteAheadLog, sink: Callable[[List[dict]], None], batch_size: Optional[int] = None,
+                 linger: float = 0.0, name: str = 'wal-flusher'):
+        self.wal = wal
+        self.sink = sink
+        self.batch_size = batch_size or Config.WAL_BATCH_SIZE
+        self.linger = linger
+        self.name = name
+        self.delivered = 0
+        self._lock = threading.Lock()  # one delivery at a time, background or drain()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def drain(self) -> int:
+        """
+        Deliver every pending record now, in batch_size batches.
+
+        Returns:
+            Number of records delivered. The sink's exception propagates; records
+            not delivered stay in the log.
+        """
+        delivered = 0
+        with self._lock:
+            while True:
+                batch = self.wal.pending(self.batch_size)
+                if not batch:
+                    return delivered
+                self.sink([data for _, data in batch])
+                self.wal.commit(batch[-1][0])
+                delivered += len(batch)
+                self.delivered += len(batch)
+
+    def start(self) -> 'WalFlusher':
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 30.0):
+        """Stop the thread after one last delivery attempt."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        with self.wal._cond:
+            self.wal._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        from retry import backoff_delay
+
+        failures = 0
+        while True:
+            stopping = self._stop.is_set()
+            if not stopping and not self.wal.wait_for_records(timeout=1.0):
+                continue
+            if self.linger and not stopping and failures == 0:
+                self._stop.wait(self.linger)
+            try:
+                count = self.drain()
+                if count:
+                    logger.debug(f"{self.name}: delivered {count} records")
+                failures = 0
+            except Exception as e:
+                delay = backoff_delay(failures, Config.RETRY_DELAY, Config.WAL_RETRY_MAX_DELAY)
+                failures += 1
+                logger.error(f"{self.name}: delivery failed ({e}); {self.wal.pending_count} records kept, "
+                             f"retrying in {delay:.0f}s")
+                if not stopping:
+                    self._stop.wait(delay)
+                    continue
+            if stopping:
+                return
+
+
+_logs: Dict[str, WriteAheadLog] = {}
+_locked: Dict[str, str] = {}  # name -> directory another process held when this one tried it
+_logs_lock = threading.Lock()
+_collecting = False
+
+
+def _samples():
+    with _logs_lock:
+        logs = dict(_logs)
+    for name, wal in logs.items():
+        yield ('wal_pending_records', 'gauge', 'Records in the write-ahead log not yet delivered', {'log': name},
+               wal.pending_count)
+        yield ('wal_fsyncs_total', 'counter', 'fsync calls made by the write-ahead log', {'log': name}, wal.fsyncs)
+
+
+def get_wal(name: str) -> Optional[WriteAheadLog]:
+    """
+    Process-wide log <Config.WAL_DIR>/<name>.
+
+    Returns:
+        None when Config.WAL_DIR is empty (disabled), or when another process holds
+        the directory; callers then write without a log
+    """
+    global _collecting
+    if not Config.WAL_DIR:
+        return None
+    path = os.path.join(Config.WAL_DIR, name)
+    with _logs_lock:
+        if _locked.get(name) == path:
+            return None
+        wal = _logs.get(name)
+        if wal is None or wal.directory != path:
+            if wal is not None:
+                wal.close()
+                del _logs[name]
+            try:
+                wal = WriteAheadLog(path)
+            except WalLockedError as e:
+                logger.warning(f"{e}; writing without the write-ahead log in this process")
+                _locked[name] = path
+                return None
+            if not _collecting:
+                from metrics import REGISTRY
+                REGISTRY.add_collector(_samples)
+                _collecting = True
+            _logs[name] = wal
+        return wal